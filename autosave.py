@@ -0,0 +1,326 @@
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+from typing import Callable, Dict, List, Optional
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Her uygulama örneği bu klasörün altında kendi oturum klasörünü kullanır
+DEFAULT_AUTOSAVE_DIR = os.path.join(os.path.expanduser('~'), '.vcf_editor', 'autosave')
+
+SNAPSHOT_FILE = 'snapshot.pkl'
+JOURNAL_FILE = 'journal.jsonl'
+DIRTY_FILE = 'dirty'
+LOCK_FILE = 'owner.lock'
+
+def _try_lock(directory: str):
+    """
+    Oturum klasörünün kilit dosyasını kilitlemeyi dener
+
+    Kilit, sahibi olan süreç açık tuttuğu sürece alınamaz; süreç çökünce
+    işletim sistemi kilidi bırakır. Kilit alınırsa açık dosya, alınamazsa
+    None döner.
+    """
+    try:
+        lock = open(os.path.join(directory, LOCK_FILE), 'a+')
+    except OSError:
+        return None
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock.close()
+        return None
+    return lock
+
+def _remove_session(directory: str) -> None:
+    """Oturum dosyalarını siler; klasör boş kalırsa onu da siler"""
+    for name in (DIRTY_FILE, JOURNAL_FILE, SNAPSHOT_FILE, SNAPSHOT_FILE + '.tmp', LOCK_FILE):
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+    try:
+        os.rmdir(directory)
+    except OSError:
+        pass
+
+def _to_json_value(value):
+    """Değeri JSON'a yazılabilir hale getirir"""
+    if isinstance(value, tuple):
+        return list(value)
+    if value is None or (not isinstance(value, (list, dict)) and pd.isna(value)):
+        return None
+    return value
+
+def diff_frames(old: pd.DataFrame, new: pd.DataFrame) -> Optional[List[Dict]]:
+    """
+    İki DataFrame arasındaki farkı günlük kayıtları olarak döndürür
+
+    Yeni satır eklenmiş veya sütunlar değişmişse fark yerine tam anlık
+    görüntü gerektiği için None döner. Satırlar etiketleriyle karşılaştırılır;
+    sıralama yalnızca görünümde yapıldığından satır sırası kaydedilmez.
+    """
+    if list(old.columns) != list(new.columns) or len(new.index.difference(old.index)):
+        return None
+
+    entries = []
+    dropped = old.index.difference(new.index)
+    if len(dropped):
+        entries.append({'op': 'drop', 'labels': dropped.tolist()})
+
+
+    for column in new.columns:
+        before = old[column].reindex(new.index)
+        after = new[column]
+        changed = (before != after) & ~(before.isna() & after.isna())
+        if changed.any():
+            entries.append({
+                'op': 'set_cells',
+                'column': column,
+                'labels': new.index[changed.to_numpy()].tolist(),
+                'values': [_to_json_value(value) for value in after[changed]],
+            })
+    return entries
+
+def apply_entry(df: pd.DataFrame, entry: Dict) -> pd.DataFrame:
+    """Tek bir günlük kaydını DataFrame'e uygular ('reorder' eski sürümlerin günlükleri içindir)"""
+    if entry['op'] == 'drop':
+        return df.drop(index=entry['labels'], errors='ignore')
+    if entry['op'] == 'reorder':
+        return df.reindex(entry['labels'])
+    if entry['op'] == 'set_cells':
+        values = [tuple(value) if isinstance(value, list) else value for value in entry['values']]
+        df.loc[entry['labels'], entry['column']] = pd.Series(values, index=entry['labels'], dtype=object)
+        return df
+    raise ValueError(f"Unknown journal entry: {entry['op']}")
+
+class AutosaveManager:
+    """
+    Düzenlemeleri arka planda bir işlem günlüğüne ve periyodik anlık
+    görüntülere yazar
+
+    Arayüz iş parçacığı yalnızca kuyruğa referans ekler; fark hesaplama ve
+    disk yazma işlemleri ayrı bir iş parçacığında yapılır. Her örnek root
+    altında süreç numarasıyla başlayan kendi klasörüne yazar ve klasörün
+    kilidini kapanana kadar tutar; böylece aynı anda açık pencereler
+    birbirinin günlüğünü kurtarma dosyası sanıp silmez.
+
+    Yazma hatası günlüğe kaydedilir ve on_error ile bildirilir (yazıcı iş
+    parçacığından çağrılır); günlük eksik kalmış olabileceği için sonraki
+    değişiklikte tam anlık görüntü yazılır.
+    """
+
+    def __init__(self, root: str = DEFAULT_AUTOSAVE_DIR, snapshot_every: int = 50,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.directory = tempfile.mkdtemp(prefix=f'{os.getpid()}-', dir=root)
+        self._lock = _try_lock(self.directory)
+        self.snapshot_every = snapshot_every
+        self.on_error = on_error
+        self._needs_snapshot = False
+        self._queue = queue.Queue()
+        self._base = None
+        self._entries_since_snapshot = 0
+        self._thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+        self._thread.start()
+
+    @property
+    def snapshot_path(self):
+        return os.path.join(self.directory, SNAPSHOT_FILE)
+
+    @property
+    def journal_path(self):
+        return os.path.join(self.directory, JOURNAL_FILE)
+
+    @property
+    def dirty_path(self):
+        return os.path.join(self.directory, DIRTY_FILE)
+
+    def start(self, df: pd.DataFrame) -> None:
+        """Yeni bir oturum başlatır (ör. dosya açıldığında veya kaydedildiğinde)"""
+        self._base = df
+        self._queue.put(('start', df))
+
+    def data_replaced(self, df: pd.DataFrame) -> None:
+        """Tablo verisi yeni bir DataFrame ile değiştirildiğinde çağrılır"""
+        if self._base is None or df is self._base:
+            return
+        old, self._base = self._base, df
+        self._queue.put(('diff', (old, df)))
+
+    def cell_changed(self, df: pd.DataFrame, row: int, column: str) -> None:
+        """Tek bir hücre yerinde düzenlendiğinde çağrılır"""
+        if self._base is None:
+            return
+        labels = df.index[[row]].tolist()
+        entry = {'op': 'set_cells', 'column': column, 'labels': labels,
+                 'values': [_to_json_value(df.at[labels[0], column])]}
+        self._queue.put(('entries', ([entry], df)))
+
+    def flush(self) -> None:
+        """Kuyruktaki tüm işlerin diske yazılmasını bekler"""
+        self._queue.join()
+
+    def close(self, discard: bool = True) -> None:
+        """İş parçacığını durdurur; temiz çıkışta kurtarma dosyalarını siler"""
+        self._queue.put(('stop', None))
+        self._thread.join()
+        if discard:
+            # Kilit bırakılmadan önce kirli işareti kalkar; başka örnek klasörü kurtarma sanmaz
+            try:
+                os.remove(self.dirty_path)
+            except OSError:
+                pass
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+        if discard:
+            _remove_session(self.directory)
+
+    def _run(self):
+        while True:
+            kind, payload = self._queue.get()
+            try:
+                if kind == 'stop':
+                    return
+                if kind == 'start':
+                    self._write_snapshot(payload)
+                    if os.path.exists(self.dirty_path):
+                        os.remove(self.dirty_path)
+                elif kind == 'diff':
+                    old, new = payload
+                    entries = None if self._needs_snapshot else diff_frames(old, new)
+                    if entries is None:
+                        self._write_snapshot(new)
+                        self._mark_dirty()
+                    else:
+                        self._append(entries, new)
+                elif kind == 'entries':
+                    entries, df = payload
+                    if self._needs_snapshot:
+                        self._write_snapshot(df)
+                        self._mark_dirty()
+                    else:
+                        self._append(entries, None)
+            except Exception as e:
+                # Otomatik kayıt hatası düzenlemeyi asla engellememeli
+                logger.exception("Autosave failed")
+                self._needs_snapshot = True
+                if self.on_error is not None:
+                    self.on_error(e)
+            finally:
+                self._queue.task_done()
+
+    def _write_snapshot(self, df):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.snapshot_path + '.tmp'
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, self.snapshot_path)
+        # Anlık görüntü önceki tüm günlük kayıtlarını içerir
+        open(self.journal_path, 'w', encoding='utf-8').close()
+        self._entries_since_snapshot = 0
+        self._needs_snapshot = False
+
+    def _append(self, entries, df):
+        if not entries:
+            return
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._mark_dirty()
+        self._entries_since_snapshot += len(entries)
+        if df is not None and self._entries_since_snapshot >= self.snapshot_every:
+            self._write_snapshot(df)
+
+    def _mark_dirty(self):
+        if not os.path.exists(self.dirty_path):
+            open(self.dirty_path, 'w').close()
+
+    @staticmethod
+    def has_recovery(directory: str) -> bool:
+        """Klasörde kurtarılabilir düzenleme olup olmadığını döndürür"""
+        return (os.path.exists(os.path.join(directory, SNAPSHOT_FILE))
+                and os.path.exists(os.path.join(directory, DIRTY_FILE)))
+
+    @staticmethod
+    def orphaned_sessions(root: str = DEFAULT_AUTOSAVE_DIR) -> List[str]:
+        """
+        Sahibi artık çalışmayan ve kurtarılabilir düzenleme içeren oturum
+        klasörleri (en yenisi önce)
+
+        Kilidi tutulan klasörler çalışan başka bir örneğe aittir ve atlanır;
+        sahipsiz ve kurtarılacak bir şey içermeyen klasörler temizlenir.
+        Eski sürümlerin doğrudan root'a yazdığı oturum da dahil edilir.
+        """
+        if not os.path.isdir(root):
+            return []
+        candidates = [entry.path for entry in os.scandir(root) if entry.is_dir()]
+        if AutosaveManager.has_recovery(root):
+            candidates.append(root)
+        sessions = []
+        for directory in candidates:
+            lock = _try_lock(directory)
+            if lock is None:
+                continue
+            recoverable = AutosaveManager.has_recovery(directory)
+            lock.close()
+            if recoverable:
+                sessions.append(directory)
+            elif directory != root:
+                _remove_session(directory)
+        sessions.sort(key=lambda directory: os.path.getmtime(os.path.join(directory, SNAPSHOT_FILE)),
+                      reverse=True)
+        return sessions
+
+    @staticmethod
+    def recover(directory: str) -> pd.DataFrame:
+        """Son anlık görüntüyü yükler ve günlüğü üzerine yeniden oynatır"""
+        df = pd.read_pickle(os.path.join(directory, SNAPSHOT_FILE))
+        journal_path = os.path.join(directory, JOURNAL_FILE)
+        if not os.path.exists(journal_path):
+            return df
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Çökme sırasında yarım kalmış son satır
+                    break
+                df = apply_entry(df, entry)
+        return df
+
+    @staticmethod
+    def discard(directory: str) -> bool:
+        """
+        Sahipsiz bir oturumun kurtarma dosyalarını siler
+
+        Klasörün kilidi çalışan bir örnekte ise hiçbir şey silinmez ve False
+        döner.
+        """
+        lock = _try_lock(directory)
+        if lock is None:
+            return False
+        try:
+            os.remove(os.path.join(directory, DIRTY_FILE))
+        except OSError:
+            pass
+        lock.close()
+        _remove_session(directory)
+        return True
@@ -0,0 +1,330 @@
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import compression
+from vcf_handler import VCFHandler, BlobRef, ATTACHMENTS_COLUMN, CARD_COLUMN, HASH_COLUMN
+
+SOURCE_COLUMN = 'Source'
+
+# Parçalı kayıtta parça listesinin yazıldığı dosyanın soneki
+MANIFEST_SUFFIX = '.manifest.json'
+
+def default_workers() -> int:
+    return max(1, min(8, os.cpu_count() or 1))
+
+def collect_files(location: str) -> List[str]:
+    """
+    Klasördeki .vcf dosyalarını (sıkıştırılmışlar dahil, ör. .vcf.gz) veya bir
+    glob desenine uyan dosyaları döndürür
+    """
+    if os.path.isdir(location):
+        return sorted(path for path in glob.glob(os.path.join(location, '*'))
+                      if os.path.isfile(path) and compression.strip_extension(path).lower().endswith('.vcf'))
+    return sorted(path for path in glob.glob(location) if os.path.isfile(path))
+
+def source_names(paths: List[str]) -> List[str]:
+    """
+    Dosyaların ortak klasöre göre göreli yolları; farklı klasörlerdeki aynı
+    adlı dosyalar (ör. a/x.vcf ve b/x.vcf) ayrı kaynak olarak kalır
+    """
+    if not paths:
+        return []
+    absolute = [os.path.abspath(path) for path in paths]
+    root = os.path.commonpath([os.path.dirname(path) for path in absolute])
+    return [os.path.relpath(path, root) for path in absolute]
+
+def _parse_one(filepath: str, source: str) -> pd.DataFrame:
+    try:
+        df = VCFHandler().parse_vcf(filepath)
+    except Exception as e:
+        # vobject hataları süreçler arasında taşınamayabilir
+        raise ValueError(str(e)) from None
+    df[SOURCE_COLUMN] = source
+    return df
+
+# Kaynak dosyanın üzerine kaydedilince export_vcf'nin güncellediği iç sütunlar
+_REFERENCE_COLUMNS = [CARD_COLUMN, ATTACHMENTS_COLUMN, HASH_COLUMN]
+
+def _export_one(df: pd.DataFrame, filepath: str, ios_compatible: bool
+                ) -> Tuple[str, Optional[pd.DataFrame]]:
+    """
+    Bir kaynağın kişilerini kaydeder
+
+    Returns:
+        (dosya, referanslar): Kaynak dosyanın üzerine yazıldıysa kartların
+        yeni dosyaya taşınmış referansları; aksi halde None
+    """
+    df = df.drop(columns=[SOURCE_COLUMN])
+    target_path = os.path.abspath(filepath)
+    overwrites_source = CARD_COLUMN in df.columns and any(
+        isinstance(card, BlobRef) and card.path == target_path for card in df[CARD_COLUMN])
+    VCFHandler().export_vcf(df, filepath, ios_compatible)
+    if not overwrites_source:
+        return filepath, None
+    # Referanslar yalnızca bu sürecin kopyasında taşındı; ana sürece geri gönderilir
+    return filepath, df[[column for column in _REFERENCE_COLUMNS if column in df.columns]]
+
+def _apply_references(df: pd.DataFrame, references: pd.DataFrame) -> None:
+    """Alt süreçte taşınan kart referanslarını ana tabloya yazar"""
+    positions = df.index.get_indexer(references.index)
+    for column in references.columns:
+        values = df[column].to_numpy(dtype=object).copy()
+        values[positions] = references[column].to_numpy(dtype=object)
+        df[column] = values if column != HASH_COLUMN else values.astype(references[column].dtype)
+
+def _run_bounded(func, jobs, labels, max_workers, progress):
+    """
+    İşleri süreç havuzunda çalıştırır; aynı anda en fazla 2 * max_workers
+    iş kuyrukta bekler
+
+    Returns:
+        (sonuçlar, hatalar): sonuçlar iş sırasındadır, hatalı işler None olur
+    """
+    results = [None] * len(jobs)
+    failed = []
+    pending = {}
+    next_job = 0
+    done_count = 0
+    # Qt, otomatik kayıt ve yükleme iş parçacıkları çalışırken fork güvenli değildir
+    executor = ProcessPoolExecutor(max_workers=max_workers,
+                                   mp_context=multiprocessing.get_context('spawn'))
+    cancelled = False
+    try:
+        while next_job < len(jobs) or pending:
+            while next_job < len(jobs) and len(pending) < 2 * max_workers:
+                future = executor.submit(func, *jobs[next_job])
+                pending[future] = next_job
+                next_job += 1
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index = pending.pop(future)
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    failed.append((labels[index], str(e)))
+                done_count += 1
+                if progress is not None and progress(done_count, len(jobs)) is False:
+                    cancelled = True
+                    raise InterruptedError("Batch cancelled")
+    finally:
+        # İptalde kuyruktaki işler atılır ve çalışanların bitmesi beklenmez
+        executor.shutdown(wait=not cancelled, cancel_futures=cancelled)
+    return results, failed
+
+def parse_files(paths: List[str], max_workers: Optional[int] = None,
+                progress: Optional[Callable[[int, int], Optional[bool]]] = None
+                ) -> Tuple[pd.DataFrame, List[Tuple[str, str]]]:
+    """
+    VCF dosyalarını paralel okur ve kaynak dosya sütunuyla tek tabloda birleştirir
+
+    Kaynak sütunu dosyanın ortak klasöre göre göreli yoludur (source_names).
+
+    Args:
+        paths: Okunacak dosyalar
+        max_workers: Eşzamanlı süreç sayısı
+        progress: (biten, toplam) ile çağrılır; False dönerse işlem iptal edilir
+
+    Returns:
+        (DataFrame, hatalar): hatalar (dosya, mesaj) listesidir
+    """
+    max_workers = max_workers or default_workers()
+    frames, failed = _run_bounded(_parse_one, list(zip(paths, source_names(paths))), paths,
+                                  max_workers, progress)
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return pd.DataFrame(columns=['Name', 'Phone', 'E-mail', 'Type', SOURCE_COLUMN]), failed
+    return pd.concat(frames, ignore_index=True), failed
+
+def export_per_source(df: pd.DataFrame, output_dir: str, ios_compatible: bool = False,
+                      max_workers: Optional[int] = None,
+                      progress: Optional[Callable[[int, int], Optional[bool]]] = None
+                      ) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Birleşik tabloyu kaynak dosyaya göre ayırır ve her birini ayrı VCF olarak kaydeder
+
+    Çıktı dosyaları kaynakların göreli yollarıyla output_dir altında
+    oluşturulur (ör. a/x.vcf ve b/x.vcf ayrı dosyalara yazılır).
+
+    Bir kaynak dosyanın üzerine kaydedilirse df'deki ham kart referansları
+    export_vcf'deki gibi yeni dosyaya taşınır.
+
+    Returns:
+        (yazılan dosyalar, hatalar)
+    """
+    max_workers = max_workers or default_workers()
+    jobs = []
+    for source, group in df.groupby(SOURCE_COLUMN, sort=False):
+        filepath = os.path.join(output_dir, source)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        jobs.append((group, filepath, ios_compatible))
+    results, failed = _run_bounded(_export_one, jobs, [job[1] for job in jobs],
+                                   max_workers, progress)
+    written = []
+    for result in results:
+        if result is None:
+            continue
+        path, references = result
+        if references is not None:
+            _apply_references(df, references)
+        written.append(path)
+    return written, failed
+
+def shard_path(filepath: str, number: int, digits: int = 4) -> str:
+    """Parça dosyasının adı: kisiler.vcf -> kisiler-0001.vcf"""
+    stem, extension = os.path.splitext(filepath)
+    return f"{stem}-{number:0{digits}d}{extension or '.vcf'}"
+
+def manifest_path(filepath: str) -> str:
+    return os.path.splitext(filepath)[0] + MANIFEST_SUFFIX
+
+def plan_shards(sizes: np.ndarray, max_cards: Optional[int] = None,
+                max_bytes: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Kartları sırayı bozmadan ardışık parçalara böler
+
+    Her parça en fazla max_cards kart ve toplam en fazla max_bytes bayt
+    içerir; tek başına max_bytes'tan büyük bir kart kendi parçasında kalır.
+
+    Returns:
+        (başlangıç, bitiş) satır aralıkları
+    """
+    count = len(sizes)
+    ends = np.cumsum(sizes)
+    shards = []
+    start = 0
+    while start < count:
+        end = count if max_cards is None else min(count, start + max_cards)
+        if max_bytes is not None:
+            before = ends[start - 1] if start else 0
+            end = min(end, int(np.searchsorted(ends, before + max_bytes, side='right')))
+        end = max(end, start + 1)
+        shards.append((start, end))
+        start = end
+    return shards
+
+def _export_shard(df: pd.DataFrame, filepath: str, ios_compatible: bool) -> Dict:
+    """Bir parçayı kaydeder ve parça listesindeki kaydını döndürür"""
+    VCFHandler().export_vcf(df, filepath, ios_compatible)
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return {'file': os.path.basename(filepath), 'contacts': len(df),
+            'bytes': os.path.getsize(filepath), 'sha256': digest.hexdigest()}
+
+def export_sharded(df: pd.DataFrame, filepath: str, ios_compatible: bool = False,
+                   max_cards: Optional[int] = None, max_bytes: Optional[int] = None,
+                   max_workers: Optional[int] = None,
+                   progress: Optional[Callable[[int, int], Optional[bool]]] = None
+                   ) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Kişileri kart sayısı veya dosya boyutuyla sınırlı parçalara bölerek
+    paralel kaydeder
+
+    Parçalar filepath'e numara eklenerek adlandırılır (kisiler-0001.vcf,
+    ...). Tüm parçalar yazılınca dosya adları, kişi sayıları, boyutları ve
+    SHA-256 özetleri kisiler.manifest.json dosyasına yazılır; önceki
+    kayıttan kalan ve artık listede olmayan parçalar silinir. Boyut sınırı
+    kart boyutlarının üstten tahminine göre uygulanır.
+
+    Returns:
+        (yazılan dosyalar, hatalar)
+    """
+    if not max_cards and not max_bytes:
+        raise ValueError("Give a card count or a byte size for the parts")
+    max_workers = max_workers or default_workers()
+    filepath = os.path.abspath(filepath)
+    sizes = VCFHandler().estimate_card_sizes(df, ios_compatible) if max_bytes else np.zeros(len(df))
+    shards = plan_shards(sizes, max_cards or None, max_bytes or None)
+    digits = max(4, len(str(len(shards))))
+    paths = [shard_path(filepath, number, digits) for number in range(1, len(shards) + 1)]
+    if CARD_COLUMN in df.columns:
+        sources = {card.path for card in df[CARD_COLUMN] if isinstance(card, BlobRef)}
+        if sources.intersection(paths):
+            raise ValueError("Cannot overwrite the source file of the contacts")
+
+    # Önceki parça listesi hemen kaldırılır; yarıda kalan kayıt tamamlanmış gibi görünmesin
+    manifest_file = manifest_path(filepath)
+    previous = []
+    if os.path.exists(manifest_file):
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                previous = [shard['file'] for shard in json.load(f).get('shards', [])]
+        except (OSError, ValueError, KeyError, TypeError):
+            previous = []
+        os.remove(manifest_file)
+
+    jobs = [(df.iloc[start:end], path, ios_compatible) for (start, end), path in zip(shards, paths)]
+    results, failed = _run_bounded(_export_shard, jobs, paths, max_workers, progress)
+    written = [path for path, result in zip(paths, results) if result is not None]
+    if failed:
+        return written, failed
+
+    manifest = {
+        'version': 1,
+        'format': 'ios' if ios_compatible else 'standard',
+        'contacts': len(df),
+        'max_cards': max_cards or None,
+        'max_bytes': max_bytes or None,
+        'shards': results,
+    }
+    tmp_path = manifest_file + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_file)
+
+    directory = os.path.dirname(filepath)
+    current = {os.path.basename(path) for path in paths}
+    for name in previous:
+        if name not in current and os.path.basename(name) == name:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+    return written, failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse many VCF files in parallel")
+    parser.add_argument('location', help="Folder or glob pattern of VCF files")
+    parser.add_argument('-o', '--output', help="Write the combined table to this CSV file")
+    parser.add_argument('--split-dir', help="Write one VCF per source file into this folder")
+    parser.add_argument('--shard', metavar='FILE', help="Write the combined contacts as numbered parts of this VCF file")
+    parser.add_argument('--max-cards', type=int, default=None, help="Contacts per part (with --shard)")
+    parser.add_argument('--max-mb', type=float, default=None, help="Size of each part in MB (with --shard)")
+    parser.add_argument('--ios', action='store_true', help="Save in iOS-compatible format")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Number of worker processes")
+    args = parser.parse_args(argv)
+
+    paths = collect_files(args.location)
+    progress = lambda done, total: print(f"\r{done}/{total} files", end='', flush=True)
+    df, failed = parse_files(paths, args.workers, progress)
+    print()
+    for path, message in failed:
+        print(f"Failed: {path}: {message}")
+    print(f"Parsed {len(df)} contacts from {len(paths) - len(failed)} files")
+
+    if args.output:
+        VCFHandler().export_csv(df, args.output)
+    if args.split_dir:
+        written, failed = export_per_source(df, args.split_dir, args.ios, args.workers)
+        for path, message in failed:
+            print(f"Failed: {path}: {message}")
+        print(f"Wrote {len(written)} files to {args.split_dir}")
+    if args.shard:
+        max_bytes = int(args.max_mb * 1024 ** 2) if args.max_mb else None
+        written, failed = export_sharded(df, args.shard, args.ios, args.max_cards, max_bytes, args.workers)
+        for path, message in failed:
+            print(f"Failed: {path}: {message}")
+        if not failed:
+            print(f"Wrote {len(written)} parts and {manifest_path(os.path.abspath(args.shard))}")
+
+if __name__ == '__main__':
+    main()
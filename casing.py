@@ -0,0 +1,254 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Python'un büyük/küçük harf dönüşümleri Türkçe i/ı/İ/I için yanlıştır
+# ('i'.upper() == 'I', 'İ'.lower() == 'i̇'). Dönüşümden önce bu harfler,
+# kendi aralarında doğru eşlenen ve isimlerde geçmeyen harf çiftleriyle
+# değiştirilir, sonra geri çevrilir.
+_TURKISH_I = [('İ', 'Ꞁ'), ('i', 'ꞁ'), ('I', 'Ꞃ'), ('ı', 'ꞃ')]
+_TURKISH_I_BACK = [(placeholder, letter) for letter, placeholder in _TURKISH_I]
+
+# Toplu işlemde değerler bu karakterle tek bir metinde birleştirilir
+_SEPARATOR = '\x00'
+
+def _replace_all(text: str, pairs) -> str:
+    for old, new in pairs:
+        text = text.replace(old, new)
+    return text
+
+def _convert(text: str, method: str) -> str:
+    """Metni Türkçe kurallarla 'upper', 'lower' veya 'title' biçimine çevirir"""
+    text = _replace_all(text, _TURKISH_I)
+    text = getattr(text, method)()
+    return _replace_all(text, _TURKISH_I_BACK)
+
+def upper_text(text: str) -> str:
+    """Tek bir metni Türkçe kurallarla büyük harfe çevirir"""
+    return _convert(text, 'upper')
+
+def lower_text(text: str) -> str:
+    """Tek bir metni Türkçe kurallarla küçük harfe çevirir"""
+    return _convert(text, 'lower')
+
+def _map_text(values: pd.Series, func) -> pd.Series:
+    """
+    Sütundaki metinleri tek bir metinde birleştirir, func'u bir kez uygular
+    ve sonucu tekrar satırlara böler; metin olmayan değerler aynen kalır
+
+    func ayırıcı karakterleri korumalıdır.
+    """
+    array = values.to_numpy(dtype=object)
+    if pd.api.types.infer_dtype(array, skipna=False) == 'string':
+        is_text = np.ones(len(array), dtype=bool)
+    elif pd.api.types.infer_dtype(array, skipna=True) in ('string', 'empty'):
+        is_text = pd.notna(array)
+    else:
+        is_text = np.fromiter((isinstance(value, str) for value in array), dtype=bool, count=len(array))
+    if not is_text.any():
+        return values.copy()
+    if is_text.all():
+        result = np.array(func(_SEPARATOR.join(array.tolist())).split(_SEPARATOR), dtype=object)
+        return pd.Series(result, index=values.index, name=values.name, dtype=object)
+    converted = func(_SEPARATOR.join(array[is_text].tolist())).split(_SEPARATOR)
+    result = array.copy()
+    result[is_text] = converted
+    return pd.Series(result, index=values.index, name=values.name, dtype=object)
+
+def upper(values: pd.Series) -> pd.Series:
+    """Sütunu Türkçe kurallarla büyük harfe çevirir"""
+    return _map_text(values, upper_text)
+
+def lower(values: pd.Series) -> pd.Series:
+    """Sütunu Türkçe kurallarla küçük harfe çevirir"""
+    return _map_text(values, lower_text)
+
+def title_case(values: pd.Series) -> pd.Series:
+    """Her kelimenin ilk harfini büyük, diğerlerini küçük yapar ('istanbul' → 'İstanbul')"""
+    return _map_text(values, lambda text: _convert(text, 'title'))
+
+# str.split()'in boşluk saydığı, 0x80'den büyük karakterler
+_UNICODE_SPACES = np.array([ord(char) for char in map(chr, range(0x80, 0x3001)) if char.isspace()],
+                           dtype=np.uint32)
+
+def _last_word_mask(chars: np.ndarray):
+    """
+    Satırların son kelimelerindeki karakterleri işaretler
+
+    Her satırın son boşluğundan satır sonuna kadar olan aralığın başı ve
+    sonu işaretlenir; işaretlerin birikimli XOR'u maskeyi verir. Metinde çift
+    boşluk, baştaki/sondaki boşluk veya başka bir beyaz karakter varsa None
+    döner (önce boşlukların sadeleştirilmesi gerekir).
+    """
+    # Boşluklar ve ayırıcılar tek geçişte bulunur
+    low = np.flatnonzero(chars < 33)
+    low_chars = chars[low]
+    is_space = low_chars == ord(' ')
+    is_separator = low_chars == ord(_SEPARATOR)
+    if not (is_space | is_separator).all():
+        return None
+    if ((chars == 0x85) | (chars == 0xA0)).any():
+        return None
+    if chars.max() >= 0x1680 and np.isin(chars[chars >= 0x1680], _UNICODE_SPACES).any():
+        return None
+    record_ends = np.append(low[is_separator], len(chars))
+    record_starts = np.concatenate(([0], record_ends[:-1] + 1))
+    spaces = low[is_space]
+    filled = record_ends > record_starts
+    if ((np.diff(spaces) == 1).any() or (chars[record_starts[filled]] == ord(' ')).any()
+            or (chars[record_ends[filled] - 1] == ord(' ')).any()):
+        return None
+    last_space = np.searchsorted(spaces, record_ends) - 1
+    word_starts = record_starts.copy()
+    has_space = last_space >= 0
+    # Önceki satırlardaki boşluklar sayılmaz
+    word_starts[has_space] = np.maximum(spaces[last_space[has_space]] + 1, record_starts[has_space])
+    toggles = np.zeros(len(chars) + 1, dtype=bool)
+    toggles[word_starts] ^= True
+    toggles[record_ends] ^= True
+    return np.logical_xor.accumulate(toggles[:-1])
+
+def _upper_last_words(text: str) -> str:
+    if not text:
+        return text
+    chars = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    in_last_word = _last_word_mask(chars)
+    if in_last_word is None:
+        # Boşlukları tek boşluğa indir (ayırıcı boşluk sayılmaz); çoğu listede gerekmez
+        text = ' '.join(text.split())
+        text = text.replace(' ' + _SEPARATOR, _SEPARATOR).replace(_SEPARATOR + ' ', _SEPARATOR)
+        chars = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        in_last_word = _last_word_mask(chars)
+
+    # str.upper() Türkçe harflerden yalnızca 'i'yi yanlış çevirir ('I'); upper_text'in
+    # tüm metin üzerindeki değiştirmeleri yerine 'i'ler maskede 'İ' yapılır
+    upper_version = text.upper()
+    if len(upper_version) != len(text):
+        # 'ß' → 'SS' gibi uzunluk değiştiren dönüşümlerde satır satır işle
+        lines = []
+        for value in text.split(_SEPARATOR):
+            prefix, space, last = value.rpartition(' ')
+            lines.append(prefix + space + upper_text(last))
+        return _SEPARATOR.join(lines)
+
+    upper_chars = np.frombuffer(upper_version.encode('utf-32-le'), dtype=np.uint32).copy()
+    upper_chars[chars == ord('i')] = ord('İ')
+    return np.where(in_last_word, upper_chars, chars).tobytes().decode('utf-32-le')
+
+def last_word_upper(values: pd.Series) -> pd.Series:
+    """Her değerin son kelimesini Türkçe kurallarla büyük harfe çevirir"""
+    return _map_text(values, _upper_last_words)
+
+def _variants(char: str) -> list:
+    """Karakterin Türkçe kurallarla tek karakterlik büyük/küçük harf biçimleri"""
+    variants = {char, lower_text(char), upper_text(char)}
+    return sorted(variant for variant in variants if len(variant) == 1)
+
+def caseless_pattern(text: str) -> str:
+    """
+    Metni Türkçe büyük/küçük harf farkı gözetmeden arayan bir regex'e
+    çevirir ('i' yalnızca 'İ' ile, 'ı' yalnızca 'I' ile eşleşir)
+    """
+    parts = []
+    for char in text:
+        variants = _variants(char)
+        if len(variants) > 1:
+            parts.append('[' + ''.join(re.escape(variant) for variant in variants) + ']')
+        else:
+            parts.append(re.escape(char))
+    return ''.join(parts)
+
+# Kaçış dizisinden sonra kopyalanan onaltılık basamak sayısı
+_HEX_ESCAPES = {'x': 2, 'u': 4, 'U': 8}
+
+def _escape_length(pattern: str, i: int) -> int:
+    """pattern[i]'deki '\\' ile başlayan kaçış dizisinin uzunluğu"""
+    char = pattern[i + 1:i + 2]
+    if char in _HEX_ESCAPES:
+        return 2 + _HEX_ESCAPES[char]
+    if char == 'N' and pattern[i + 2:i + 3] == '{':
+        return pattern.index('}', i) - i + 1
+    return 2
+
+def _group_prefix_length(pattern: str, i: int) -> int:
+    """pattern[i]'deki '(?' ile başlayan grup önekinin (ad, bayrak, yorum) uzunluğu"""
+    char = pattern[i + 2:i + 3]
+    if char == 'P' and pattern[i + 3:i + 4] == '<':
+        return pattern.index('>', i) - i + 1
+    if char in ('P', '#', '('):
+        return pattern.index(')', i) - i + 1
+    if char == '<':
+        return 4
+    if char in ('=', '!', ':', '>'):
+        return 3
+    # Satır içi bayraklar: (?aiLmsux) veya (?aiLmsux-imsx:...)
+    end = i + 2
+    while end < len(pattern) and pattern[end] not in ':)':
+        end += 1
+    return end - i + 1
+
+def _caseless_class(pattern: str, i: int) -> tuple:
+    """
+    pattern[i]'deki karakter sınıfını Türkçe harf biçimleriyle genişletir
+
+    Returns:
+        (yeni sınıf, eski sınıfın uzunluğu)
+    """
+    end = i + 1
+    parts = ['[']
+    if pattern[end:end + 1] == '^':
+        parts.append('^')
+        end += 1
+    first = True
+    while end < len(pattern) and (pattern[end] != ']' or first):
+        first = False
+        if pattern[end] == '\\':
+            length = _escape_length(pattern, end)
+            parts.append(pattern[end:end + length])
+            end += length
+            continue
+        char = pattern[end]
+        if pattern[end + 1:end + 2] == '-' and pattern[end + 2:end + 3] not in ('', ']', '\\'):
+            # Aralıklar olduğu gibi kalır; uçların büyük/küçük harf karşılıkları da eklenir
+            last = pattern[end + 2]
+            ranges = {(char, last), (lower_text(char), lower_text(last)), (upper_text(char), upper_text(last))}
+            for low, high in sorted(ranges):
+                if len(low) == 1 and len(high) == 1 and low <= high:
+                    parts.append(re.escape(low) + '-' + re.escape(high))
+            end += 3
+            continue
+        parts.extend(re.escape(variant) for variant in _variants(char))
+        end += 1
+    return ''.join(parts) + ']', end - i + 1
+
+def caseless_regex(pattern: str) -> str:
+    """
+    Bir regex'i Türkçe büyük/küçük harf farkı gözetmeden eşleşecek şekilde
+    yeniden yazar
+
+    re.IGNORECASE 'ı' ile 'i'yi, 'I' ile 'İ'yi de eşleştirir; bunun yerine
+    desendeki her harf caseless_pattern'deki gibi kendi biçimlerinden oluşan
+    bir sınıfa çevrilir. Kaçış dizileri, grup adları ve bayraklar korunur.
+    """
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            length = _escape_length(pattern, i)
+        elif char == '(' and pattern[i + 1:i + 2] == '?':
+            length = _group_prefix_length(pattern, i)
+        elif char == '[':
+            converted, length = _caseless_class(pattern, i)
+            parts.append(converted)
+            i += length
+            continue
+        elif char in '.^$*+?{}()|' or char.isdigit():
+            length = 1
+        else:
+            parts.append(caseless_pattern(char))
+            i += 1
+            continue
+        parts.append(pattern[i:i + length])
+        i += length
+    return ''.join(parts)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import casing
+
+# Türk alfabesi sırası (q, w, x yabancı isimler için araya eklenmiştir)
+TURKISH_ALPHABET = 'abcçdefgğhıijklmnoöpqrsştuüvwxyz'
+
+# Şapkalı ve diğer aksanlı harfler alfabedeki temel harfleriyle sıralanır
+_ACCENTED = {
+    'á': 'a', 'à': 'a', 'â': 'a', 'ä': 'a', 'ã': 'a', 'å': 'a',
+    'é': 'e', 'è': 'e', 'ê': 'e', 'ë': 'e',
+    'í': 'i', 'ì': 'i', 'î': 'i', 'ï': 'i',
+    'ó': 'o', 'ò': 'o', 'ô': 'o', 'õ': 'o',
+    'ú': 'u', 'ù': 'u', 'û': 'u',
+    'ñ': 'n', 'ý': 'y', 'ÿ': 'y',
+}
+
+# Harfler rakam ve noktalama işaretlerinden sonra gelmeleri için özel
+# kullanım alanındaki ardışık karakterlere eşlenir
+_LETTER_BASE = 0xE000
+
+def _build_table():
+    table = {ord(letter): chr(_LETTER_BASE + rank)
+             for rank, letter in enumerate(TURKISH_ALPHABET)}
+    for accented, letter in _ACCENTED.items():
+        table[ord(accented)] = table[ord(letter)]
+    return table
+
+_SORT_TABLE = _build_table()
+
+def sort_key(text: str) -> str:
+    """Tek bir metnin sıralama anahtarını döndürür (sort_keys ile aynı sıra)"""
+    return casing.lower_text(text).translate(_SORT_TABLE)
+
+def sort_keys(values: pd.Series) -> np.ndarray:
+    """
+    Sütun değerlerinden Türkçe harf sırasına uygun, büyük/küçük harf
+    duyarsız sıralama anahtarları üretir
+
+    Anahtarlar düz metin olarak karşılaştırılabilir; böylece sıralama tek
+    bir vektörel argsort ile yapılır.
+    """
+    keys = casing.lower(values.fillna('').astype(str)).str.translate(_SORT_TABLE)
+    return keys.to_numpy(dtype=str)
+
+def sort_order(keys: np.ndarray, ascending: bool = True) -> np.ndarray:
+    """
+    Anahtarlara göre satır sırasını döndürür; eşit anahtarlı satırlar her
+    iki yönde de mevcut sıralarını korur
+    """
+    if ascending:
+        return np.argsort(keys, kind='stable')
+    reversed_order = np.argsort(keys[::-1], kind='stable')
+    return (len(keys) - 1 - reversed_order)[::-1]
@@ -0,0 +1,96 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # .zst dosyaları yalnızca zstandard kuruluysa okunur/yazılır
+    zstandard = None
+
+# Dosya uzantısı -> codec
+EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz', '.zst': 'zstd'}
+
+# Dosya başındaki imza -> codec
+MAGIC = {
+    b'\x1f\x8b': 'gzip',
+    b'BZh': 'bz2',
+    b'\xfd7zXZ\x00': 'xz',
+    b'\x28\xb5\x2f\xfd': 'zstd',
+}
+
+# Dosya diyaloglarında sıkıştırılmış VCF dosyaları için desenler
+VCF_PATTERNS = '*.vcf ' + ' '.join(f'*.vcf{extension}' for extension in EXTENSIONS)
+
+def codec_from_name(filepath: str) -> Optional[str]:
+    """Uzantıya göre codec (sıkıştırılmamışsa None)"""
+    return EXTENSIONS.get(os.path.splitext(filepath)[1].lower())
+
+def strip_extension(filepath: str) -> str:
+    """Sıkıştırma uzantısını atar: kisiler.vcf.gz -> kisiler.vcf"""
+    stem, extension = os.path.splitext(filepath)
+    return stem if extension.lower() in EXTENSIONS else filepath
+
+def detect(filepath: str) -> Optional[str]:
+    """
+    Okunacak dosyanın codec'ini dosya başındaki imzadan bulur; dosya
+    okunamıyorsa uzantıya bakılır
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            head = f.read(6)
+    except OSError:
+        return codec_from_name(filepath)
+    for magic, codec in MAGIC.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ValueError("Reading or writing .zst files requires the 'zstandard' package")
+
+def _open_binary(filepath: str, mode: str, codec: Optional[str]):
+    if codec is None:
+        return open(filepath, mode)
+    if codec == 'gzip':
+        return gzip.open(filepath, mode, compresslevel=6)
+    if codec == 'bz2':
+        return bz2.open(filepath, mode)
+    if codec == 'xz':
+        return lzma.open(filepath, mode)
+    if codec == 'zstd':
+        _require_zstandard()
+        if mode == 'rb':
+            return io.BufferedReader(
+                zstandard.ZstdDecompressor().stream_reader(open(filepath, 'rb'), closefd=True))
+        # Sıkıştırma tüm çekirdeklerde paralel yapılır
+        return io.BufferedWriter(
+            zstandard.ZstdCompressor(level=3, threads=-1).stream_writer(open(filepath, 'wb'), closefd=True))
+    raise ValueError(f"Unknown compression: {codec}")
+
+def open_file(filepath: str, mode: str = 'rb', codec: Optional[str] = 'auto',
+              encoding: str = 'utf-8', newline: Optional[str] = None):
+    """
+    Dosyayı gerekiyorsa sıkıştırma codec'i üzerinden akış olarak açar
+
+    Okurken codec dosyanın imzasından, yazarken uzantısından belirlenir;
+    codec açıkça verilebilir (None: sıkıştırma yok). Diske açılmış bir
+    ara dosya kullanılmaz.
+
+    Args:
+        filepath: Dosya yolu
+        mode: 'rb', 'wb', 'rt' veya 'wt'
+        codec: 'auto', None, 'gzip', 'bz2', 'xz' veya 'zstd'
+        encoding, newline: Metin kiplerinde kullanılır
+    """
+    if mode not in ('rb', 'wb', 'rt', 'wt'):
+        raise ValueError(f"Unsupported mode: {mode}")
+    if codec == 'auto':
+        codec = detect(filepath) if mode[0] == 'r' else codec_from_name(filepath)
+    f = _open_binary(filepath, mode[0] + 'b', codec)
+    if mode[1] == 'b':
+        return f
+    return io.TextIOWrapper(f, encoding=encoding, newline=newline)
@@ -0,0 +1,253 @@
+import argparse
+import re
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+import compression
+from multivalue import as_values, flatten_values
+from vcf_handler import VCFHandler
+
+# Adresin @ öncesi kısmının ve tamamının en fazla uzunluğu (RFC 5321)
+MAX_LOCAL_LENGTH = 64
+MAX_ADDRESS_LENGTH = 254
+
+# Toplu işlemde değerler bu karakterle tek bir metinde birleştirilir
+_SEPARATOR = '\x00'
+
+# Ayırıcıdan sonraki boşluklar, yani adreslerin başındaki boşluklar; sondakiler
+# metin ters çevrilerek aynı desenle atılır (desen sabit karakterle başladığı
+# için metin her konumda denenmeden taranır)
+_PADDING = re.compile(r'\x00\s+')
+
+# BMP karakterlerinin adresteki sınıfı: 0 geçersiz, _LOCAL yalnızca @
+# öncesinde geçerli, _ANYWHERE her yerde geçerli (harf ve rakamlar,
+# uluslararası adresler için ASCII dışındakiler de), _MARK @ ve ayırıcı
+_LOCAL, _ANYWHERE, _MARK = 1, 2, 3
+_CHAR_CLASSES = np.array([_ANYWHERE if char.isalnum() else 0 for char in map(chr, range(0x10000))],
+                         dtype=np.uint8)
+_CHAR_CLASSES[[ord(char) for char in "!#$%&'*+/=?^_`{|}~"]] = _LOCAL
+_CHAR_CLASSES[[ord('.'), ord('-')]] = _ANYWHERE
+_CHAR_CLASSES[[0, ord('@')]] = _MARK
+
+def _join(addresses: List[str]) -> str:
+    text = _SEPARATOR.join(addresses)
+    if text.count(_SEPARATOR) != len(addresses) - 1:
+        # Ayırıcı karakteri içeren değerler (pratikte görülmez) önce temizlenir
+        text = _SEPARATOR.join(address.replace(_SEPARATOR, ' ') for address in addresses)
+    return text
+
+def normalize_addresses(addresses: List[str]) -> List[str]:
+    """
+    Adresleri küçük harfe çevirir ve baştaki/sondaki boşlukları atar
+
+    Tüm adresler tek metinde birleştirilip tek seferde işlenir; adres
+    başına yalnızca sonuç listesinin oluşturulması kalır.
+    """
+    if not addresses:
+        return []
+    text = _SEPARATOR + _join(addresses).lower() + _SEPARATOR
+    text = _PADDING.sub(_SEPARATOR, _PADDING.sub(_SEPARATOR, text)[::-1])[::-1]
+    return text[1:-1].split(_SEPARATOR)
+
+def parse_emails(addresses: pd.Series) -> pd.DataFrame:
+    """
+    Adresleri normalize edip geçerliliklerini ve alan adlarını vektörel işlemlerle bulur
+
+    Geçerli adres: tek bir @, önünde en fazla 64 karakterlik harf, rakam ve
+    !#$%&'*+/=?^_`{|}~.- işaretleri, arkasında noktayla ayrılmış harf,
+    rakam ve tirelerden oluşan bir alan adı ve en az iki karakterlik son
+    kısım. Noktalar başta, sonda, @ yanında veya art arda olamaz; alan adı
+    parçaları tireyle başlayıp bitemez.
+
+    Args:
+        addresses: Düzleştirilmiş adresler (hücre başına bir değer)
+
+    Returns:
+        pd.DataFrame: address (normalize edilmiş), valid ve domain
+            (geçersiz adreslerde '') sütunları, girdiyle aynı indeksle
+    """
+    normalized = normalize_addresses(list(map(str, addresses.tolist())))
+    count = len(normalized)
+    if not count:
+        return pd.DataFrame({'address': [], 'valid': [], 'domain': []}, index=addresses.index).astype(
+            {'address': object, 'valid': bool, 'domain': object})
+
+    # Baştaki ve sondaki ayırıcılar her adresin iki yanında bir sınır karakteri olmasını sağlar
+    text = _SEPARATOR + _SEPARATOR.join(normalized) + _SEPARATOR
+    chars = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    boundaries = np.flatnonzero(chars == 0)
+    starts = boundaries[:-1] + 1
+    ends = boundaries[1:]
+
+    # Tüm metin yalnızca birkaç karşılaştırmayla taranır; kurallar seyrek
+    # karakterlerin (@, nokta, tire, geçersiz karakterler) konumlarında denetlenir
+    def locate(mask):
+        found = np.flatnonzero(mask)
+        return found, np.searchsorted(boundaries, found) - 1
+
+    def per_address(records):
+        return np.bincount(records, minlength=count)
+
+    ats, at_records = locate(chars == ord('@'))
+    at_index = ends.copy()
+    at_index[at_records] = ats
+
+    # BMP dışı karakterler (ör. emoji) tablodaki geçersiz U+FFFF'e düşer
+    classes = _CHAR_CLASSES[np.minimum(chars, 0xFFFF)]
+    _, bad_records = locate(classes == 0)
+    local_only, local_only_records = locate(classes == _LOCAL)
+    bad = per_address(bad_records) + per_address(local_only_records[local_only > at_index[local_only_records]])
+
+    dots, dot_records = locate(chars == ord('.'))
+    before, after = chars[dots - 1], chars[dots + 1]
+    bad_dots = ((before == 0) | (before == ord('@')) | (before == ord('.'))
+                | (after == 0) | (after == ord('@')))
+    hyphens, hyphen_records = locate(chars == ord('-'))
+    before, after = chars[hyphens - 1], chars[hyphens + 1]
+    bad_hyphens = ((hyphens > at_index[hyphen_records])
+                   & ((before == ord('.')) | (before == ord('@')) | (after == 0) | (after == ord('.'))))
+    bad += per_address(dot_records[bad_dots]) + per_address(hyphen_records[bad_hyphens])
+
+    in_domain = dots > at_index[dot_records]
+    domain_dots = dots[in_domain]
+    # Son kısım: adresin sonundan önceki son alan adı noktasından sonrası
+    last_dot = domain_dots[np.maximum(np.searchsorted(domain_dots, ends) - 1, 0)] if len(domain_dots) else ends
+    local_length = at_index - starts
+    valid = ((per_address(at_records) == 1) & (bad == 0) & (per_address(dot_records[in_domain]) > 0)
+             & (local_length >= 1) & (local_length <= MAX_LOCAL_LENGTH)
+             & (ends - last_dot - 1 >= 2) & (ends - starts <= MAX_ADDRESS_LENGTH))
+
+    # Alan adları: geçerli adreslerin @ sonrası karakterleri ayırıcılarla
+    # birlikte tek metinde toplanıp bölünür
+    steps = np.zeros(len(chars), dtype=np.int8)
+    steps[at_index[valid] + 1] = 1
+    steps[ends[valid]] = -1
+    kept = chars[(np.cumsum(steps, dtype=np.int8) != 0) | (chars == 0)]
+    domains = kept.tobytes().decode('utf-32-le').split(_SEPARATOR)[1:-1]
+    return pd.DataFrame({'address': normalized, 'valid': valid, 'domain': domains}, index=addresses.index)
+
+def _single_rows(positions: np.ndarray, count: int) -> np.ndarray:
+    """Düzleştirilmiş değerlerden satırının tek değeri olanlar"""
+    return np.bincount(positions, minlength=count)[positions] == 1
+
+def _shared_rows(positions: np.ndarray, values: np.ndarray, single: np.ndarray) -> Dict[int, List[str]]:
+    """Birden çok değeri olan satırlar -> değerleri (sırasıyla)"""
+    groups = {}
+    shared = ~single
+    for row, value in zip(positions[shared].tolist(), values[shared].tolist()):
+        groups.setdefault(row, []).append(value)
+    return groups
+
+def _addresses(flat: pd.Series) -> np.ndarray:
+    return np.array(normalize_addresses(list(map(str, flat.tolist()))), dtype=object)
+
+def normalize_emails(emails: pd.Series) -> pd.Series:
+    """
+    Kişilerin e-posta adreslerini küçük harfe çevirir ve boşluklarını atar;
+    boş kalan ve aynı hücrede tekrar eden adresler silinir
+
+    Tek adresli hücrelerin demetleri toplu olarak oluşturulur; yalnızca
+    birden çok adresi olan hücreler tek tek işlenir.
+    """
+    positions, flat = flatten_values(emails)
+    addresses = _addresses(flat)
+    single = _single_rows(positions, len(emails))
+    cells = np.empty(len(emails), dtype=object)
+    cells.fill(())
+    filled = single & (addresses != '')
+    cells[positions[filled]] = np.fromiter(zip(addresses[filled].tolist()), dtype=object, count=filled.sum())
+    for row, values in _shared_rows(positions, addresses, single).items():
+        cells[row] = tuple(dict.fromkeys(filter(None, values)))
+    return pd.Series(cells, index=emails.index, name=emails.name)
+
+def email_keys(emails: pd.Series) -> pd.DataFrame:
+    """Geçerli adreslerin normalize edilmiş halleri: (satır konumu, adres)"""
+    positions, flat = flatten_values(emails)
+    parts = parse_emails(flat)
+    valid = parts['valid'].to_numpy()
+    return pd.DataFrame({'pos': positions[valid], 'key': parts['address'].to_numpy()[valid]})
+
+def invalid_emails(emails: pd.Series) -> pd.Series:
+    """Geçersiz biçimde en az bir e-posta adresi olan kişiler (boş değerler sayılmaz)"""
+    positions, flat = flatten_values(emails)
+    parts = parse_emails(flat)
+    invalid = ~parts['valid'].to_numpy() & (parts['address'].to_numpy() != '')
+    result = np.zeros(len(emails), dtype=bool)
+    result[positions[invalid]] = True
+    return pd.Series(result, index=emails.index)
+
+def cell_key(value) -> Optional[str]:
+    """Tek hücrenin tekrar anahtarı (adresi olmayan hücrede None); duplicate_keys ile aynıdır"""
+    addresses = sorted({address.strip().lower() for address in as_values(value)} - {''})
+    return ';'.join(addresses) if addresses else None
+
+def duplicate_keys(emails: pd.Series) -> pd.Series:
+    """
+    Kişilerin tekrar anahtarları: normalize edilmiş adreslerinin sıralı
+    listesi (adres sırası ve büyük/küçük harf fark etmez; adresi olmayan
+    kişilerde '')
+
+    Tek adresli kişilerde anahtar adresin kendisidir; yalnızca birden çok
+    adresi olan kişilerin adresleri ayrıca sıralanır.
+    """
+    positions, flat = flatten_values(emails)
+    addresses = _addresses(flat)
+    single = _single_rows(positions, len(emails))
+    keys = np.full(len(emails), '', dtype=object)
+    keys[positions[single]] = addresses[single]
+    for row, values in _shared_rows(positions, addresses, single).items():
+        keys[row] = ';'.join(sorted(set(values) - {''}))
+    return pd.Series(keys, index=emails.index)
+
+def domain_index(emails: pd.Series) -> Dict[str, np.ndarray]:
+    """
+    Alan adı -> o alan adında geçerli adresi olan kişilerin satır konumları
+
+    Gruplama tamsayı kodlarının sıralanmasıyla yapılır; adres başına
+    sözlük işlemi yoktur.
+    """
+    positions, flat = flatten_values(emails)
+    parts = parse_emails(flat)
+    valid = parts['valid'].to_numpy()
+    positions = positions[valid]
+    codes, domains = pd.factorize(parts['domain'].to_numpy()[valid])
+    # Aynı kişinin aynı alan adında birden çok adresi tek sayılır; yalnızca
+    # birden çok geçerli adresi olan (az sayıdaki) kişilere bakılır
+    shared = ~_single_rows(positions, len(emails))
+    if shared.any():
+        pairs = pd.DataFrame({'code': codes[shared], 'pos': positions[shared]})
+        keep = np.ones(len(codes), dtype=bool)
+        keep[np.flatnonzero(shared)[pairs.duplicated().to_numpy()]] = False
+        codes, positions = codes[keep], positions[keep]
+    order = np.argsort(codes, kind='stable')
+    codes, positions = codes[order], positions[order]
+    boundaries = np.searchsorted(codes, np.arange(1, len(domains)))
+    return dict(zip(domains.tolist(), np.split(positions, boundaries)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the e-mail addresses of a VCF file")
+    parser.add_argument('file', help="VCF file")
+    parser.add_argument('-o', '--output', help="Write the contacts with invalid addresses to a CSV file")
+    parser.add_argument('--domains', type=int, default=10, metavar='N', help="Show the N most common domains")
+    args = parser.parse_args(argv)
+
+    df = VCFHandler().parse_vcf(args.file)
+    positions, flat = flatten_values(df['E-mail'])
+    parts = parse_emails(flat)
+    invalid = parts[~parts['valid']]
+    print(f"{len(df)} contacts, {len(parts)} e-mail addresses, {len(invalid)} invalid")
+
+    domains = sorted(domain_index(df['E-mail']).items(), key=lambda item: -len(item[1]))
+    for domain, rows in domains[:args.domains]:
+        print(f"{len(rows):>8}  {domain}")
+
+    if args.output:
+        invalid_rows = ~parts['valid'].to_numpy()
+        report = pd.DataFrame({'Name': df['Name'].iloc[positions[invalid_rows]].to_numpy(),
+                               'E-mail': flat.to_numpy()[invalid_rows]})
+        with compression.open_file(args.output, 'wt', newline='') as f:
+            report.to_csv(f, index=False)
+        print(f"Invalid addresses written to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+import re
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import pandas as pd
+import casing
+from multivalue import is_multi_value, map_values
+
+@dataclass
+class ReplaceRule:
+    """Tek bir bul → değiştir kuralı"""
+    search: str
+    replace: str = ''
+    regex: bool = False
+
+def _trie_pattern(words: Iterable[str], char_pattern=re.escape) -> str:
+    """
+    Kelime listesinden trie yapısında bir regex üretir
+
+    Ortak önekler paylaşıldığı için yüzlerce kural tek bir desende, her
+    konumda en uzun eşleşme önce denenerek tek geçişte aranır. Her karakter
+    char_pattern ile desene çevrilir (ör. büyük/küçük harf duyarsız sınıf).
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        end = '' in node
+        branches = [char_pattern(char) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not end:
+            return branches[0]
+        body = '(?:' + '|'.join(branches) + ')'
+        return body + '?' if end else body
+
+    return build(trie)
+
+def _lookup_ignorecase(mapping: Dict[str, str], text: str) -> str:
+    """
+    Türkçe kurallarla küçük harfe çevrilmiş anahtarlarla arama yapar;
+    küçük harfi anahtardan farklı olan karakterler (ör. 'ς') için tek tek
+    karşılaştırır
+    """
+    try:
+        return mapping[casing.lower_text(text)]
+    except KeyError:
+        for key, replacement in mapping.items():
+            if re.fullmatch(casing.caseless_pattern(key), text):
+                return replacement
+    return text
+
+class FindReplaceEngine:
+    """
+    Birden fazla sütunda çalışan bul/değiştir motoru
+
+    Ardışık düz metin kuralları tek bir desende birleştirilir ve tek
+    geçişte uygulanır; regex kuralları (yakalama grupları dahil) sırayla
+    derlenmiş desenle uygulanır.
+    """
+
+    def __init__(self, rules: Sequence, case_sensitive: bool = False):
+        self.rules = [rule if isinstance(rule, ReplaceRule) else ReplaceRule(**rule)
+                      for rule in rules]
+        self.case_sensitive = case_sensitive
+        self._passes = self._compile()
+
+    def _compile(self) -> List[Tuple[re.Pattern, object]]:
+        # re.IGNORECASE Türkçe i/ı/İ/I için yanlış eşleştirir; desenler casing ile kurulur
+        passes = []
+        literals = {}
+
+        def flush():
+            if not literals:
+                return
+            mapping = dict(literals)
+            if self.case_sensitive:
+                pattern = re.compile(_trie_pattern(mapping))
+                passes.append((pattern, lambda m: mapping[m.group(0)]))
+            else:
+                pattern = re.compile(_trie_pattern(mapping, casing.caseless_pattern))
+                passes.append((pattern, lambda m: _lookup_ignorecase(mapping, m.group(0))))
+            literals.clear()
+
+        for rule in self.rules:
+            if not rule.search:
+                continue
+            if rule.regex:
+                flush()
+                search = rule.search if self.case_sensitive else casing.caseless_regex(rule.search)
+                passes.append((re.compile(search), rule.replace))
+            else:
+                key = rule.search if self.case_sensitive else casing.lower_text(rule.search)
+                literals[key] = rule.replace
+        flush()
+        return passes
+
+    def to_dict(self) -> Dict:
+        return {'rules': [asdict(rule) for rule in self.rules],
+                'case_sensitive': self.case_sensitive}
+
+    def apply(self, values: pd.Series) -> pd.Series:
+        """Tüm kuralları bir sütuna uygular (çok değerli hücrelerde her değere ayrı ayrı)"""
+        if is_multi_value(values):
+            return map_values(values, self.apply)
+        for pattern, replacement in self._passes:
+            values = values.str.replace(pattern, replacement, regex=True)
+        return values
+
+    def apply_frame(self, df: pd.DataFrame, columns: Sequence[str],
+                    rows: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """Kuralları seçili satır ve sütunlara uygular, yeni DataFrame döndürür"""
+        result = df.copy()
+        labels = df.index if rows is None else df.index[list(rows)]
+        for column in columns:
+            result.loc[labels, column] = self.apply(df.loc[labels, column])
+        return result
+
+    def count_matches(self, df: pd.DataFrame, columns: Sequence[str],
+                      rows: Optional[Sequence[int]] = None) -> Dict[str, Tuple[int, int]]:
+        """
+        Değişiklik yapmadan eşleşmeleri sayar (kurallar orijinal değerlere
+        ayrı ayrı uygulanır)
+
+        Returns:
+            Dict: sütun -> (eşleşen hücre sayısı, toplam eşleşme sayısı)
+        """
+        labels = df.index if rows is None else df.index[list(rows)]
+        counts = {}
+        for column in columns:
+            values = df.loc[labels, column]
+            multi_value = is_multi_value(values)
+            matched = pd.Series(False, index=values.index)
+            total = 0
+            for pattern, _ in self._passes:
+                if multi_value:
+                    per_cell = map_values(values, lambda flat: flat.str.count(pattern)).map(sum)
+                else:
+                    per_cell = values.str.count(pattern).fillna(0)
+                matched |= per_cell > 0
+                total += int(per_cell.sum())
+            counts[column] = (int(matched.sum()), total)
+        return counts
+
+def load_rules(filepath: str) -> List[ReplaceRule]:
+    """
+    Kuralları dosyadan okur
+
+    CSV dosyalarında ilk iki sütun (arama, yeni metin) kullanılır; metin
+    dosyalarında her satır 'arama => yeni metin' biçimindedir.
+    """
+    if filepath.endswith('.csv'):
+        rules_df = pd.read_csv(filepath, header=None, dtype=str, keep_default_na=False)
+        if rules_df.shape[1] < 2:
+            rules_df[1] = ''
+        return [ReplaceRule(search, replace)
+                for search, replace in zip(rules_df[0], rules_df[1]) if search]
+
+    rules = []
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line.strip():
+                continue
+            search, _, replace = line.partition('=>')
+            rules.append(ReplaceRule(search.strip(), replace.strip()))
+    return rules
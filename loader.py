@@ -0,0 +1,36 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from vcf_handler import VCFHandler
+
+class VCFLoader(QThread):
+    """
+    VCF dosyasını arka planda okur ve kişileri parçalar halinde gönderir
+
+    Parçalar batchLoaded sinyaliyle arayüz iş parçacığına iletilir; okuma
+    bitince QThread.finished yayılır.
+    """
+    batchLoaded = pyqtSignal(object)
+    loadFailed = pyqtSignal(str)
+
+    def __init__(self, filepath, handler=None, parent=None):
+        super().__init__(parent)
+        self.filepath = filepath
+        self.handler = handler or VCFHandler()
+
+    def run(self):
+        try:
+            for batch in self.handler.iter_batches(self.filepath):
+                if self.isInterruptionRequested():
+                    return
+                self.batchLoaded.emit(batch)
+        except Exception as e:
+            self.loadFailed.emit(str(e))
+
+    def stop(self):
+        """Okumayı durdurur ve bekleyen parçaların iletilmesini engeller"""
+        for signal in (self.batchLoaded, self.loadFailed, self.finished):
+            try:
+                signal.disconnect()
+            except TypeError:
+                pass
+        self.requestInterruption()
+        self.wait()
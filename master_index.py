@@ -0,0 +1,252 @@
+import argparse
+import os
+import sqlite3
+import time
+from typing import Optional
+import numpy as np
+import pandas as pd
+import casing
+from batch import collect_files
+from multivalue import flatten_values, format_column
+from emails import email_keys
+from operations import parse_phones
+from vcf_handler import VCFHandler, content_hash
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser('~'), '.vcf_editor', 'history.sqlite')
+
+# Anahtar türleri; bir kişi birden çok kayıtla eşleşirse öncelik bu sıradadır
+KEY_KINDS = ['phone', 'email', 'name']
+
+# Eşleşme türü -> raporda gösterilen metin
+MATCH_LABELS = {'phone': "Phone", 'email': "E-mail", 'name': "Name"}
+
+# Kontrol raporunun sütunları
+CHECK_COLUMNS = ['Match', 'Known Name', 'Known Phone', 'Known Source']
+
+# Yerel telefon numarasının en az hane sayısı; daha kısa numaralar (kısa
+# kodlar, eksik girilmiş numaralar) yanlış eşleşme üretmemesi için dizine alınmaz
+MIN_PHONE_DIGITS = 7
+
+# Toplu işlemde değerler bu karakterle tek bir metinde birleştirilir
+_SEPARATOR = '\x00'
+
+# İsim anahtarlarında kelime sayılan (harf veya rakam) BMP karakterleri; diğerleri boşluk olur
+_WORD_CHARS = np.array([char.isalnum() for char in map(chr, range(0x10000))], dtype=bool)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    phone TEXT,
+    email TEXT,
+    source TEXT,
+    added REAL,
+    hash INTEGER UNIQUE
+);
+CREATE TABLE IF NOT EXISTS keys (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    contact_id INTEGER NOT NULL,
+    PRIMARY KEY (kind, key, contact_id)
+) WITHOUT ROWID;
+"""
+
+def phone_keys(phones: pd.Series) -> pd.DataFrame:
+    """
+    Telefon anahtarları: yalnızca rakamlar, normalize_phone gibi baştaki
+    0 ve 90 atılarak (0532..., +90 532... ve 532... aynı anahtarı alır)
+    """
+    positions, flat = flatten_values(phones)
+    parts = parse_phones(flat)
+    keep = (parts['local_count'] >= MIN_PHONE_DIGITS).to_numpy()
+    return pd.DataFrame({'pos': positions[keep], 'key': parts['local'].to_numpy()[keep]})
+
+def name_keys(names: pd.Series) -> pd.DataFrame:
+    """
+    İsim gruplama anahtarları: Türkçe kurallarla küçük harfe çevrilmiş,
+    noktalaması atılmış ve kelimeleri sıralanmış isim ("Veli, Ali" ile
+    "ali veli" aynı anahtarı alır). Tek kelimelik isimler çok sayıda ilgisiz
+    kişiyle eşleşeceği için dizine alınmaz.
+    """
+    values = [value if isinstance(value, str) else '' for value in names.tolist()]
+    if not values:
+        return pd.DataFrame({'pos': np.zeros(0, dtype=np.int64), 'key': []})
+    if _SEPARATOR.join(values).count(_SEPARATOR) != len(values) - 1:
+        # Ayırıcı karakteri içeren isimler (pratikte görülmez) önce temizlenir
+        values = [value.replace(_SEPARATOR, ' ') for value in values]
+    text = _SEPARATOR.join(casing.lower(pd.Series(values, dtype=object)).tolist())
+    # Noktalama tüm sütun tek karakter dizisinde tablo aramasıyla boşluğa çevrilir
+    chars = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).copy()
+    is_word = np.zeros(len(chars), dtype=bool)
+    in_bmp = chars < len(_WORD_CHARS)
+    is_word[in_bmp] = _WORD_CHARS[chars[in_bmp]]
+    chars[~is_word & (chars != 0)] = ord(' ')
+    records = chars.tobytes().decode('utf-32-le').split(_SEPARATOR)
+    keys = [' '.join(sorted(value.split())) for value in records]
+    keep = np.fromiter((' ' in key for key in keys), dtype=bool, count=len(keys))
+    return pd.DataFrame({'pos': np.flatnonzero(keep), 'key': [key for key, kept in zip(keys, keep) if kept]})
+
+def contact_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Tüm anahtarlar: (satır konumu, tür, anahtar), tekrarlar atılmış"""
+    frames = []
+    for kind, func, column in (('phone', phone_keys, 'Phone'), ('email', email_keys, 'E-mail'),
+                               ('name', name_keys, 'Name')):
+        if column in df.columns:
+            frames.append(func(df[column]).assign(kind=kind))
+    if not frames:
+        return pd.DataFrame(columns=['pos', 'key', 'kind'])
+    return pd.concat(frames, ignore_index=True).drop_duplicates()
+
+class MasterIndex:
+    """
+    Daha önce kaydedilmiş tüm kişilerin kalıcı anahtar dizini
+
+    Her kişi için normalize edilmiş telefonlar, e-postalar ve isim gruplama
+    anahtarı tek bir (tür, anahtar) B-ağacında tutulur. Yeni dosyalar
+    geçici bir tabloya yazılıp tek sorguyla dizinde aranır; böylece on
+    binlerce kişi milyonlarca kişilik geçmişe karşı anahtar başına bir
+    dizin aramasıyla kontrol edilir. Aynı içerikli kişiler (içerik özeti)
+    bir kez eklenir, yani aynı dosyayı tekrar kaydetmek dizini büyütmez.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def count(self) -> int:
+        """Dizindeki kişi sayısı"""
+        return self._conn.execute('SELECT COUNT(*) FROM contacts').fetchone()[0]
+
+    def _load_keys(self, table: str, keys: pd.DataFrame) -> None:
+        self._conn.execute(f'DROP TABLE IF EXISTS temp.{table}')
+        self._conn.execute(f'CREATE TEMP TABLE {table} (pos INTEGER, kind TEXT, key TEXT)')
+        self._conn.executemany(
+            f'INSERT INTO temp.{table} VALUES (?, ?, ?)',
+            zip(keys['pos'].tolist(), keys['kind'].tolist(), keys['key'].tolist()))
+
+    def add(self, df: pd.DataFrame, source: str = '') -> int:
+        """
+        Kişileri ve anahtarlarını dizine ekler (kaydedilen her dosyadan sonra çağrılır)
+
+        Returns:
+            int: Dizine yeni eklenen kişi sayısı
+        """
+        if df.empty:
+            return 0
+        hashes = content_hash(df).astype(np.uint64).view(np.int64)
+        unique = ~pd.Series(hashes).duplicated().to_numpy()
+        positions = np.flatnonzero(unique)
+        rows = df.iloc[positions]
+        keys = contact_keys(rows)
+        keys['pos'] = positions[keys['pos'].to_numpy()]
+
+        added = time.time()
+        with self._conn:
+            self._conn.execute('DROP TABLE IF EXISTS temp.incoming')
+            self._conn.execute('CREATE TEMP TABLE incoming (pos INTEGER PRIMARY KEY, hash INTEGER)')
+            self._conn.executemany('INSERT INTO temp.incoming VALUES (?, ?)',
+                                   zip(positions.tolist(), hashes[positions].tolist()))
+            inserted = self._conn.executemany(
+                'INSERT OR IGNORE INTO contacts (name, phone, email, source, added, hash) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                zip(rows['Name'].where(rows['Name'].notna(), None).tolist(),
+                    format_column(rows['Phone']).tolist(), format_column(rows['E-mail']).tolist(),
+                    [source] * len(rows), [added] * len(rows), hashes[positions].tolist())).rowcount
+            self._load_keys('incoming_keys', keys)
+            # Dizinde zaten bulunan kişilerin anahtarları da aynıdır; OR IGNORE onları atlar
+            self._conn.execute(
+                'INSERT OR IGNORE INTO keys (kind, key, contact_id) '
+                'SELECT k.kind, k.key, c.id FROM temp.incoming_keys k '
+                'JOIN temp.incoming i ON i.pos = k.pos JOIN contacts c ON c.hash = i.hash')
+            self._conn.execute('DROP TABLE temp.incoming')
+            self._conn.execute('DROP TABLE temp.incoming_keys')
+        return inserted
+
+    def add_file(self, filepath: str, handler: Optional[VCFHandler] = None) -> int:
+        """VCF dosyasındaki kişileri parça parça dizine ekler (dosya belleğe alınmaz)"""
+        handler = handler or VCFHandler()
+        return sum(self.add(batch, os.path.abspath(filepath))
+                   for batch in handler.iter_batches(filepath, first_batch=50000))
+
+    def check(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Kişileri dizinde arar
+
+        Returns:
+            pd.DataFrame: df ile aynı indeksli, CHECK_COLUMNS sütunlu rapor;
+                eşleşmeyen satırlarda Match boş metindir. Birden çok eşleşmede
+                telefon, e-posta ve isim sırasıyla ilki gösterilir.
+        """
+        report = pd.DataFrame('', index=df.index, columns=CHECK_COLUMNS)
+        keys = contact_keys(df)
+        if keys.empty:
+            return report
+
+        self._load_keys('probe', keys)
+        try:
+            # Her anahtar için (tür, anahtar) B-ağacında tek bir arama yapılır
+            found = pd.DataFrame(self._conn.execute(
+                'SELECT p.pos, p.kind, c.name, c.phone, c.source FROM ('
+                '  SELECT pos, kind, (SELECT contact_id FROM keys k WHERE k.kind = p.kind AND k.key = p.key '
+                '                     LIMIT 1) AS contact_id FROM temp.probe p'
+                ') p JOIN contacts c ON c.id = p.contact_id').fetchall(),
+                columns=['pos', 'kind', 'name', 'phone', 'source'])
+        finally:
+            self._conn.execute('DROP TABLE temp.probe')
+        if found.empty:
+            return report
+
+        found['priority'] = found['kind'].map(KEY_KINDS.index)
+        best = found.sort_values(['pos', 'priority']).drop_duplicates('pos')
+        positions = best['pos'].to_numpy()
+        report.iloc[positions, 0] = best['kind'].map(MATCH_LABELS).to_numpy()
+        report.iloc[positions, 1] = best['name'].fillna('').to_numpy()
+        report.iloc[positions, 2] = best['phone'].fillna('').to_numpy()
+        report.iloc[positions, 3] = best['source'].fillna('').to_numpy()
+        return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep a history index of saved contacts and check new files against it")
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help="History index file")
+    commands = parser.add_subparsers(dest='command', required=True)
+    add_parser = commands.add_parser('add', help="Add VCF files to the history")
+    add_parser.add_argument('location', nargs='+', help="VCF files, folders or glob patterns")
+    check_parser = commands.add_parser('check', help="Check a VCF file against the history")
+    check_parser.add_argument('file', help="VCF file to check")
+    check_parser.add_argument('-o', '--output', help="Write the matched contacts to this CSV file")
+    args = parser.parse_args(argv)
+
+    index = MasterIndex(args.index)
+    handler = VCFHandler()
+    try:
+        if args.command == 'add':
+            for location in args.location:
+                for path in collect_files(location):
+                    started = time.perf_counter()
+                    added = index.add_file(path, handler)
+                    print(f"{path}: {added} new contacts ({time.perf_counter() - started:.1f} s)")
+            print(f"History contains {index.count()} contacts")
+            return
+
+        df = handler.parse_vcf(args.file)
+        started = time.perf_counter()
+        report = index.check(df)
+        matched = report['Match'] != ''
+        print(f"{int(matched.sum())} of {len(df)} contacts are already in the history "
+              f"({time.perf_counter() - started:.1f} s)")
+        if args.output:
+            result = pd.concat([df[['Name', 'Phone', 'E-mail']], report], axis=1)[matched.to_numpy()]
+            handler.export_csv(result, args.output)
+    finally:
+        index.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+from itertools import chain
+from typing import Callable, Tuple
+import numpy as np
+import pandas as pd
+
+# Birden fazla değer alabilen kişi sütunları; değerler demet (tuple) olarak
+# tutulur. Tür sütunu telefonlarla aynı sıradadır (türü olmayan telefon için '').
+MULTI_VALUE_COLUMNS = ['Phone', 'E-mail', 'Type']
+
+# Tabloda ve CSV'de değerler bu ayırıcıyla birleştirilerek gösterilir
+DISPLAY_SEPARATOR = ';'
+
+def as_values(value) -> tuple:
+    """
+    Hücre değerini değer demetine çevirir
+
+    Eski sürümlerden kalan veya kullanıcının yazdığı ';' ile birleştirilmiş
+    metinler ayrılır; boş değerler boş demet olur.
+    """
+    if isinstance(value, tuple):
+        return value
+    if isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, str):
+        return tuple(value.split(DISPLAY_SEPARATOR)) if value else ()
+    return ()
+
+def format_value(value) -> str:
+    """Hücre değerini gösterim metnine çevirir (demetler ';' ile birleştirilir)"""
+    if isinstance(value, (tuple, list)):
+        return DISPLAY_SEPARATOR.join(value)
+    if value is None or pd.isna(value):
+        return ''
+    return str(value)
+
+def format_column(values: pd.Series) -> pd.Series:
+    """Sütunu gösterim metinlerine çevirir"""
+    array = values.to_numpy(dtype=object)
+    if pd.api.types.infer_dtype(array, skipna=True) in ('string', 'empty'):
+        # Yalnızca metin içeren sütunlarda eksik değerleri boş metin yapmak yeterlidir
+        formatted = np.where(pd.isna(array), '', array)
+    else:
+        formatted = [format_value(value) for value in array]
+    return pd.Series(formatted, index=values.index, name=values.name, dtype=object)
+
+def format_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Çok değerli sütunları gösterim metinlerine çevrilmiş bir kopya döndürür (ör. CSV için)"""
+    df = df.copy()
+    for column in MULTI_VALUE_COLUMNS:
+        if column in df.columns:
+            df[column] = format_column(df[column])
+    return df
+
+def is_multi_value(values: pd.Series) -> bool:
+    """Sütunda değer demetleri var mı?"""
+    return any(isinstance(value, tuple) for value in values)
+
+def flatten_values(values: pd.Series) -> Tuple[np.ndarray, pd.Series]:
+    """
+    Çok değerli hücreleri tek sütunda düzleştirir
+
+    Returns:
+        (konumlar, değerler): her değerin hücresinin satır konumu ve değerler
+    """
+    cells = [value if type(value) is tuple else as_values(value) for value in values.tolist()]
+    lengths = np.fromiter(map(len, cells), dtype=np.int64, count=len(cells))
+    flat = pd.Series(list(chain.from_iterable(cells)), dtype=object)
+    return np.repeat(np.arange(len(cells)), lengths), flat
+
+def map_values(values: pd.Series, func: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """
+    Metin sütunu işleyen bir fonksiyonu çok değerli hücrelerin tüm
+    değerlerine uygular
+
+    Değerler tek bir sütunda düzleştirilir, func bir kez çağrılır ve sonuç
+    hücrelere geri bölünür; böylece vektörel işlemler olduğu gibi kullanılır.
+    """
+    cells = [value if type(value) is tuple else as_values(value) for value in values.tolist()]
+    lengths = np.fromiter((len(cell) for cell in cells), dtype=np.int64, count=len(cells))
+    flat = pd.Series([value for cell in cells for value in cell], dtype=object)
+    mapped = func(flat).tolist()
+    bounds = np.concatenate(([0], np.cumsum(lengths))).tolist()
+    result = [tuple(mapped[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+    return pd.Series(result, index=values.index, name=values.name, dtype=object)
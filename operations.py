@@ -0,0 +1,157 @@
+import re
+import numpy as np
+import pandas as pd
+import casing
+import emails
+import similarity
+from multivalue import map_values
+
+# Tekrar kontrolü modları
+DUPLICATE_MODES = {
+    'name_phone': "Exact Match (Name + Phone)",
+    'fuzzy_name': "Fuzzy Name Match",
+    'phone': "Exact Phone Match",
+    'email': "Exact E-mail Match",
+}
+
+def normalize_phone(phone):
+    """Normalizes phone numbers by removing non-digit characters and ensuring proper format"""
+    if pd.isna(phone):
+        return phone
+
+    # Remove all non-digit characters
+    digits = re.sub(r'\D', '', str(phone))
+
+    # If empty after cleaning, return original
+    if not digits:
+        return phone
+
+    # If starts with 0, remove it
+    if digits.startswith('0'):
+        digits = digits[1:]
+
+    # If starts with 90, remove it
+    if digits.startswith('90'):
+        digits = digits[2:]
+
+    # If less than 10 digits, return original
+    if len(digits) < 10:
+        return phone
+
+    # Format as +90 5XX XXX XX XX
+    if len(digits) == 10:
+        return f"+90 {digits[:3]} {digits[3:6]} {digits[6:8]} {digits[8:]}"
+
+    return phone
+
+# Telefon numaralarında rakamlar dışında bulunabilen karakterler
+_PHONE_PUNCTUATION = np.array([ord(char) for char in ' +-().'], dtype=np.uint32)
+
+# Toplu işlemde değerler bu karakterle tek bir metinde birleştirilir
+_SEPARATOR = '\x00'
+
+def parse_phones(phones: pd.Series) -> pd.DataFrame:
+    """
+    Telefon değerlerini çözümler; tüm değerler tek bir karakter dizisinde
+    birleştirilip numpy ile tek geçişte işlenir
+
+    Returns:
+        pd.DataFrame: phones ile aynı indeksli; 'digits' (yalnızca rakamlar),
+            'local' (normalize_phone gibi baştaki 0 ve 90 atılmış rakamlar),
+            bunların uzunlukları 'digit_count' ve 'local_count', 'plus' ('+'
+            içeriyor mu) ve 'other' (rakam ve noktalama dışında karakter, ör.
+            harf içeriyor mu) sütunları
+    """
+    count = len(phones)
+    if not count:
+        return pd.DataFrame({'digits': [], 'local': [], 'digit_count': [], 'local_count': [],
+                             'plus': [], 'other': []}, index=phones.index).astype(
+            {'digit_count': np.int64, 'local_count': np.int64, 'plus': bool, 'other': bool})
+    values = [value if isinstance(value, str) else '' for value in phones.tolist()]
+    chars = np.frombuffer(_SEPARATOR.join(values).encode('utf-32-le'), dtype=np.uint32)
+    is_separator = chars == 0
+    if np.count_nonzero(is_separator) != count - 1:
+        # Ayırıcı karakteri içeren değerler (pratikte görülmez) temizlenir
+        values = [value.replace(_SEPARATOR, '') for value in values]
+        chars = np.frombuffer(_SEPARATOR.join(values).encode('utf-32-le'), dtype=np.uint32)
+        is_separator = chars == 0
+    record = np.cumsum(is_separator)
+    is_digit = (chars >= ord('0')) & (chars <= ord('9'))
+    plus = np.bincount(record[chars == ord('+')], minlength=count) > 0
+    other = np.bincount(record[~(is_digit | is_separator | np.isin(chars, _PHONE_PUNCTUATION))],
+                        minlength=count) > 0
+
+    # Rakamlar ayırıcılarla birlikte tutulur; her değerin rakamlarının başı ve sonu ayırıcılardan bulunur
+    kept = chars[is_digit | is_separator]
+    separators = np.flatnonzero(kept == 0)
+    starts = np.concatenate(([0], separators + 1))
+    ends = np.append(separators, len(kept))
+    padded = np.append(kept, np.zeros(2, dtype=np.uint32))
+    zero = (ends > starts) & (padded[starts] == ord('0'))
+    rest = starts + zero
+    ninety = (ends - rest >= 2) & (padded[rest] == ord('9')) & (padded[rest + 1] == ord('0'))
+    dropped = np.zeros(len(padded), dtype=bool)
+    dropped[starts[zero]] = True
+    dropped[rest[ninety]] = True
+    dropped[rest[ninety] + 1] = True
+    local = padded[:len(kept)][~dropped[:len(kept)]]
+
+    return pd.DataFrame({
+        'digits': kept.tobytes().decode('utf-32-le').split(_SEPARATOR),
+        'local': local.tobytes().decode('utf-32-le').split(_SEPARATOR),
+        'digit_count': ends - starts,
+        'local_count': ends - rest - 2 * ninety,
+        'plus': plus,
+        'other': other,
+    }, index=phones.index)
+
+def normalize_phones(phones: pd.Series) -> pd.Series:
+    """Kişilerin tüm telefon numaralarını normalize eder"""
+    return map_values(phones, lambda values: values.map(normalize_phone))
+
+def title_case(names: pd.Series) -> pd.Series:
+    """İsimleri baş harfleri büyük olacak şekilde düzenler"""
+    return casing.title_case(names)
+
+def last_word_upper(names: pd.Series) -> pd.Series:
+    """İsimlerin son kelimesini büyük harfe çevirir"""
+    return casing.last_word_upper(names)
+
+def append_code(names: pd.Series, code: str, position: str = 'end') -> pd.Series:
+    """İsimlerin başına veya sonuna kod ekler"""
+    if position == 'start':
+        return code + " " + names
+    return names + " " + code
+
+def replace_text(names: pd.Series, search: str, replace: str = '') -> pd.Series:
+    """Büyük/küçük harf duyarsız metin değiştirme veya silme"""
+    return names.str.replace(casing.caseless_pattern(search), replace.replace('\\', '\\\\'), regex=True)
+
+def find_duplicates(df: pd.DataFrame, mode: str = 'name_phone', threshold: int = 80) -> pd.Series:
+    """
+    Tekrar eden kayıtları işaretler (ilk kayıt korunur)
+
+    Args:
+        df: Kontrol edilecek kayıtlar
+        mode: 'name_phone', 'phone', 'email' veya 'fuzzy_name'
+        threshold: Bulanık eşleşme için benzerlik eşiği (0-100)
+
+    Returns:
+        pd.Series: Tekrar eden satırlar için True
+    """
+    if mode == 'name_phone':
+        return df.duplicated(subset=['Name', 'Phone'], keep='first')
+    if mode == 'phone':
+        return df.duplicated(subset=['Phone'], keep='first')
+    if mode == 'email':
+        # Adresi olmayan kişiler birbirinin tekrarı sayılmaz
+        keys = emails.duplicate_keys(df['E-mail'])
+        return keys.duplicated(keep='first') & (keys != '')
+    if mode != 'fuzzy_name':
+        raise ValueError(f"Unknown duplicate mode: {mode}")
+
+    # Çiftler sıra numaralarıyla döner (indeks tekrarlı olabilir)
+    pairs = similarity.duplicate_pairs(df['Name'], 'ratio', min_score=threshold)
+    duplicates = np.zeros(len(df), dtype=bool)
+    duplicates[pairs.duplicates_at(threshold)] = True
+    return pd.Series(duplicates, index=df.index)
@@ -0,0 +1,131 @@
+import argparse
+import json
+from typing import Dict, List, Optional, Sequence
+import pandas as pd
+import emails
+import operations
+from find_replace import FindReplaceEngine
+
+# İşlem adı -> (sütun, fonksiyon)
+COLUMN_OPERATIONS = {
+    'title_case': ('Name', operations.title_case),
+    'last_word_upper': ('Name', operations.last_word_upper),
+    'append_code': ('Name', operations.append_code),
+    'replace_text': ('Name', operations.replace_text),
+    'normalize_phones': ('Phone', operations.normalize_phones),
+    'normalize_emails': ('E-mail', emails.normalize_emails),
+}
+
+# Birden fazla sütunda çalışan işlemler: ad -> sütun fonksiyonu üreten fabrika
+MULTI_COLUMN_OPERATIONS = {
+    'find_replace': lambda rules, case_sensitive=False: FindReplaceEngine(rules, case_sensitive).apply,
+}
+
+# Satır silen işlemler
+ROW_OPERATIONS = {'remove_duplicates'}
+
+class Pipeline:
+    """
+    Düzenleme işlemlerini bildirimsel bir tarif olarak kaydeder ve
+    seçili satırlar üzerinde tek geçişte uygular
+    """
+
+    def __init__(self, steps: Optional[List[Dict]] = None):
+        self.steps = []
+        for step in steps or []:
+            step = dict(step)
+            self.add(step.pop('op'), **step)
+
+    def add(self, op: str, **params) -> None:
+        """Tarife bir adım ekler"""
+        if op not in COLUMN_OPERATIONS and op not in MULTI_COLUMN_OPERATIONS and op not in ROW_OPERATIONS:
+            raise ValueError(f"Unknown operation: {op}")
+        self.steps.append({'op': op, **params})
+
+    def __len__(self):
+        return len(self.steps)
+
+    def to_dict(self) -> Dict:
+        return {'version': 1, 'steps': [dict(step) for step in self.steps]}
+
+    @classmethod
+    def from_dict(cls, recipe: Dict) -> 'Pipeline':
+        return cls(recipe.get('steps', []))
+
+    def save(self, filepath: str) -> None:
+        """Tarifi JSON dosyasına yazar"""
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, filepath: str) -> 'Pipeline':
+        """Tarifi JSON dosyasından okur"""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def apply(self, df: pd.DataFrame, rows: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """
+        Tarifi uygular ve yeni bir DataFrame döndürür
+
+        Her sütun seçili satırlar için bir kez okunur, tüm adımlar bu dilim
+        üzerinde sırayla çalışır ve sonuç tek seferde geri yazılır.
+
+        Args:
+            df: Kaynak veriler
+            rows: İşlenecek satırların konumları (None ise tüm satırlar)
+        """
+        labels = df.index if rows is None else df.index[list(rows)]
+        columns = {}
+        dropped = []
+
+        for step in self.steps:
+            params = {key: value for key, value in step.items() if key != 'op'}
+            if step['op'] in ROW_OPERATIONS:
+                current = df.loc[labels].assign(**columns)
+                duplicates = operations.find_duplicates(current, **params)
+                dropped.extend(labels[duplicates.to_numpy()])
+                labels = labels[~duplicates.to_numpy()]
+                columns = {name: values[~duplicates.to_numpy()] for name, values in columns.items()}
+                continue
+
+            if step['op'] in MULTI_COLUMN_OPERATIONS:
+                targets = params.pop('columns', ['Name'])
+                func = MULTI_COLUMN_OPERATIONS[step['op']](**params)
+                for column in targets:
+                    values = columns[column] if column in columns else df.loc[labels, column]
+                    columns[column] = func(values)
+                continue
+
+            column, func = COLUMN_OPERATIONS[step['op']]
+            values = columns[column] if column in columns else df.loc[labels, column]
+            columns[column] = func(values, **params)
+
+        result = df.drop(index=dropped) if dropped else df.copy()
+        for column, values in columns.items():
+            result.loc[labels, column] = values
+        return result
+
+def run_recipe(recipe_path: str, input_path: str, output_path: str,
+               ios_compatible: bool = False) -> pd.DataFrame:
+    """Bir tarifi arayüz olmadan VCF dosyasına uygular"""
+    from vcf_handler import VCFHandler
+
+    handler = VCFHandler()
+    df = handler.parse_vcf(input_path)
+    df = Pipeline.load(recipe_path).apply(df)
+    handler.export_vcf(df, output_path, ios_compatible)
+    return df
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply a recorded recipe to VCF files")
+    parser.add_argument('recipe', help="Recipe JSON file")
+    parser.add_argument('input', help="Input VCF file")
+    parser.add_argument('output', help="Output VCF file")
+    parser.add_argument('--ios', action='store_true', help="Save in iOS-compatible format")
+    args = parser.parse_args(argv)
+
+    df = run_recipe(args.recipe, args.input, args.output, args.ios)
+    print(f"Wrote {len(df)} contacts to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,327 @@
+import operator
+import re
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+import casing
+from casing import lower_text
+from multivalue import MULTI_VALUE_COLUMNS, as_values, format_column
+
+# Sorgu dili:
+#   ali                      herhangi bir sütunda geçen metin
+#   name:ali  phone:"532 1"  sütunda geçen metin (tırnak içinde boşluk kullanılabilir)
+#   name:=ali                değerlerden biri tam olarak eşit
+#   email:/@gmail\.com$/     regex (büyük/küçük harf duyarsız)
+#   has:email  empty:phone   değeri olan / olmayan kişiler
+#   count(phone)>1           değer sayısı karşılaştırması
+#   len(name)<3              gösterilen metnin uzunluğu
+#   a AND b, a b, a OR b, NOT a, -a, ( ... )
+# Öncelik sırası: NOT, AND, OR.
+
+# Sorguda kullanılabilen alan adları -> tablo sütunu
+FIELDS = {
+    'name': 'Name',
+    'phone': 'Phone', 'tel': 'Phone',
+    'email': 'E-mail', 'e-mail': 'E-mail', 'mail': 'E-mail',
+    'type': 'Type',
+}
+
+_COMPARISONS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+                '=': operator.eq, '!=': operator.ne}
+
+_TOKEN = re.compile(r'''
+    \s*(?:
+        (?P<lparen>\() | (?P<rparen>\)) |
+        (?P<func>count|len)\((?P<measure_field>[\w-]+)\)\s*(?P<op><=|>=|!=|=|<|>)\s*(?P<number>\d+) |
+        (?P<negate>-)(?=\S) |
+        (?:(?P<field>[\w-]+):)?(?P<exact>=)?(?:
+            "(?P<quoted>(?:[^"\\]|\\.)*)" |
+            /(?P<regex>(?:[^/\\]|\\.)*)/ |
+            (?P<word>[^\s()"]+)
+        )
+    )''', re.VERBOSE | re.IGNORECASE)
+
+_KEYWORDS = {'AND', 'OR', 'NOT'}
+
+class QueryError(ValueError):
+    """Sorgu sözdizimi hatası"""
+
+class QueryContext:
+    """
+    Sorgunun çalıştığı kişi tablosu
+
+    Sütunların küçük harfli metinleri, gösterim metinleri ve değer
+    sayıları bir kez hesaplanır; aynı sütunu kullanan tüm koşullar bunları
+    paylaşır. search_texts verilirse küçük harfli metinler oradan (ör.
+    tablo modelinin önbelleğinden) alınır.
+    """
+
+    def __init__(self, df: pd.DataFrame, search_texts: Optional[Callable[[str], np.ndarray]] = None):
+        self.df = df
+        self._search_texts = search_texts
+        self._lowered = {}
+        self._display = {}
+        self._counts = {}
+        self._flat = {}
+
+    def __len__(self):
+        return len(self.df)
+
+    def display(self, column: str) -> pd.Series:
+        if column not in self._display:
+            self._display[column] = format_column(self.df[column]).reset_index(drop=True)
+        return self._display[column]
+
+    def lowered(self, column: str) -> pd.Series:
+        if column not in self._lowered:
+            if self._search_texts is not None:
+                texts = pd.Series(self._search_texts(column), dtype=object)
+            else:
+                texts = casing.lower(self.display(column))
+            self._lowered[column] = texts
+        return self._lowered[column]
+
+    def flat(self, column: str):
+        """Çok değerli sütunun hücre başına değer sayıları ve düzleştirilmiş değerleri"""
+        if column not in self._flat:
+            cells = [as_values(cell) for cell in self.df[column]]
+            lengths = np.fromiter((len(cell) for cell in cells), dtype=np.int64, count=len(cells))
+            values = pd.Series([value for cell in cells for value in cell], dtype=object)
+            self._flat[column] = (lengths, values)
+        return self._flat[column]
+
+    def _per_cell(self, column: str, hits: np.ndarray) -> np.ndarray:
+        """Düzleştirilmiş değerler için hesaplanan sayıları hücre başına toplar"""
+        lengths, _ = self.flat(column)
+        totals = np.concatenate(([0], np.cumsum(hits, dtype=np.int64)))
+        ends = np.cumsum(lengths)
+        return totals[ends] - totals[ends - lengths]
+
+    def counts(self, column: str) -> np.ndarray:
+        """Hücre başına boş olmayan değer sayısı"""
+        if column not in self._counts:
+            if column in MULTI_VALUE_COLUMNS:
+                _, values = self.flat(column)
+                counts = self._per_cell(column, (values.str.strip() != '').to_numpy(dtype=np.int64))
+            else:
+                counts = (self.display(column).str.strip() != '').to_numpy(dtype=np.int64)
+            self._counts[column] = counts
+        return self._counts[column]
+
+    def values_equal(self, column: str, text: str) -> np.ndarray:
+        """Hücrenin değerlerinden biri (büyük/küçük harf duyarsız) metne eşit mi?"""
+        if column not in MULTI_VALUE_COLUMNS:
+            return (self.lowered(column) == text).to_numpy()
+        _, values = self.flat(column)
+        return self._per_cell(column, (casing.lower(values) == text).to_numpy(dtype=np.int64)) > 0
+
+class Node:
+    def mask(self, context: QueryContext) -> np.ndarray:
+        raise NotImplementedError
+
+class And(Node):
+    def __init__(self, children: List[Node]):
+        self.children = children
+
+    def mask(self, context):
+        result = self.children[0].mask(context)
+        for child in self.children[1:]:
+            result = result & child.mask(context)
+        return result
+
+class Or(Node):
+    def __init__(self, children: List[Node]):
+        self.children = children
+
+    def mask(self, context):
+        result = self.children[0].mask(context)
+        for child in self.children[1:]:
+            result = result | child.mask(context)
+        return result
+
+class Not(Node):
+    def __init__(self, child: Node):
+        self.child = child
+
+    def mask(self, context):
+        return ~self.child.mask(context)
+
+class Contains(Node):
+    def __init__(self, columns: List[str], text: str):
+        self.columns = columns
+        self.text = lower_text(text)
+
+    def mask(self, context):
+        result = np.zeros(len(context), dtype=bool)
+        for column in self.columns:
+            result |= context.lowered(column).str.contains(self.text, regex=False).to_numpy(dtype=bool)
+        return result
+
+class Equals(Node):
+    def __init__(self, columns: List[str], text: str):
+        self.columns = columns
+        self.text = lower_text(text)
+
+    def mask(self, context):
+        result = np.zeros(len(context), dtype=bool)
+        for column in self.columns:
+            result |= context.values_equal(column, self.text)
+        return result
+
+class Matches(Node):
+    def __init__(self, columns: List[str], pattern: str):
+        self.columns = columns
+        try:
+            self.pattern = re.compile(pattern, re.IGNORECASE)
+        except re.error as e:
+            raise QueryError(f"Invalid regular expression /{pattern}/: {e}") from e
+
+    def mask(self, context):
+        result = np.zeros(len(context), dtype=bool)
+        for column in self.columns:
+            result |= context.display(column).str.contains(self.pattern, regex=True).to_numpy(dtype=bool)
+        return result
+
+class HasValue(Node):
+    def __init__(self, column: str):
+        self.column = column
+
+    def mask(self, context):
+        return context.counts(self.column) > 0
+
+class Measure(Node):
+    def __init__(self, func: str, column: str, op: str, number: int):
+        self.func = func
+        self.column = column
+        self.compare = _COMPARISONS[op]
+        self.number = number
+
+    def mask(self, context):
+        if self.func == 'count':
+            values = context.counts(self.column)
+        else:
+            values = context.display(self.column).str.len().to_numpy()
+        return self.compare(values, self.number)
+
+def _column(field: str) -> str:
+    column = FIELDS.get(field.lower())
+    if column is None:
+        raise QueryError(f"Unknown field '{field}' (use one of: {', '.join(sorted(set(FIELDS)))})")
+    return column
+
+def _tokenize(text: str) -> List[Dict]:
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            raise QueryError(f"Unexpected character at position {position + 1}: {text[position:position + 10]!r}")
+        groups = {key: value for key, value in match.groupdict().items() if value is not None}
+        if (set(groups) == {'word'} and groups['word'].upper() in _KEYWORDS
+                and groups['word'].isupper()):
+            groups = {'keyword': groups['word'].upper()}
+        tokens.append(groups)
+        position = match.end()
+    return tokens
+
+class _Parser:
+    def __init__(self, tokens: List[Dict]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> Optional[Dict]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def next(self) -> Dict:
+        token = self.peek()
+        if token is None:
+            raise QueryError("Unexpected end of query")
+        self.position += 1
+        return token
+
+    def parse(self) -> Node:
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise QueryError("Unbalanced ')'")
+        return node
+
+    def parse_or(self) -> Node:
+        children = [self.parse_and()]
+        while self.peek() == {'keyword': 'OR'}:
+            self.next()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else Or(children)
+
+    def parse_and(self) -> Node:
+        children = [self.parse_not()]
+        while True:
+            token = self.peek()
+            if token is None or 'rparen' in token or token == {'keyword': 'OR'}:
+                break
+            if token == {'keyword': 'AND'}:
+                self.next()
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else And(children)
+
+    def parse_not(self) -> Node:
+        token = self.peek()
+        if token is not None and (token == {'keyword': 'NOT'} or 'negate' in token):
+            self.next()
+            return Not(self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self) -> Node:
+        token = self.next()
+        if 'lparen' in token:
+            node = self.parse_or()
+            token = self.peek()
+            if token is None or 'rparen' not in token:
+                raise QueryError("Missing ')'")
+            self.next()
+            return node
+        if 'rparen' in token or 'keyword' in token:
+            raise QueryError(f"Unexpected '{token.get('keyword', ')')}'")
+        if 'func' in token:
+            return Measure(token['func'].lower(), _column(token['measure_field']),
+                           token['op'], int(token['number']))
+
+        field = token.get('field')
+        if field is not None and field.lower() in ('has', 'empty'):
+            column = _column(token.get('word', ''))
+            node = HasValue(column)
+            return node if field.lower() == 'has' else Not(node)
+
+        word = token.get('word', '')
+        if field is None and word.endswith(':') and word[:-1].lower() in FIELDS:
+            raise QueryError(f"Missing value for '{word}'")
+        columns = [_column(field)] if field is not None else list(dict.fromkeys(FIELDS.values()))
+        if 'regex' in token:
+            return Matches(columns, token['regex'].replace('\\/', '/'))
+        text = token['quoted'].replace('\\"', '"') if 'quoted' in token else word
+        if 'exact' in token:
+            return Equals(columns, text)
+        return Contains(columns, text)
+
+class Query:
+    """Derlenmiş sorgu; mask() kişi tablosu için vektörel bir boolean maske üretir"""
+
+    def __init__(self, text: str):
+        self.text = text
+        tokens = _tokenize(text)
+        if not tokens:
+            raise QueryError("Empty query")
+        self._root = _Parser(tokens).parse()
+
+    def mask(self, df: pd.DataFrame, search_texts: Optional[Callable[[str], np.ndarray]] = None) -> np.ndarray:
+        return self._root.mask(QueryContext(df, search_texts))
+
+    def filter(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Sorguya uyan satırları döndürür"""
+        return df[self.mask(df)]
+
+def compile_query(text: str) -> Optional[Query]:
+    """Sorguyu derler; boş metin için None döndürür"""
+    if not text or not text.strip():
+        return None
+    return Query(text)
@@ -0,0 +1,439 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from pathlib import PurePath
+from typing import AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+import pandas as pd
+import similarity
+from batch import default_workers
+from operations import DUPLICATE_MODES
+from pipeline import Pipeline
+from vcf_handler import VCFHandler
+
+CHUNK_SIZE = 64 * 1024
+MAX_HEADER_LINES = 100
+# Hata yanıtından sonra istemcinin göndermeye devam ettiği gövde bu kadar süre okunup atılır
+LINGER_SECONDS = 5
+
+# İş -> varsayılan çıktı biçimi
+JOBS = {
+    'parse': 'csv',
+    'normalize': 'vcf',
+    'dedupe': 'vcf',
+    'match': 'csv',
+    'export': 'vcf',
+}
+
+# Çıktı biçimi -> içerik türü
+FORMATS = {'vcf': 'text/vcard', 'ios': 'text/vcard', 'csv': 'text/csv'}
+
+NORMALIZE_OPERATIONS = ('normalize_phones', 'normalize_emails', 'title_case', 'last_word_upper')
+MATCH_METHODS = ('exact', 'token_sort', 'token_set')
+
+class HTTPError(Exception):
+    """İstemciye durum koduyla döndürülecek hata"""
+
+    def __init__(self, status: int, message: str = '', headers: Optional[Dict[str, str]] = None):
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+        self.headers = headers or {}
+
+def run_job(job: str, source: str, output: str, params: Dict) -> int:
+    """
+    Bir işi alt süreçte çalıştırır ve sonucu output dosyasına yazar
+
+    Returns:
+        int: Sonuçtaki kişi sayısı (eşleştirmede eşleşme sayısı)
+    """
+    handler = VCFHandler()
+    try:
+        df = handler.parse_vcf(source)
+    except Exception as e:
+        # vobject hataları süreçler arasında taşınamayabilir
+        raise ValueError(f"Invalid VCF: {e}") from None
+
+    if job == 'match':
+        references = similarity.load_references(params['references'])
+        pairs = similarity.reference_matches(references, df['Name'].tolist(), params['method'],
+                                             limit=params['limit'], min_score=params['threshold'])
+        pd.DataFrame({'Reference': pairs.first, 'Name': pairs.second, 'Score': pairs.scores}
+                     ).to_csv(output, index=False)
+        return len(pairs)
+
+    if job == 'normalize':
+        df = Pipeline([{'op': op} for op in params['ops']]).apply(df)
+    elif job == 'dedupe':
+        df = Pipeline([{'op': 'remove_duplicates', 'mode': params['mode'],
+                        'threshold': params['threshold']}]).apply(df)
+
+    if params['format'] == 'csv':
+        handler.export_csv(df, output)
+    else:
+        handler.export_vcf(df, output, params['format'] == 'ios')
+    return len(df)
+
+def _int_param(query: Dict[str, str], name: str, default: int, low: int, high: int) -> int:
+    try:
+        value = int(query.get(name, default))
+    except ValueError:
+        raise HTTPError(400, f"'{name}' must be an integer") from None
+    if not low <= value <= high:
+        raise HTTPError(400, f"'{name}' must be between {low} and {high}")
+    return value
+
+def _choice_param(query: Dict[str, str], name: str, default: str, choices) -> str:
+    value = query.get(name, default)
+    if value not in choices:
+        raise HTTPError(400, f"'{name}' must be one of: {', '.join(choices)}")
+    return value
+
+class Service:
+    """
+    Ayrıştırma, normalleştirme, tekrar silme, eşleştirme ve dışa aktarma
+    işlerini yerel HTTP üzerinden sunan asyncio sunucusu
+
+    İstek gövdeleri parça parça geçici dosyalara yazılır. İşler süreç
+    havuzunda çalışır; aynı anda en fazla `workers` iş çalışır ve en fazla
+    `max_pending` iş sıra bekler. Sınır doluysa yeni işler gövdeleri
+    okunmadan 503 ile geri çevrilir. Sonuçlar istemci okudukça parça parça
+    gönderilir.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, max_upload: int = 1024 ** 3):
+        self.host = host
+        self.port = port
+        self.workers = workers or default_workers()
+        self.max_pending = 2 * self.workers if max_pending is None else max_pending
+        self.max_upload = max_upload
+        self._admitted = 0
+        self._running = 0
+        self._uploads: Dict[str, str] = {}
+        self._server = None
+        self._executor = None
+        self._slots = None
+        self._workdir = None
+
+    async def start(self) -> None:
+        """Sunucuyu başlatır; port 0 ise boş bir port seçilir"""
+        self._workdir = tempfile.mkdtemp(prefix='vcf_service_')
+        self._slots = asyncio.Semaphore(self.workers)
+        self._executor = self._new_executor()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=CHUNK_SIZE)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # Çağıran süreçteki iş parçacıkları nedeniyle fork güvenli değildir
+        return ProcessPoolExecutor(max_workers=self.workers,
+                                   mp_context=multiprocessing.get_context('spawn'))
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        """Yeni bağlantıları kapatır, süreç havuzunu durdurur ve geçici dosyaları siler"""
+        self._server.close()
+        await self._server.wait_closed()
+        await asyncio.get_running_loop().run_in_executor(
+            None, lambda: self._executor.shutdown(wait=True, cancel_futures=True))
+        shutil.rmtree(self._workdir, ignore_errors=True)
+        self._uploads.clear()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, path, query, headers = await self._read_head(reader)
+                await self._dispatch(method, path, query, headers, reader, writer)
+            except HTTPError as e:
+                await self._send_json(writer, e.status, {'error': str(e)}, e.headers)
+                await self._linger(reader, writer)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception as e:
+                await self._send_json(writer, 500, {'error': str(e)})
+                await self._linger(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # İstemci bağlantıyı kesti
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    async def _linger(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Okunmamış gövdeyi kısa bir süre okuyup atar; bağlantı hemen
+        kapatılırsa istemci yanıtı okuyamadan bağlantı sıfırlanır
+        """
+        if writer.can_write_eof():
+            writer.write_eof()
+
+        async def discard():
+            while await reader.read(CHUNK_SIZE):
+                pass
+
+        try:
+            await asyncio.wait_for(discard(), LINGER_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _read_head(self, reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], Dict[str, str]]:
+        """İstek satırını ve başlıkları okur"""
+        try:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionResetError("Connection closed before request")
+            parts = line.decode('latin-1').split()
+            if len(parts) != 3 or not parts[2].startswith('HTTP/1.'):
+                raise HTTPError(400, "Malformed request line")
+            headers = {}
+            for _ in range(MAX_HEADER_LINES):
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            else:
+                raise HTTPError(431)
+        except ValueError:
+            # Satır okuma sınırı aşıldı
+            raise HTTPError(431) from None
+        target = urlsplit(parts[1])
+        query = {name: values[-1] for name, values in parse_qs(target.query).items()}
+        return parts[0], target.path.rstrip('/') or '/', query, headers
+
+    async def _dispatch(self, method, path, query, headers, reader, writer) -> None:
+        if path == '/health':
+            if method != 'GET':
+                raise HTTPError(405)
+            await self._send_json(writer, 200, {
+                'workers': self.workers, 'running': self._running,
+                'queued': self._admitted - self._running, 'max_pending': self.max_pending,
+                'uploads': len(self._uploads),
+            })
+        elif path == '/uploads':
+            if method != 'POST':
+                raise HTTPError(405)
+            upload_path, size = await self._receive(reader, writer, headers, query.get('name', ''))
+            upload_id = uuid.uuid4().hex
+            self._uploads[upload_id] = upload_path
+            await self._send_json(writer, 201, {'id': upload_id, 'size': size})
+        elif path.startswith('/uploads/'):
+            if method != 'DELETE':
+                raise HTTPError(405)
+            upload_path = self._uploads.pop(path[len('/uploads/'):], None)
+            if upload_path is None:
+                raise HTTPError(404, "Unknown upload")
+            os.remove(upload_path)
+            await self._send_json(writer, 200, {'deleted': True})
+        elif path.startswith('/jobs/'):
+            if method != 'POST':
+                raise HTTPError(405)
+            await self._run(path[len('/jobs/'):], query, headers, reader, writer)
+        else:
+            raise HTTPError(404)
+
+    def _upload(self, upload_id: str) -> str:
+        try:
+            return self._uploads[upload_id]
+        except KeyError:
+            raise HTTPError(404, f"Unknown upload: {upload_id}") from None
+
+    def _job_params(self, job: str, query: Dict[str, str]) -> Dict:
+        """İş parametrelerini doğrular (gövde okunmadan önce)"""
+        params = {'format': _choice_param(query, 'format', JOBS[job], FORMATS)}
+        if job == 'normalize':
+            ops = query.get('ops', 'normalize_phones').split(',')
+            for op in ops:
+                _choice_param({'ops': op}, 'ops', '', NORMALIZE_OPERATIONS)
+            params['ops'] = ops
+        elif job == 'dedupe':
+            params['mode'] = _choice_param(query, 'mode', 'name_phone', DUPLICATE_MODES)
+            params['threshold'] = _int_param(query, 'threshold', 80, 0, 100)
+        elif job == 'match':
+            if 'references' not in query:
+                raise HTTPError(400, "'references' upload is required")
+            params['references'] = self._upload(query['references'])
+            params['method'] = _choice_param(query, 'method', 'token_sort', MATCH_METHODS)
+            params['limit'] = _int_param(query, 'limit', 3, 1, 100)
+            params['threshold'] = _int_param(query, 'threshold', 80, 0, 100)
+        return params
+
+    async def _run(self, job: str, query, headers, reader, writer) -> None:
+        """Bir işi kabul eder, çalıştırır ve sonucu gönderir"""
+        if job not in JOBS:
+            raise HTTPError(404, f"Unknown job: {job}")
+        params = self._job_params(job, query)
+        if self._admitted >= self.workers + self.max_pending:
+            raise HTTPError(503, "Too many jobs, retry later", {'Retry-After': '1'})
+
+        self._admitted += 1
+        owned_source = 'upload' not in query
+        source = None
+        output = os.path.join(self._workdir, f"{uuid.uuid4().hex}.{params['format']}")
+        try:
+            try:
+                if owned_source:
+                    source, _ = await self._receive(reader, writer, headers, '.vcf')
+                else:
+                    source = self._upload(query['upload'])
+                async with self._slots:
+                    self._running += 1
+                    executor = self._executor
+                    try:
+                        count = await asyncio.get_running_loop().run_in_executor(
+                            executor, run_job, job, source, output, params)
+                    except ValueError as e:
+                        raise HTTPError(400, str(e)) from None
+                    except BrokenProcessPool:
+                        # Bir işçi süreç öldü; havuz bir daha iş kabul etmez.
+                        # Aynı anda bozulan işlerden yalnızca ilki havuzu yeniler
+                        if self._executor is executor:
+                            self._executor = self._new_executor()
+                            executor.shutdown(wait=False)
+                        raise HTTPError(503, "Worker process died, retry the job",
+                                        {'Retry-After': '1'}) from None
+                    finally:
+                        self._running -= 1
+            finally:
+                self._admitted -= 1
+                if owned_source and source is not None:
+                    os.remove(source)
+            await self._send_file(writer, output, FORMATS[params['format']], {'X-Result-Count': str(count)})
+        finally:
+            if os.path.exists(output):
+                os.remove(output)
+
+    async def _body(self, reader: asyncio.StreamReader, headers: Dict[str, str]) -> AsyncIterator[bytes]:
+        """İstek gövdesini parça parça okur (Content-Length veya chunked)"""
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            while True:
+                try:
+                    size = int((await reader.readline()).split(b';')[0], 16)
+                except ValueError:
+                    raise HTTPError(400, "Malformed chunk size") from None
+                if size == 0:
+                    # Son parçadan sonraki başlıklar
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return
+                while size:
+                    chunk = await reader.read(min(size, CHUNK_SIZE))
+                    if not chunk:
+                        raise asyncio.IncompleteReadError(b'', size)
+                    size -= len(chunk)
+                    yield chunk
+                await reader.readexactly(2)
+            return
+
+        if 'content-length' not in headers:
+            raise HTTPError(411)
+        try:
+            remaining = int(headers['content-length'])
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length") from None
+        if remaining > self.max_upload:
+            raise HTTPError(413)
+        while remaining:
+            chunk = await reader.read(min(remaining, CHUNK_SIZE))
+            if not chunk:
+                raise asyncio.IncompleteReadError(b'', remaining)
+            remaining -= len(chunk)
+            yield chunk
+
+    async def _receive(self, reader, writer, headers: Dict[str, str], name: str) -> Tuple[str, int]:
+        """
+        İstek gövdesini geçici bir dosyaya yazar
+
+        Dosya uzantısı name'den alınır (ör. referans listesinin .csv olduğu
+        bu şekilde anlaşılır).
+        """
+        suffix = re.sub(r'[^A-Za-z0-9.]', '', ''.join(PurePath(os.path.basename(name)).suffixes))
+        if headers.get('expect', '').lower() == '100-continue':
+            writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+            await writer.drain()
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=self._workdir)
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                async for chunk in self._body(reader, headers):
+                    size += len(chunk)
+                    if size > self.max_upload:
+                        raise HTTPError(413)
+                    f.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path, size
+
+    @staticmethod
+    def _head(status: int, headers: Dict[str, str]) -> bytes:
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        lines.append('Connection: close')
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    async def _send_json(self, writer, status: int, payload: Dict,
+                         headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        writer.write(self._head(status, {'Content-Type': 'application/json',
+                                         'Content-Length': str(len(body)), **(headers or {})}))
+        writer.write(body)
+        await writer.drain()
+
+    async def _send_file(self, writer, path: str, content_type: str, headers: Dict[str, str]) -> None:
+        """Dosyayı istemci okudukça parça parça gönderir"""
+        writer.write(self._head(200, {'Content-Type': f'{content_type}; charset=utf-8',
+                                      'Content-Length': str(os.path.getsize(path)), **headers}))
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                writer.write(chunk)
+                await writer.drain()
+
+async def serve(service: Service) -> None:
+    await service.start()
+    print(f"Listening on {service.url} ({service.workers} workers, {service.max_pending} pending jobs)",
+          flush=True)
+    try:
+        await service.serve_forever()
+    finally:
+        await service.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve parse/normalize/dedupe/match/export jobs over local HTTP")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to listen on")
+    parser.add_argument('--port', type=int, default=8765, help="Port to listen on (0 picks a free port)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Number of worker processes")
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help="Jobs that may wait for a worker before new ones are rejected with 503")
+    parser.add_argument('--max-upload-mb', type=int, default=1024, help="Largest accepted upload")
+    args = parser.parse_args(argv)
+
+    service = Service(args.host, args.port, args.workers, args.max_pending, args.max_upload_mb * 1024 ** 2)
+    try:
+        asyncio.run(serve(service))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+import hashlib
+import re
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Sequence, Tuple
+import numpy as np
+import pandas as pd
+import casing
+import compression
+
+try:
+    from rapidfuzz import fuzz as _rf_fuzz, process as _rf_process
+except ImportError:  # fuzzywuzzy ile (daha yavaş) hesaplanır
+    _rf_fuzz = _rf_process = None
+from fuzzywuzzy import fuzz, process
+
+# Eşik kaydırıcısının alt sınırı; bunun altındaki skorlar saklanmaz
+MIN_SCORE = 50
+
+# Tekrar aramada eşiğin bu kadar altındaki skorlar da saklanır (kaydırıcının alt sınırı);
+# daha düşük skorlu çiftler çok sayıda olduğundan hepsi saklanmaz
+THRESHOLD_MARGIN = 10
+
+def score_floor(threshold: int) -> int:
+    """Eşik için hesaplanıp saklanacak en düşük skor"""
+    return max(MIN_SCORE, min(threshold, 100) - THRESHOLD_MARGIN)
+
+# Benzerlik yöntemi -> (rapidfuzz, fuzzywuzzy) skor fonksiyonları
+SCORERS = {
+    'ratio': ('ratio', fuzz.ratio),
+    'token_sort': ('token_sort_ratio', lambda a, b: fuzz.token_sort_ratio(a, b, full_process=False)),
+    'token_set': ('token_set_ratio', lambda a, b: fuzz.token_set_ratio(a, b, full_process=False)),
+}
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+def process_name(name: str) -> str:
+    """Karşılaştırma için ismi Türkçe küçük harfe çevirir ve noktalamayı boşluk yapar"""
+    return _NON_WORD.sub(' ', casing.lower_text(name)).strip()
+
+def _round(score) -> int:
+    return int(score + 0.5)
+
+@dataclass
+class ScoredPairs:
+    """
+    Skora göre azalan sırada tutulan eşleşme çiftleri
+
+    Bir eşiği geçen çiftler her zaman listenin başındaki bir dilimdir; eşik
+    değiştiğinde yalnızca dilimin sonu ikili aramayla bulunur. Tekrar
+    aramasında first/second isimlerin sıra numaralarıdır (int32); referans
+    eşleşmelerinde metinlerdir. min_score'un altındaki çiftler saklanmaz.
+    """
+    first: np.ndarray
+    second: np.ndarray
+    scores: np.ndarray
+    min_score: int = MIN_SCORE
+    # İkinci elemanlar ilk (en yüksek skorlu) görüldükleri sırada; ilk istekte hesaplanır
+    _duplicates: np.ndarray = field(default=None, init=False, repr=False)
+    _duplicate_scores: np.ndarray = field(default=None, init=False, repr=False)
+
+    @classmethod
+    def build(cls, first, second, scores, min_score: int = MIN_SCORE) -> 'ScoredPairs':
+        first = np.asarray(first)
+        second = np.asarray(second)
+        scores = np.asarray(scores, dtype=np.uint8)
+        order = np.argsort(-scores.astype(np.int16), kind='stable')
+        return cls(first[order], second[order], scores[order], min_score)
+
+    @property
+    def nbytes(self) -> int:
+        """Yaklaşık bellek kullanımı (metin dizilerinde metinler de sayılır)"""
+        total = 0
+        for array in (self.first, self.second, self.scores, self._duplicates, self._duplicate_scores):
+            if array is None:
+                continue
+            total += array.nbytes
+            if array.dtype == object:
+                total += sum(sys.getsizeof(value) for value in array)
+        return total
+
+    def __len__(self):
+        return len(self.scores)
+
+    def count_at(self, threshold: int) -> int:
+        """Skoru eşiğe eşit veya büyük olan çift sayısı"""
+        return int(np.searchsorted(-self.scores.astype(np.int16), -threshold, side='right'))
+
+    def at(self, threshold: int) -> 'ScoredPairs':
+        """Eşiği geçen çiftler"""
+        count = self.count_at(threshold)
+        return ScoredPairs(self.first[:count], self.second[:count], self.scores[:count],
+                           max(self.min_score, threshold))
+
+    def duplicates_at(self, threshold: int) -> np.ndarray:
+        """Eşiği geçen en az bir çiftin ikinci elemanı olanlar (tekrar eden kayıtlar)"""
+        if self._duplicates is None:
+            first_seen = ~pd.Series(self.second).duplicated().to_numpy()
+            self._duplicates = self.second[first_seen]
+            self._duplicate_scores = self.scores[first_seen]
+        count = int(np.searchsorted(-self._duplicate_scores.astype(np.int16), -threshold, side='right'))
+        return self._duplicates[:count]
+
+def duplicate_pairs(names: pd.Series, method: str = 'ratio',
+                    min_score: int = MIN_SCORE) -> ScoredPairs:
+    """
+    Seçili isimler arasındaki, skoru min_score'dan düşük olmayan tüm
+    çiftlerin benzerliğini bir kez hesaplar
+
+    Çiftler (önceki ismin sırası, sonraki ismin sırası, skor) olarak
+    döndürülür; sıralar names içindeki konumlardır, boş isimler atlanır.
+    """
+    valid = np.flatnonzero(names.notna().to_numpy())
+    positions = valid.astype(np.int32 if len(names) < 2 ** 31 else np.int64)
+    valid_names = names.iloc[valid]
+    values = (casing.lower(valid_names).tolist() if method == 'ratio'
+              else [process_name(name) for name in valid_names])
+    rapid_scorer, slow_scorer = SCORERS[method]
+
+    first, second, scores = [], [], []
+    if _rf_process is not None:
+        scorer = getattr(_rf_fuzz, rapid_scorer)
+        chunk_size = max(1, 2_000_000 // max(len(values), 1))
+        for start in range(0, len(values), chunk_size):
+            # Yalnızca sonraki isimlerle karşılaştır (her çift bir kez)
+            block = _rf_process.cdist(values[start:start + chunk_size], values[start:], scorer=scorer,
+                                      score_cutoff=max(min_score - 0.5, 0), workers=-1)
+            rows, columns = np.nonzero(block >= min_score - 0.5)
+            later = columns > rows
+            rows, columns = rows[later], columns[later]
+            first.append(positions[rows + start])
+            second.append(positions[columns + start])
+            scores.append(np.floor(block[rows, columns] + 0.5).astype(np.uint8))
+    else:
+        for i, name1 in enumerate(values):
+            found_first, found_second, found_scores = [], [], []
+            for j in range(i + 1, len(values)):
+                score = slow_scorer(name1, values[j])
+                if score >= min_score:
+                    found_second.append(j)
+                    found_scores.append(score)
+            if found_second:
+                first.append(np.full(len(found_second), positions[i]))
+                second.append(positions[found_second])
+                scores.append(np.array(found_scores, dtype=np.uint8))
+    if not first:
+        empty = positions[:0]
+        return ScoredPairs.build(empty, empty, [], min_score)
+    return ScoredPairs.build(np.concatenate(first), np.concatenate(second), np.concatenate(scores), min_score)
+
+def reference_matches(references: Sequence[str], names: Sequence[str], method: str = 'token_sort',
+                      limit: int = 3, min_score: int = MIN_SCORE) -> ScoredPairs:
+    """
+    Her referans ismi için en benzer `limit` kişiyi bulur
+
+    Returns:
+        ScoredPairs: (referans, kişi ismi, skor)
+    """
+    references = [reference for reference in references if isinstance(reference, str)]
+    names = [name for name in names if isinstance(name, str)]
+    first, second, scores = [], [], []
+
+    if method == 'exact':
+        by_name = {}
+        for name, lowered in zip(names, casing.lower(pd.Series(names, dtype=object))):
+            by_name.setdefault(lowered, []).append(name)
+        for reference in references:
+            for name in by_name.get(casing.lower_text(reference), []):
+                first.append(reference)
+                second.append(name)
+                scores.append(100)
+        return ScoredPairs.build(first, second, scores)
+
+    processed = [process_name(name) for name in names]
+    rapid_scorer, slow_scorer = SCORERS[method]
+    for reference in references:
+        query = process_name(reference)
+        if _rf_process is not None:
+            found = [(names[index], score) for _, score, index in _rf_process.extract(
+                query, processed, scorer=getattr(_rf_fuzz, rapid_scorer),
+                limit=limit, score_cutoff=max(min_score - 0.5, 0))]
+        else:
+            found = [(names[index], score) for _, score, index in process.extract(
+                query, dict(enumerate(processed)), scorer=slow_scorer, processor=None, limit=limit)
+                if score >= min_score]
+        for name, score in found:
+            first.append(reference)
+            second.append(name)
+            scores.append(_round(score))
+    return ScoredPairs.build(first, second, scores)
+
+def load_references(filepath: str) -> List[str]:
+    """
+    Referans isim listesini okur
+
+    CSV dosyalarında ilk sütun, metin dosyalarında boş olmayan her satır
+    bir isimdir. Sıkıştırılmış dosyalar (ör. liste.csv.gz) akış olarak okunur.
+    """
+    with compression.open_file(filepath, 'rt') as f:
+        if compression.strip_extension(filepath).endswith('.csv'):
+            return pd.read_csv(f).iloc[:, 0].tolist()
+        return [line.strip() for line in f if line.strip()]
+
+class SimilarityCache:
+    """
+    Hesaplanmış eşleşmeleri veri sürümüne göre saklar
+
+    Anahtar, tablonun veri sürümü ile hesaplamanın girdilerini (yöntem,
+    seçili satırlar, referans listesi) içerir; veri değişince eski sonuçlar
+    kullanılmaz. Toplam boyut max_bytes'ı aşarsa en eski sonuçlar atılır;
+    tek başına bundan büyük sonuçlar saklanmaz.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+
+    @staticmethod
+    def _digest(values) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for value in values:
+            digest.update(repr(value).encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def nbytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def get(self, key: Tuple, compute) -> ScoredPairs:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        result = compute()
+        size = result.nbytes
+        if size > self.max_bytes:
+            return result
+        self._entries[key] = result
+        self._sizes[key] = size
+        while self.nbytes() > self.max_bytes:
+            oldest, _ = self._entries.popitem(last=False)
+            del self._sizes[oldest]
+        return result
+
+    def duplicate_pairs(self, version: int, names: pd.Series, method: str = 'ratio',
+                        min_score: int = MIN_SCORE) -> ScoredPairs:
+        """
+        Tekrar çiftlerini döndürür; aynı isimler için daha düşük bir alt
+        sınırla hesaplanmış sonuç varsa o kullanılır
+        """
+        prefix = ('duplicates', version, method, self._digest(names.index))
+        for key in reversed(self._entries):
+            if key[:4] == prefix and key[4] <= min_score:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        return self.get(prefix + (min_score,), lambda: duplicate_pairs(names, method, min_score))
+
+    def reference_matches(self, version: int, references: Sequence[str], names: Sequence[str],
+                          method: str = 'token_sort') -> ScoredPairs:
+        key = ('references', version, method, self._digest(references))
+        return self.get(key, lambda: reference_matches(references, names, method))
@@ -0,0 +1,476 @@
+import json
+import os
+import sqlite3
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+import compression
+from casing import lower_text
+from collation import sort_key
+from emails import cell_key as email_cell_key
+from multivalue import MULTI_VALUE_COLUMNS, as_values, format_frame, format_value
+from pipeline import Pipeline, ROW_OPERATIONS
+from vcf_handler import (VCFHandler, BlobRef, content_hash, CONTACT_COLUMNS,
+                         ATTACHMENTS_COLUMN, CARD_COLUMN, HASH_COLUMN)
+
+# Tablo sütunu -> SQLite sütunu (CONTACT_COLUMNS sırasıyla)
+SQL_COLUMNS = ['name', 'phone', 'email', 'type']
+
+# Çok değerli sütunlar JSON dizisi olarak saklanır
+_MULTI_VALUE = [column in MULTI_VALUE_COLUMNS for column in CONTACT_COLUMNS]
+
+# Sıralamada kullanılan ifade; isimler Türkçe sıralama anahtarına göre sıralanır
+_SORT_EXPRESSIONS = {'name': 'name_key', 'phone': 'phone', 'email': 'email COLLATE NOCASE',
+                     'type': 'type COLLATE NOCASE'}
+
+# Filtrelerde aranan metni üreten fonksiyon: çok değerli sütunlarda JSON yerine
+# ';' ile birleştirilmiş gösterim metni aranır
+_SEARCH_FUNCTIONS = {'name': 'tr_lower', 'phone': 'tr_search', 'email': 'tr_search', 'type': 'tr_search'}
+
+# FTS5 trigram dizini en az 3 karakterlik aramaları destekler
+_MIN_INDEXED_LENGTH = 3
+
+# Şema sürümü (PRAGMA user_version); 1: dizin gösterim metinlerini içerir
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS contacts (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    phone TEXT,
+    email TEXT,
+    type TEXT,
+    name_key TEXT,
+    source_id INTEGER REFERENCES sources(id),
+    card_offset INTEGER,
+    card_length INTEGER,
+    attachments TEXT,
+    hash INTEGER
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+    name, phone, email, type, content='', tokenize='trigram'
+);
+"""
+
+def _search_expression(column: str, row: str = '') -> str:
+    return f"{_SEARCH_FUNCTIONS[column]}({row + '.' if row else ''}{column})"
+
+def _fts_values(row: str) -> str:
+    return ', '.join(_search_expression(column, row) for column in SQL_COLUMNS)
+
+_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS contacts_ai AFTER INSERT ON contacts BEGIN
+    INSERT INTO contacts_fts(rowid, name, phone, email, type)
+    VALUES (new.id, {_fts_values('new')});
+END;
+CREATE TRIGGER IF NOT EXISTS contacts_ad AFTER DELETE ON contacts BEGIN
+    INSERT INTO contacts_fts(contacts_fts, rowid, name, phone, email, type)
+    VALUES ('delete', old.id, {_fts_values('old')});
+END;
+CREATE TRIGGER IF NOT EXISTS contacts_au AFTER UPDATE OF name, phone, email, type ON contacts BEGIN
+    INSERT INTO contacts_fts(contacts_fts, rowid, name, phone, email, type)
+    VALUES ('delete', old.id, {_fts_values('old')});
+    INSERT INTO contacts_fts(rowid, name, phone, email, type)
+    VALUES (new.id, {_fts_values('new')});
+    UPDATE contacts SET name_key = tr_sort_key(new.name) WHERE id = new.id AND new.name IS NOT old.name;
+END;
+"""
+
+def _to_sql(value):
+    if isinstance(value, (tuple, list)):
+        return json.dumps(list(value), ensure_ascii=False) if value else None
+    return value if isinstance(value, str) else None
+
+def _from_sql(value, multi_value: bool):
+    """SQLite değerini hücre değerine çevirir; eski arşivlerdeki ';' ile birleştirilmiş metinler de okunur"""
+    if not multi_value:
+        return value
+    if isinstance(value, str) and value.startswith('['):
+        return tuple(json.loads(value))
+    return as_values(value)
+
+def _from_sql_row(values) -> tuple:
+    return tuple(_from_sql(value, multi_value) for value, multi_value in zip(values, _MULTI_VALUE))
+
+def _lower(value):
+    return lower_text(value) if isinstance(value, str) else value
+
+def _search_text(value):
+    """Çok değerli sütunun aranan metni: değerler ';' ile birleştirilir ve küçük harfe çevrilir"""
+    return lower_text(format_value(_from_sql(value, True))) if isinstance(value, str) else value
+
+def _sort_key(value):
+    return sort_key(value) if isinstance(value, str) else ''
+
+def _email_key(value):
+    """E-posta sütununun tekrar anahtarı (adresi olmayan kişide NULL)"""
+    return email_cell_key(_from_sql(value, True))
+
+class SQLiteStore:
+    """
+    Kişileri tamamı belleğe alınmadan işlenebilen bir SQLite dosyasında tutar
+
+    Filtreler FTS5 (trigram) dizini üzerinden, sıralama ve toplu
+    düzenlemeler SQL ile yapılır. Geçerli filtre ve sıralamanın sonucu
+    geçici bir tabloda (konum -> kişi) tutulur; böylece görünümün herhangi
+    bir penceresi konumuyla doğrudan okunabilir.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.create_function('tr_lower', 1, _lower, deterministic=True)
+        self._conn.create_function('tr_sort_key', 1, _sort_key, deterministic=True)
+        self._conn.create_function('tr_search', 1, _search_text, deterministic=True)
+        self._conn.create_function('email_key', 1, _email_key, deterministic=True)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self._filters = {}
+        self._except_filters = {}
+        self._sort = None
+        self._sources = None
+        self._count = 0
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _migrate(self) -> None:
+        """
+        Eski arşivlerin tetikleyicilerini yeniler ve dizini yeniden oluşturur
+
+        Önceki sürümler çok değerli sütunların JSON metnini dizine ekliyordu;
+        filtreler bu yüzden JSON sözdizimiyle eşleşiyordu.
+        """
+        version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+        if version >= _SCHEMA_VERSION:
+            return
+        with self._conn:
+            for trigger in ('contacts_ai', 'contacts_ad', 'contacts_au'):
+                self._conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            self._conn.execute("INSERT INTO contacts_fts(contacts_fts) VALUES ('delete-all')")
+            self._conn.execute(
+                'INSERT INTO contacts_fts(rowid, name, phone, email, type) '
+                f'SELECT id, {_fts_values("contacts")} FROM contacts')
+        self._conn.executescript(_TRIGGERS)
+        self._conn.execute(f'PRAGMA user_version = {_SCHEMA_VERSION}')
+
+    # İçe aktarma
+
+    def import_vcf(self, filepath: str, handler: Optional[VCFHandler] = None,
+                   batch_size: int = 5000,
+                   progress: Optional[Callable[[int, int], Optional[bool]]] = None) -> int:
+        """
+        VCF dosyasını akış olarak okuyup arşive ekler
+
+        Kişilerin ham kart konumları da saklanır; değişmeyen kartlar dışa
+        aktarılırken kaynak dosyadan olduğu gibi kopyalanır. Bu yüzden
+        sıkıştırılmış dosyalar arşive aktarılamaz.
+
+        Args:
+            filepath: VCF dosyası
+            batch_size: Tek işlemde eklenecek kişi sayısı
+            progress: (okunan bayt, toplam bayt) ile çağrılır; False dönerse iptal edilir
+
+        Returns:
+            int: Eklenen kişi sayısı
+        """
+        handler = handler or VCFHandler()
+        filepath = os.path.abspath(filepath)
+        if compression.detect(filepath) is not None:
+            raise ValueError("Compressed files cannot be imported into an archive; decompress the file first")
+        total_size = os.path.getsize(filepath)
+        with self._conn:
+            self._conn.execute('INSERT OR IGNORE INTO sources(path) VALUES (?)', (filepath,))
+        source_id = self._conn.execute('SELECT id FROM sources WHERE path = ?', (filepath,)).fetchone()[0]
+        self._sources = None
+
+        imported = 0
+        batch = []
+        for contact in handler.iter_contacts(filepath):
+            batch.append(contact)
+            if len(batch) < batch_size:
+                continue
+            imported += self._insert(batch, source_id)
+            card = batch[-1][CARD_COLUMN]
+            batch = []
+            if progress is not None and progress(card.offset + card.length, total_size) is False:
+                raise InterruptedError("Import cancelled")
+        if batch:
+            imported += self._insert(batch, source_id)
+        if progress is not None:
+            progress(total_size, total_size)
+        return imported
+
+    def _insert(self, contacts: List[Dict], source_id: int) -> int:
+        df = pd.DataFrame(contacts)
+        hashes = content_hash(df).astype(np.uint64).view(np.int64)
+        rows = []
+        for contact, hash_value in zip(contacts, hashes.tolist()):
+            card = contact[CARD_COLUMN]
+            blobs = contact[ATTACHMENTS_COLUMN]
+            attachments = (json.dumps([[blob.offset, blob.length, blob.name] for blob in blobs])
+                           if blobs else None)
+            rows.append(tuple(_to_sql(contact[column]) for column in CONTACT_COLUMNS)
+                        + (source_id, card.offset, card.length, attachments, hash_value))
+        with self._conn:
+            self._conn.executemany(
+                'INSERT INTO contacts(name, phone, email, type, name_key, source_id, '
+                'card_offset, card_length, attachments, hash) '
+                'VALUES (?1, ?2, ?3, ?4, tr_sort_key(?1), ?5, ?6, ?7, ?8, ?9)', rows)
+        return len(rows)
+
+    # Görünüm
+
+    def set_filter(self, column: int, text: str) -> None:
+        """Sütun filtresini ayarlar ('!kelime1,kelime2' hariç tutma filtresidir)"""
+        if text.startswith('!'):
+            self._except_filters[column] = [word.strip() for word in lower_text(text[1:]).split(',')
+                                            if word.strip()]
+            self._filters[column] = ''
+        else:
+            self._filters[column] = lower_text(text)
+            self._except_filters[column] = []
+
+    def clear_filters(self) -> None:
+        self._filters.clear()
+        self._except_filters.clear()
+
+    def set_sort(self, column: Optional[int], ascending: bool = True) -> None:
+        """Görünümün sıralamasını ayarlar (None: dosya sırası)"""
+        self._sort = None if column is None else (SQL_COLUMNS[column], ascending)
+
+    def _contains_clause(self, column: str, word: str) -> Tuple[str, list]:
+        if len(word) >= _MIN_INDEXED_LENGTH:
+            phrase = '"' + word.replace('"', '""') + '"'
+            return ('id IN (SELECT rowid FROM contacts_fts WHERE contacts_fts MATCH ?)',
+                    [f'{column} : {phrase}'])
+        return f'instr({_search_expression(column)}, ?) > 0', [word]
+
+    def _where(self) -> Tuple[str, list]:
+        clauses = []
+        params = []
+        for column, text in self._filters.items():
+            if text:
+                clause, clause_params = self._contains_clause(SQL_COLUMNS[column], text)
+                clauses.append(clause)
+                params.extend(clause_params)
+        for column, words in self._except_filters.items():
+            for word in words:
+                clause, clause_params = self._contains_clause(SQL_COLUMNS[column], word)
+                clauses.append(f'NOT ({clause})')
+                params.extend(clause_params)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def _order_by(self) -> str:
+        if self._sort is None:
+            return ' ORDER BY id'
+        column, ascending = self._sort
+        # Sıralanan sütunun dizini ilk sıralamada oluşturulur
+        self._conn.execute(f'CREATE INDEX IF NOT EXISTS contacts_{column}_sort '
+                           f'ON contacts({_SORT_EXPRESSIONS[column]}, id)')
+        direction = 'ASC' if ascending else 'DESC'
+        return f' ORDER BY {_SORT_EXPRESSIONS[column]} {direction}, id'
+
+    def refresh(self) -> int:
+        """Filtre ve sıralamaya göre görünüm tablosunu yeniden oluşturur, satır sayısını döndürür"""
+        where, params = self._where()
+        with self._conn:
+            self._conn.execute('DROP TABLE IF EXISTS temp.view')
+            self._conn.execute('CREATE TEMP TABLE view (pos INTEGER PRIMARY KEY, id INTEGER)')
+            self._conn.execute(f'INSERT INTO temp.view(id) SELECT id FROM contacts{where}{self._order_by()}',
+                               params)
+        self._count = self._conn.execute('SELECT count(*) FROM temp.view').fetchone()[0]
+        return self._count
+
+    def count(self) -> int:
+        """Görünümdeki satır sayısı"""
+        return self._count
+
+    def total(self) -> int:
+        """Arşivdeki toplam kişi sayısı"""
+        return self._conn.execute('SELECT count(*) FROM contacts').fetchone()[0]
+
+    def fetch(self, start: int, count: int) -> List[Tuple]:
+        """Görünümün [start, start + count) aralığındaki satırlarını (id, isim, telefon, e-posta, tür) döndürür"""
+        rows = self._conn.execute(
+            'SELECT c.id, c.name, c.phone, c.email, c.type FROM temp.view v '
+            'JOIN contacts c ON c.id = v.id WHERE v.pos > ? AND v.pos <= ? ORDER BY v.pos',
+            (start, start + count)).fetchall()
+        return [(row[0],) + _from_sql_row(row[1:]) for row in rows]
+
+    def ids_at(self, positions: Sequence[int]) -> List[int]:
+        """Görünümdeki konumların kişi kimliklerini döndürür"""
+        ids = []
+        for i in range(0, len(positions), 500):
+            chunk = [int(position) + 1 for position in positions[i:i + 500]]
+            placeholders = ','.join('?' * len(chunk))
+            found = dict(self._conn.execute(
+                f'SELECT pos, id FROM temp.view WHERE pos IN ({placeholders})', chunk).fetchall())
+            ids.extend(found[position] for position in chunk if position in found)
+        return ids
+
+    # Düzenleme
+
+    def update_cell(self, contact_id: int, column: int, value) -> None:
+        """Tek bir hücreyi günceller (çok değerli sütunlarda ';' ile ayrılmış metin kabul edilir)"""
+        if _MULTI_VALUE[column]:
+            value = as_values(value)
+        with self._conn:
+            self._conn.execute(f'UPDATE contacts SET {SQL_COLUMNS[column]} = ? WHERE id = ?',
+                               (_to_sql(value), contact_id))
+
+    def _target_table(self, ids: Optional[Sequence[int]]) -> str:
+        """İşlenecek kişileri (pos, id) tablosu olarak döndürür; ids None ise görünüm kullanılır"""
+        if ids is None:
+            return 'temp.view'
+        with self._conn:
+            self._conn.execute('DROP TABLE IF EXISTS temp.targets')
+            self._conn.execute('CREATE TEMP TABLE targets (pos INTEGER PRIMARY KEY, id INTEGER)')
+            self._conn.executemany('INSERT INTO temp.targets(id) VALUES (?)', [(int(i),) for i in ids])
+        return 'temp.targets'
+
+    def _read_frame(self, table: str, start: int, count: int) -> pd.DataFrame:
+        rows = self._conn.execute(
+            f'SELECT c.id, c.name, c.phone, c.email, c.type FROM {table} t '
+            f'JOIN contacts c ON c.id = t.id WHERE t.pos > ? AND t.pos <= ? ORDER BY t.pos',
+            (start, start + count)).fetchall()
+        df = pd.DataFrame([(row[0],) + _from_sql_row(row[1:]) for row in rows],
+                          columns=['id'] + CONTACT_COLUMNS)
+        return df.set_index('id')
+
+    def apply(self, pipeline: Pipeline, ids: Optional[Sequence[int]] = None,
+              chunk_size: int = 50000,
+              progress: Optional[Callable[[int, int], Optional[bool]]] = None) -> int:
+        """
+        Tarifi kişilere parça parça uygular ve yalnızca değişen satırları yazar
+
+        Satır silen adımlar (tekrar silme) SQL ile tüm hedef kümede çalışır.
+
+        Args:
+            pipeline: Uygulanacak tarif
+            ids: Hedef kişiler (None ise görünümdeki tüm kişiler)
+
+        Returns:
+            int: Değişen veya silinen kişi sayısı
+        """
+        table = self._target_table(ids)
+        target_count = self._conn.execute(f'SELECT max(pos) FROM {table}').fetchone()[0] or 0
+        changed = 0
+        segment = Pipeline()
+        for step in pipeline.steps + [None]:
+            if step is not None and step['op'] not in ROW_OPERATIONS:
+                segment.steps.append(dict(step))
+                continue
+            if len(segment):
+                changed += self._apply_columns(segment, table, target_count, chunk_size, progress)
+                segment = Pipeline()
+            if step is not None:
+                params = {key: value for key, value in step.items() if key != 'op'}
+                changed += self.remove_duplicates(table=table, **params)
+        return changed
+
+    def _apply_columns(self, pipeline, table, target_count, chunk_size, progress) -> int:
+        changed = 0
+        for start in range(0, target_count, chunk_size):
+            df = self._read_frame(table, start, chunk_size)
+            result = pipeline.apply(df)
+            old_values = df.fillna('').astype(str)
+            new_values = result.fillna('').astype(str)
+            changed_rows = (old_values != new_values).any(axis=1).to_numpy()
+            if changed_rows.any():
+                updated = result[changed_rows]
+                with self._conn:
+                    self._conn.executemany(
+                        'UPDATE contacts SET name = ?, phone = ?, email = ?, type = ? WHERE id = ?',
+                        [tuple(_to_sql(value) for value in values) + (int(contact_id),)
+                         for contact_id, values in zip(updated.index, updated.itertuples(index=False))])
+                changed += int(changed_rows.sum())
+            if progress is not None and progress(min(start + chunk_size, target_count), target_count) is False:
+                raise InterruptedError("Operation cancelled")
+        return changed
+
+    def remove_duplicates(self, mode: str = 'name_phone', ids: Optional[Sequence[int]] = None,
+                          table: Optional[str] = None, **params) -> int:
+        """
+        Hedef kümedeki tekrar eden kişileri siler (dosyadaki ilk kayıt korunur)
+
+        Returns:
+            int: Silinen kişi sayısı
+        """
+        group_by = {'name_phone': 'c.name, c.phone', 'phone': 'c.phone', 'email': 'email_key(c.email)'}.get(mode)
+        if group_by is None:
+            raise ValueError(f"Duplicate mode '{mode}' is not available for archives")
+        table = table or self._target_table(ids)
+        # Adresi olmayan kişiler birbirinin tekrarı sayılmaz
+        skip_empty = ' AND email_key(email) IS NOT NULL' if mode == 'email' else ''
+        with self._conn:
+            cursor = self._conn.execute(
+                f'DELETE FROM contacts WHERE id IN (SELECT id FROM {table}){skip_empty} AND id NOT IN ('
+                f'SELECT min(c.id) FROM {table} t JOIN contacts c ON c.id = t.id GROUP BY {group_by})')
+        return cursor.rowcount
+
+    def delete(self, ids: Sequence[int]) -> int:
+        """Kişileri siler"""
+        with self._conn:
+            cursor = self._conn.executemany('DELETE FROM contacts WHERE id = ?', [(int(i),) for i in ids])
+        return cursor.rowcount
+
+    # Dışa aktarma
+
+    def _source_paths(self) -> Dict[int, str]:
+        if self._sources is None:
+            self._sources = dict(self._conn.execute('SELECT id, path FROM sources').fetchall())
+        return self._sources
+
+    def iter_frames(self, chunk_size: int = 50000) -> Iterator[pd.DataFrame]:
+        """
+        Görünümdeki kişileri dışa aktarma için parça parça DataFrame olarak
+        döndürür (ham kart ve büyük özellik referanslarıyla)
+        """
+        paths = self._source_paths()
+        for start in range(0, self._count, chunk_size):
+            rows = self._conn.execute(
+                'SELECT c.name, c.phone, c.email, c.type, c.source_id, c.card_offset, c.card_length, '
+                'c.attachments, c.hash FROM temp.view v JOIN contacts c ON c.id = v.id '
+                'WHERE v.pos > ? AND v.pos <= ? ORDER BY v.pos', (start, start + chunk_size)).fetchall()
+            if not rows:
+                continue
+            df = pd.DataFrame([_from_sql_row(row[:4]) for row in rows], columns=CONTACT_COLUMNS)
+            cards = []
+            attachments = []
+            for _, _, _, _, source_id, offset, length, blobs, _ in rows:
+                path = paths.get(source_id)
+                if path is None:
+                    cards.append(None)
+                    attachments.append(())
+                    continue
+                cards.append(BlobRef(path, offset, length, 'VCARD'))
+                attachments.append(tuple(BlobRef(path, blob_offset, blob_length, name)
+                                         for blob_offset, blob_length, name in json.loads(blobs or '[]')))
+            df[CARD_COLUMN] = cards
+            df[ATTACHMENTS_COLUMN] = attachments
+            df[HASH_COLUMN] = np.array([row[8] or 0 for row in rows], dtype=np.int64).view(np.uint64)
+            yield df
+
+    def export_vcf(self, filepath: str, ios_compatible: bool = False,
+                   handler: Optional[VCFHandler] = None) -> int:
+        """Görünümdeki kişileri VCF dosyasına kaydeder"""
+        handler = handler or VCFHandler()
+        return handler.export_vcf_chunks(self.iter_frames(), filepath, ios_compatible)
+
+    def export_csv(self, filepath: str) -> int:
+        """Görünümdeki kişileri CSV olarak kaydeder"""
+        written = 0
+        for start in range(0, self._count, 50000):
+            df = self._read_frame('temp.view', start, 50000)
+            format_frame(df).to_csv(filepath, index=False, mode='w' if start == 0 else 'a', header=start == 0)
+            written += len(df)
+        if written == 0:
+            pd.DataFrame(columns=CONTACT_COLUMNS).to_csv(filepath, index=False)
+        return written
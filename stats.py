@@ -0,0 +1,275 @@
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+from emails import parse_emails
+from master_index import MIN_PHONE_DIGITS, name_keys
+from multivalue import flatten_values
+from operations import parse_phones
+from query import FIELDS
+from vcf_handler import CONTACT_COLUMNS
+
+# Her sütun için gösterilen en sık değer sayısı
+TOP_VALUES = 5
+
+# Sayaç -> panelde gösterilen metin
+COUNT_LABELS = {
+    'contacts': "Contacts",
+    'empty_name': "Empty names",
+    'empty_phone': "Without phone number",
+    'empty_email': "Without e-mail",
+    'invalid_phone': "Invalid phone formats",
+    'invalid_email': "Invalid e-mail addresses",
+    'multi_phone': "Several phone numbers",
+    'duplicate_name': "Likely duplicate names",
+    'duplicate_phone': "Likely duplicate phones",
+    'duplicate_email': "Likely duplicate e-mails",
+}
+
+# En sık değerleri gösterilen sütunlar -> panel başlığı; Domain e-posta
+# adreslerinin alan adlarıdır (kişi başına bir kez sayılır)
+TOP_LABELS = {
+    'Name': "Most frequent names",
+    'Phone': "Most frequent phone numbers",
+    'E-mail': "Most frequent e-mail addresses",
+    'Type': "Most frequent types",
+    'Domain': "Most frequent e-mail domains",
+}
+
+# Sayacın kişilerini listeleyen sorgu (sorgu alanına yazılır)
+COUNT_QUERIES = {
+    'empty_name': 'empty:name',
+    'empty_phone': 'empty:phone',
+    'empty_email': 'empty:email',
+    'multi_phone': 'count(phone)>1',
+}
+
+# Tekrar sayaçları -> anahtar sayımı (master_index ile aynı anahtarlar)
+_DUPLICATE_KEYS = {'duplicate_name': 'name_key', 'duplicate_phone': 'phone_key',
+                   'duplicate_email': 'email_key'}
+
+# Bir değişiklik tablonun bu oranından fazlasını etkiliyorsa farkı işlemek
+# yerine her şey baştan sayılır
+_RESET_RATIO = 0.5
+
+def _invalid(parts: pd.DataFrame) -> pd.Series:
+    international = parts['plus'] & parts['digit_count'].between(8, 15)
+    return parts['other'] | ~((parts['local_count'] == 10) | international)
+
+def invalid_phones(phones: pd.Series) -> pd.Series:
+    """
+    Geçersiz telefon biçimleri: rakam ve noktalama dışında karakter (ör.
+    harf) içeren veya rakamları ne Türkiye
+    numarası (baştaki 0 ve 90 atılınca 10 hane) ne de '+' ile yazılmış
+    8-15 haneli uluslararası numara olan değerler
+    """
+    return _invalid(parse_phones(phones))
+
+def value_query(column: str, value: str) -> str:
+    """Sütunda değeri tam olarak taşıyan kişileri listeleyen sorgu"""
+    if column == 'Domain':
+        return f'email:/@{re.escape(value)}\\s*(?:;|$)/'
+    field = next(field for field, name in FIELDS.items() if name == column)
+    escaped = value.replace('"', '\\"')
+    return f'{field}:="{escaped}"'
+
+def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame(columns=CONTACT_COLUMNS)
+
+def _contact_columns(df: pd.DataFrame) -> pd.DataFrame:
+    if any(column not in df.columns for column in CONTACT_COLUMNS):
+        return _empty_frame()
+    return df[CONTACT_COLUMNS]
+
+def _distinct_per_row(positions: np.ndarray, keys: List[str]) -> List[str]:
+    """Anahtarlar; bir satırın aynı anahtarı birden çok kez taşıması tek sayılır"""
+    if not len(keys):
+        return []
+    counts = np.bincount(positions)
+    shared = counts[positions] > 1
+    if not shared.any():
+        return keys
+    # Birden çok anahtarı olan (az sayıdaki) satırlar ayrıca tekilleştirilir
+    single = [key for key, multi in zip(keys, shared) if not multi]
+    pairs = {(position, keys[i]) for i, position in zip(np.flatnonzero(shared).tolist(),
+                                                        positions[shared].tolist())}
+    return single + [key for _, key in pairs]
+
+def _stripped(values: pd.Series) -> List[str]:
+    return [value.strip() if isinstance(value, str) else '' if pd.isna(value) else str(value).strip()
+            for value in values.tolist()]
+
+def measure(df: pd.DataFrame) -> Tuple[Dict[str, int], Dict[str, Counter]]:
+    """
+    Kişilerin sayaçlarını ve değer sayımlarını tek geçişte hesaplar
+
+    Telefonlar ve e-posta adresleri birer kez ayrıştırılır; geçersiz
+    biçimler, tekrar anahtarları ve alan adları aynı sonuçlardan çıkarılır.
+
+    Returns:
+        (sayaçlar, sayımlar): sayımlar sütun değerlerinin ve tekrar
+            anahtarlarının (değer -> adet) Counter'larıdır
+    """
+    names = _stripped(df['Name'])
+    phone_positions, phones = flatten_values(df['Phone'])
+    email_positions, emails = flatten_values(df['E-mail'])
+    _, types = flatten_values(df['Type'])
+    phone_counts = np.bincount(phone_positions, minlength=len(df))
+    parts = parse_phones(phones)
+    addresses = parse_emails(emails)
+
+    invalid = _invalid(parts).to_numpy()
+    counts = {
+        'contacts': len(df),
+        'empty_name': names.count(''),
+        'empty_phone': int((phone_counts == 0).sum()),
+        'empty_email': len(df) - len(np.unique(email_positions)),
+        'invalid_phone': len(np.unique(phone_positions[invalid])),
+        'invalid_email': len(np.unique(email_positions[~addresses['valid'].to_numpy()
+                                                       & (addresses['address'].to_numpy() != '')])),
+        'multi_phone': int((phone_counts > 1).sum()),
+    }
+
+    phones = phones.tolist()
+    types = types.tolist()
+    emails = emails.tolist()
+    tallies = {
+        'Name': Counter(names),
+        'Phone': Counter(phones),
+        'E-mail': Counter(emails),
+        'Type': Counter(types),
+    }
+    del tallies['Name'][''], tallies['Type']['']
+
+    keep = (parts['local_count'] >= MIN_PHONE_DIGITS).to_numpy()
+    local = parts['local'].tolist()
+    tallies['phone_key'] = Counter(_distinct_per_row(
+        phone_positions[keep], [key for key, kept in zip(local, keep) if kept]))
+    # E-posta anahtarları master_index.email_keys ile aynıdır (geçerli adresler)
+    valid = addresses['valid'].to_numpy()
+    for name, column in (('email_key', 'address'), ('Domain', 'domain')):
+        tallies[name] = Counter(_distinct_per_row(
+            email_positions[valid], addresses[column].to_numpy()[valid].tolist()))
+    # İsim anahtarı satır başına en fazla bir tanedir
+    tallies['name_key'] = Counter(name_keys(df['Name'])['key'].tolist())
+    return counts, tallies
+
+class ContactStats:
+    """
+    Kişi tablosunun veri kalitesi sayaçları ve en sık değerleri
+
+    Yüklemede her şey tek vektörel geçişle sayılır. Sonraki değişikliklerde
+    yalnızca etkilenen satırların eski değerleri (son durumun kopyasından)
+    düşülüp yeni değerleri eklenir; tekrar sayaçları anahtar sayımlarından
+    (toplam - farklı anahtar) bulunduğu için tablo yeniden taranmaz. En sık
+    değerler listesi de yalnızca içindeki veya ona girebilecek bir değerin
+    sayısı değişince yeniden hesaplanır.
+    """
+
+    def __init__(self, top: int = TOP_VALUES):
+        self.top = top
+        self.reset(_empty_frame())
+
+    def reset(self, df: pd.DataFrame) -> None:
+        """Tüm sayaçları tablodan baştan hesaplar"""
+        df = _contact_columns(df)
+        counts, tallies = measure(df)
+        self._counts = counts
+        self._tallies = tallies
+        self._totals = {name: sum(values.values()) for name, values in tallies.items()}
+        self._top = dict.fromkeys(TOP_LABELS)
+        # Satırlar tablo modeliyle aynı sıradadır; değişiklikler konum veya etiketle bulunur
+        self._snapshot = df.copy()
+
+    def _apply(self, df: pd.DataFrame, sign: int) -> None:
+        """Satırların katkısını sayaçlara ekler (sign=1) veya çıkarır (sign=-1)"""
+        if df.empty:
+            return
+        counts, tallies = measure(df)
+        for name, count in counts.items():
+            self._counts[name] += sign * count
+        for name, values in tallies.items():
+            counter = self._tallies[name]
+            top = self._top.get(name)
+            floor = top[-1][1] if top is not None and len(top) >= self.top else 0
+            top_values = {value for value, _ in top} if top is not None else set()
+            for value, count in values.items():
+                updated = counter[value] + sign * count
+                if updated > 0:
+                    counter[value] = updated
+                else:
+                    del counter[value]
+                if top is not None and (value in top_values or updated >= floor):
+                    self._top[name] = top = None
+            self._totals[name] += sign * sum(values.values())
+
+    def replace(self, df: pd.DataFrame) -> None:
+        """
+        Tablonun yeni haliyle sayaçları günceller (dataReplaced)
+
+        Satırlar DataFrame etiketleriyle eşleştirilir: silinen satırlar
+        düşülür, eklenenler eklenir ve yalnızca değeri değişen satırlar
+        yeniden sayılır. Sıralamada hiçbir değer değişmediği için sayaçlara
+        dokunulmaz.
+        """
+        new = _contact_columns(df)
+        old = self._snapshot
+        if not (old.index.is_unique and new.index.is_unique):
+            self.reset(new)
+            return
+
+        removed = old.index.difference(new.index)
+        added = new.index.difference(old.index)
+        common = new.index.intersection(old.index)
+        old_common = old.loc[common]
+        new_common = new.loc[common]
+        changed = np.zeros(len(common), dtype=bool)
+        for column in CONTACT_COLUMNS:
+            before = old_common[column].to_numpy()
+            after = new_common[column].to_numpy()
+            changed |= (before != after) & ~(pd.isna(before) & pd.isna(after))
+
+        if len(removed) + len(added) + changed.sum() > _RESET_RATIO * max(len(new), 1):
+            self.reset(new)
+            return
+        self._apply(pd.concat([old.loc[removed], old_common[changed]]), -1)
+        self._apply(pd.concat([new.loc[added], new_common[changed]]), 1)
+        self._snapshot = new.copy()
+
+    def add_rows(self, df: pd.DataFrame, first: int) -> None:
+        """Tablonun sonuna eklenen satırları sayar (rowsInserted)"""
+        new = _contact_columns(df)
+        if len(self._snapshot) != first:
+            self.reset(new)
+            return
+        rows = new.iloc[first:]
+        self._apply(rows, 1)
+        # Ekleme sırasında mevcut satırların etiketleri yeniden numaralanmış olabilir
+        old = self._snapshot.set_axis(new.index[:first])
+        self._snapshot = pd.concat([old, rows.copy()]) if first else rows.copy()
+
+    def update_rows(self, df: pd.DataFrame, first: int, last: int) -> None:
+        """Yerinde düzenlenen satırları (first..last) yeniden sayar (dataChanged)"""
+        new = _contact_columns(df)
+        if len(self._snapshot) != len(new):
+            self.reset(new)
+            return
+        self._apply(self._snapshot.iloc[first:last + 1], -1)
+        self._apply(new.iloc[first:last + 1], 1)
+        for row in range(first, last + 1):
+            for column in range(len(CONTACT_COLUMNS)):
+                self._snapshot.iat[row, column] = new.iat[row, column]
+
+    def counts(self) -> Dict[str, int]:
+        """Sayaçlar (COUNT_LABELS sırasıyla)"""
+        counts = dict(self._counts)
+        for name, key in _DUPLICATE_KEYS.items():
+            counts[name] = self._totals[key] - len(self._tallies[key])
+        return {name: counts[name] for name in COUNT_LABELS}
+
+    def top_values(self, column: str) -> List[Tuple[str, int]]:
+        """Sütunun en sık değerleri ve adetleri"""
+        if self._top[column] is None:
+            self._top[column] = self._tallies[column].most_common(self.top)
+        return self._top[column]
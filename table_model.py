@@ -1,11 +1,45 @@
-from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from PyQt5.QtCore import (Qt, QAbstractTableModel, QAbstractProxyModel, QModelIndex, pyqtSignal,
+                          QItemSelection, QItemSelectionRange)
+from PyQt5.QtGui import QPixmap
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
 import pandas as pd
+from vcf_handler import ATTACHMENTS_COLUMN, CONTACT_COLUMNS
+from batch import SOURCE_COLUMN
+from collation import sort_keys, sort_order
+import casing
+from casing import lower_text
+from multivalue import MULTI_VALUE_COLUMNS, as_values, format_value, format_column
+from query import compile_query
+
+THUMBNAIL_SIZE = 32
+
+@lru_cache(maxsize=512)
+def _thumbnail(blob):
+    """Fotoğrafı yalnızca görüntülendiğinde çözer ve küçük resim olarak önbelleğe alır"""
+    pixmap = QPixmap()
+    try:
+        data = blob.decode()
+    except Exception:
+        return None
+    if not data or not pixmap.loadFromData(data):
+        return None
+    return pixmap.scaled(THUMBNAIL_SIZE, THUMBNAIL_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
 
 class VCFTableModel(QAbstractTableModel):
+    # Veri yeni bir DataFrame ile değiştirildiğinde yayılır
+    dataReplaced = pyqtSignal(object)
+    
     def __init__(self):
         super().__init__()
         self._data = pd.DataFrame()
-        self._columns = ['Name', 'Phone', 'E-mail', 'Type']
+        self._columns = list(CONTACT_COLUMNS)
+        self._positions = []  # Görünen sütun -> DataFrame'deki sütun konumu
+        self._sort_keys = {}  # Sütun -> önbelleğe alınmış sıralama anahtarları
+        self._search_texts = {}  # Sütun -> filtreler için küçük harfli gösterim metinleri
+        self._version = 0  # Veri her değiştiğinde artar
+        self._layout_version = 0  # Mevcut satırlar değiştiğinde artar (sona ekleme hariç)
     
     def rowCount(self, parent=QModelIndex()):
         return len(self._data)
@@ -18,11 +52,26 @@ class VCFTableModel(QAbstractTableModel):
             return None
         
         if role == Qt.DisplayRole:
-            value = self._data.iloc[index.row(), index.column()]
-            return str(value)
+            value = self._data.iat[index.row(), self._positions[index.column()]]
+            return format_value(value)
+        
+        if role == Qt.DecorationRole and index.column() == 0:
+            return self.photo(index.row())
         
         return None
     
+    def photo(self, row):
+        """Satırdaki kişinin fotoğrafını (varsa) küçük resim olarak döndürür"""
+        if ATTACHMENTS_COLUMN not in self._data.columns:
+            return None
+        blobs = self._data[ATTACHMENTS_COLUMN].iat[row]
+        if not isinstance(blobs, tuple):
+            return None
+        for blob in blobs:
+            if blob.name == 'PHOTO':
+                return _thumbnail(blob)
+        return None
+    
     def headerData(self, section, orientation, role=Qt.DisplayRole):
         if role == Qt.DisplayRole:
             if orientation == Qt.Horizontal:
@@ -31,73 +80,650 @@ class VCFTableModel(QAbstractTableModel):
                 return str(section + 1)
         return None
     
+    def _update_columns(self):
+        # Klasörden açılan tablolarda kaynak dosya sütunu da gösterilir
+        self._columns = list(CONTACT_COLUMNS)
+        if SOURCE_COLUMN in self._data.columns:
+            self._columns.append(SOURCE_COLUMN)
+        self._positions = ([self._data.columns.get_loc(column) for column in self._columns]
+                           if len(self._data.columns) else [])
+    
     def set_data(self, df):
         """DataFrame'i modele yükler"""
         self.beginResetModel()
         self._data = df
+        self._update_columns()
+        self._sort_keys = {}
+        self._search_texts = {}
+        self._version += 1
+        self._layout_version += 1
         self.endResetModel()
+        self.dataReplaced.emit(df)
+    
+    def append_rows(self, df):
+        """Yeni satırları mevcut verinin sonuna ekler (ör. dosya okunurken)"""
+        if df.empty:
+            return
+        first = len(self._data)
+        self.beginInsertRows(QModelIndex(), first, first + len(df) - 1)
+        if self._data.empty:
+            self._data = df.reset_index(drop=True)
+        else:
+            self._data = pd.concat([self._data, df], ignore_index=True)
+        self._update_columns()
+        # Mevcut satırlar değişmediğinden önbellekler yalnızca yeni satırlar için uzatılır
+        for column, keys in self._sort_keys.items():
+            self._sort_keys[column] = np.concatenate((keys, self._column_sort_keys(column, first)))
+        for column, texts in self._search_texts.items():
+            self._search_texts[column] = np.concatenate((texts, self._column_search_texts(column, first)))
+        self._version += 1
+        self.endInsertRows()
+    
+    def _column_sort_keys(self, column, first=0):
+        return sort_keys(format_column(self._data.iloc[first:, self._positions[column]]))
+    
+    def _column_search_texts(self, column, first=0):
+        # Hücre düzenlemelerinde yerinde güncellendiği için yazılabilir bir kopya tutulur
+        return casing.lower(format_column(self._data.iloc[first:, self._positions[column]])).to_numpy(copy=True)
+    
+    def sort_keys(self, column):
+        """Sütunun sıralama anahtarlarını döndürür (ilk istekte hesaplanır)"""
+        keys = self._sort_keys.get(column)
+        if keys is None:
+            keys = self._column_sort_keys(column)
+            self._sort_keys[column] = keys
+        return keys
+    
+    def search_texts(self, column):
+        """Sütunun filtrelemede kullanılan küçük harfli gösterim metinlerini döndürür (ilk istekte hesaplanır)"""
+        texts = self._search_texts.get(column)
+        if texts is None:
+            texts = self._column_search_texts(column)
+            self._search_texts[column] = texts
+        return texts
     
     def get_data(self):
         """Mevcut DataFrame'i döndürür"""
         return self._data
     
+    def data_version(self):
+        """Veri sürümünü döndürür; önbelleğe alınmış sonuçların geçerliliği için kullanılır"""
+        return self._version
+    
+    def layout_version(self):
+        """Mevcut satırlar her değiştiğinde artan sürümü döndürür (sona ekleme hariç)"""
+        return self._layout_version
+    
     def flags(self, index):
-        """Hücrelerin düzenlenebilir olmasını sağlar"""
+        """Hücrelerin düzenlenebilir olmasını sağlar (kaynak dosya sütunu hariç)"""
+        if self._columns[index.column()] == SOURCE_COLUMN:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable
         return Qt.ItemIsEditable | Qt.ItemIsEnabled | Qt.ItemIsSelectable
     
     def setData(self, index, value, role=Qt.EditRole):
         """Hücre değerini günceller"""
         if role == Qt.EditRole:
-            self._data.iloc[index.row(), index.column()] = value
+            if self._columns[index.column()] in MULTI_VALUE_COLUMNS:
+                # Birden fazla değer ';' ile ayrılarak yazılır
+                value = as_values(value)
+            self._data.iat[index.row(), self._positions[index.column()]] = value
+            self._sort_keys.pop(index.column(), None)
+            texts = self._search_texts.get(index.column())
+            if texts is not None:
+                texts[index.row()] = lower_text(format_value(value))
+                self._version += 1
+            self._layout_version += 1
             self.dataChanged.emit(index, index)
             return True
         return False
 
-class VCFProxyModel(QSortFilterProxyModel):
+class VCFProxyModel(QAbstractProxyModel):
+    """
+    Sıralamayı ve filtreleri satır numarası dizileriyle uygulayan proxy
+
+    Kaynak model dosya sırasında kalır; sıralama burada bir permütasyon
+    olarak tutulur ve karşılaştırma başına data() çağırmak yerine önceden
+    hesaplanmış anahtarlarla tek seferde yapılır. Filtreler tüm sütuna
+    vektörel olarak uygulanır ve kabul edilen satırlar bir maske olarak
+    önbelleğe alınır. Görünüm ve kaynak satırları arasındaki eşleme numpy
+    dizileri olduğundan satır eşlemeleri toplu yapılabilir.
+    """
     def __init__(self):
         super().__init__()
+        self._source = None
+        self._connections = []
         self._filters = {}
         self._except_filters = {}  # Store except filters
+        self._query = None  # Derlenmiş sorgu (query.Query)
+        self._mask = None
+        self._mask_key = None
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+        self._order = None  # Sıralı kaynak satırları; None ise dosya sırası
+        self._rows = None  # Görünüm satırı -> kaynak satırı; None ise birebir
+        self._count = 0
+        self._inverse = None  # Kaynak satırı -> görünüm satırı (-1: gizli), ilk istekte hesaplanır
+    
+    def setSourceModel(self, model):
+        self.beginResetModel()
+        for signal, slot in self._connections:
+            signal.disconnect(slot)
+        super().setSourceModel(model)
+        self._source = model
+        self._connections = [
+            (model.modelAboutToBeReset, self.beginResetModel),
+            (model.modelReset, self._source_reset),
+            (model.rowsInserted, self._source_rows_inserted),
+            (model.dataChanged, self._source_data_changed),
+            # Kaynak bunları yaymaz; yayarsa eşleme baştan kurulur
+            (model.rowsRemoved, self._source_changed),
+            (model.layoutChanged, self._source_changed),
+        ]
+        for signal, slot in self._connections:
+            signal.connect(slot)
+        self._mask_key = None
+        self._order = self._sorted_rows()
+        self._set_rows(self._mapped_rows(self._order))
+        self.endResetModel()
+    
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not 0 <= row < self._count or not 0 <= column < self.columnCount():
+            return QModelIndex()
+        return self.createIndex(row, column)
+    
+    def parent(self, index=None):
+        if index is None:
+            return super().parent()
+        return QModelIndex()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+    
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self._source is None:
+            return 0
+        return self._source.columnCount()
+    
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        row = proxy_index.row() if self._rows is None else int(self._rows[proxy_index.row()])
+        return self._source.index(row, proxy_index.column())
+    
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        row = source_index.row()
+        if self._rows is not None:
+            row = int(self._proxy_of()[row])
+        return self.index(row, source_index.column())
+    
+    def _proxy_of(self):
+        if self._inverse is None:
+            inverse = np.full(self._source.rowCount(), -1, dtype=np.int64)
+            inverse[self._rows] = np.arange(len(self._rows))
+            self._inverse = inverse
+        return self._inverse
+    
+    def _sorted_rows(self):
+        """Geçerli sıralamaya göre kaynak satırları; sıralama yoksa None"""
+        if self._sort_column < 0 or self._source is None or not self._source.rowCount():
+            return None
+        keys = self._source.sort_keys(self._sort_column)
+        return sort_order(keys, self._sort_order == Qt.AscendingOrder)
+    
+    def _mapped_rows(self, order):
+        """Sıralama ve filtrelerden görünüm satırı -> kaynak satırı dizisini kurar (birebirse None)"""
+        if not self.has_filters():
+            return order
+        mask = self.accepted_mask()
+        return np.flatnonzero(mask) if order is None else order[mask[order]]
+    
+    def _set_rows(self, rows):
+        self._rows = rows
+        self._count = self._source.rowCount() if rows is None else len(rows)
+        self._inverse = None
+    
+    def _relayout(self, order):
+        """
+        Eşlemeyi yeniden kurar; kalıcı indeksler (seçim, geçerli hücre) kaynak
+        satırları üzerinden yeni konumlarına taşınır
+        """
+        rows = self._mapped_rows(order)
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        source_indexes = [self.mapToSource(index) for index in old_indexes]
+        self._order = order
+        self._set_rows(rows)
+        self.changePersistentIndexList(old_indexes, [self.mapFromSource(index) for index in source_indexes])
+        self.layoutChanged.emit()
+    
+    def _source_reset(self):
+        # Yeni veri de geçerli sütuna göre sıralı gösterilir
+        self._mask_key = None
+        self._order = self._sorted_rows()
+        self._set_rows(self._mapped_rows(self._order))
+        self.endResetModel()
+    
+    def _source_changed(self, *args):
+        self.beginResetModel()
+        self._source_reset()
+    
+    def _source_rows_inserted(self, parent, first, last):
+        if last + 1 != self._source.rowCount():
+            self._source_changed()
+            return
+        # Sona eklenen satırlar (ör. dosya okunurken) sıralamadan bağımsız olarak sonda gösterilir
+        order = self._order
+        if order is not None:
+            order = np.concatenate((order, np.arange(first, last + 1)))
+        rows = self._mapped_rows(order)
+        count = self._count
+        added = (self._source.rowCount() if rows is None else len(rows)) - count
+        if added > 0:
+            self.beginInsertRows(QModelIndex(), count, count + added - 1)
+        self._order = order
+        self._set_rows(rows)
+        if added > 0:
+            self.endInsertRows()
+    
+    def _source_data_changed(self, top_left, bottom_right, roles=()):
+        if self.has_filters():
+            # Düzenlenen satır artık filtrelere uymuyorsa (veya uymaya başladıysa) görünüm güncellenir
+            rows = self._mapped_rows(self._order)
+            if len(rows) != self._count or not np.array_equal(rows, self._rows):
+                self._relayout(self._order)
+                return
+        rows = self.proxy_rows(np.arange(top_left.row(), bottom_right.row() + 1))
+        for top, bottom in row_ranges(rows):
+            self.dataChanged.emit(self.index(top, top_left.column()),
+                                  self.index(bottom, bottom_right.column()), roles)
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        Satırları sütuna göre Türkçe harf sırasıyla gösterir; kaynak model
+        dosya sırasında kalır. column < 0 dosya sırasına döner.
+        """
+        self._sort_column = column
+        self._sort_order = order
+        if self._source is not None:
+            self._relayout(self._sorted_rows())
     
     def set_filter(self, column, text):
         """Belirli bir sütun için filtre ayarlar"""
         if text.startswith('!'):  # Except filter
-            self._except_filters[column] = text[1:].lower().split(',')
+            self._except_filters[column] = [word.strip() for word in lower_text(text[1:]).split(',')
+                                            if word.strip()]
             self._filters[column] = ''  # Clear normal filter
         else:
-            self._filters[column] = text.lower()
+            self._filters[column] = lower_text(text)
             self._except_filters[column] = []  # Clear except filter
-        self.invalidateFilter()
+        self.invalidate()
+    
+    def set_query(self, text):
+        """
+        Sorgu dilindeki filtreyi derler ve uygular; boş metin sorguyu kaldırır
+
+        Raises:
+            QueryError: Sorgu geçersizse (mevcut sorgu değişmez)
+        """
+        self._query = compile_query(text)
+        self.invalidate()
     
     def clear_filters(self):
         """Tüm filtreleri temizler"""
         self._filters.clear()
         self._except_filters.clear()
-        self.invalidateFilter()
-    
-    def filterAcceptsRow(self, source_row, source_parent):
-        """Satırın filtrelere uyup uymadığını kontrol eder"""
-        # Check normal filters
-        for column, filter_text in self._filters.items():
-            if not filter_text:
-                continue
-                
-            index = self.sourceModel().index(source_row, column, source_parent)
-            value = str(self.sourceModel().data(index, Qt.DisplayRole)).lower()
-            
-            if filter_text not in value:
-                return False
-        
-        # Check except filters
-        for column, except_words in self._except_filters.items():
-            if not except_words:
-                continue
-                
-            index = self.sourceModel().index(source_row, column, source_parent)
-            value = str(self.sourceModel().data(index, Qt.DisplayRole)).lower()
-            
-            # If any of the except words are in the value, reject the row
-            if any(word.strip() in value for word in except_words):
-                return False
-        
-        return True 
\ No newline at end of file
+        self._query = None
+        self.invalidate()
+    
+    def invalidate(self):
+        """Filtreler değiştiğinde görünümdeki satırları tek seferde yeniden kurar"""
+        self._mask_key = None
+        if self._source is not None:
+            self._relayout(self._order)
+    
+    def has_filters(self):
+        return any(self._filters.values()) or any(self._except_filters.values()) or self._query is not None
+    
+    def _rows_mask(self, source, first=0):
+        """Kaynak satırların first'ten sonuna kadar olan kısmı için filtre maskesi"""
+        mask = np.ones(source.rowCount() - first, dtype=bool)
+        for column, text in self._filters.items():
+            if text:
+                texts = pd.Series(source.search_texts(column)[first:])
+                mask &= texts.str.contains(text, regex=False).to_numpy()
+        for column, words in self._except_filters.items():
+            for word in words:
+                texts = pd.Series(source.search_texts(column)[first:])
+                mask &= ~texts.str.contains(word, regex=False).to_numpy()
+        if self._query is not None:
+            # Sorgu, sütun filtreleriyle aynı küçük harfli metin önbelleğini kullanır
+            data = source.get_data().iloc[first:]
+            mask &= self._query.mask(data, lambda name: source.search_texts(source._columns.index(name))[first:])
+        return mask
+    
+    def accepted_mask(self):
+        """
+        Kaynak satırların filtrelere uyup uymadığını gösteren maske (kaynak değişene kadar önbellekte)
+
+        Kaynağın sonuna satır eklendiğinde (ör. dosya okunurken) yalnızca yeni
+        satırlar filtrelenir ve maske uzatılır.
+        """
+        source = self.sourceModel()
+        key = source.layout_version()
+        rows = source.rowCount()
+        if self._mask_key == key and len(self._mask) == rows:
+            return self._mask
+        if self._mask_key == key and len(self._mask) < rows:
+            mask = np.concatenate((self._mask, self._rows_mask(source, len(self._mask))))
+        else:
+            mask = self._rows_mask(source)
+        self._mask = mask
+        self._mask_key = key
+        return mask
+    
+    def source_rows(self, rows):
+        """Görünüm satır numaralarını toplu olarak kaynak satır numaralarına çevirir"""
+        rows = np.asarray(rows, dtype=np.int64)
+        if self._rows is None:
+            return rows
+        return self._rows[rows]
+    
+    def proxy_rows(self, source_rows):
+        """Kaynak satırları görünüm satırlarına çevirir; görünümde olmayanlar atlanır"""
+        source_rows = np.asarray(source_rows, dtype=np.int64)
+        source_rows = source_rows[(source_rows >= 0) & (source_rows < self._source.rowCount())]
+        if self._rows is None:
+            return source_rows
+        rows = self._proxy_of()[source_rows]
+        return rows[rows >= 0]
+    
+    def selection(self, source_rows):
+        """Kaynak satırları seçen, ardışık satırları tek aralıkta birleştiren bir QItemSelection döndürür"""
+        selection = QItemSelection()
+        last_column = self.columnCount() - 1
+        for top, bottom in row_ranges(self.proxy_rows(source_rows)):
+            selection.append(QItemSelectionRange(self.index(top, 0), self.index(bottom, last_column)))
+        return selection
+
+
+def _sorted_unique(rows):
+    # np.unique'ten hızlı: aralıklardan gelen satırlar çoğunlukla zaten sıralıdır
+    rows = np.sort(np.asarray(rows, dtype=np.int64))
+    if len(rows) > 1:
+        rows = rows[np.concatenate(([True], rows[1:] != rows[:-1]))]
+    return rows
+
+
+def row_ranges(rows):
+    """Satır numaralarını sıralı, ardışık (ilk, son) aralıklarına ayırır"""
+    rows = _sorted_unique(rows)
+    if not len(rows):
+        return []
+    breaks = np.flatnonzero(np.diff(rows) != 1)
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    ends = np.concatenate((rows[breaks], [rows[-1]]))
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def selected_rows(view):
+    """
+    Görünümde seçili satır numaralarını seçim aralıklarından okur
+
+    selectedRows() gibi satır başına bir indeks oluşturmaz; büyük seçimlerde
+    de yalnızca aralık sayısı kadar işlem yapılır.
+    """
+    ranges = [np.arange(selection_range.top(), selection_range.bottom() + 1)
+              for selection_range in view.selectionModel().selection()]
+    if not ranges:
+        return np.empty(0, dtype=np.int64)
+    return _sorted_unique(np.concatenate(ranges))
+
+
+class ChangePreviewModel(QAbstractTableModel):
+    """Toplu değişiklikleri (ör. eski → yeni) tembel olarak gösteren salt okunur model"""
+    PAGE_SIZE = 1000
+
+    def __init__(self, headers, columns):
+        super().__init__()
+        self._headers = list(headers)
+        # Series üzerinden: demet değerler (ör. telefon listeleri) tek hücre olarak kalır
+        self._columns = [pd.Series(column, dtype=object).to_numpy() for column in columns]
+        self._size = len(self._columns[0]) if self._columns else 0
+        self._total = self._size
+        self._loaded = min(self._total, self.PAGE_SIZE)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self._headers)
+
+    def total_rows(self):
+        """Önizlemedeki toplam satır sayısını döndürür"""
+        return self._total
+
+    def set_row_limit(self, count):
+        """Yalnızca ilk `count` satırı gösterir (ör. skora göre sıralı eşleşmelerde eşik)"""
+        count = max(0, min(count, self._size))
+        if count == self._total:
+            return
+        self.beginResetModel()
+        self._total = count
+        self._loaded = min(count, max(self._loaded, self.PAGE_SIZE))
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Bir sonraki sayfayı görünüme ekler"""
+        if parent.isValid():
+            return
+        count = min(self.PAGE_SIZE, self._total - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return format_value(self._columns[index.column()][index.row()])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            if orientation == Qt.Horizontal:
+                return self._headers[section]
+            if orientation == Qt.Vertical:
+                return str(section + 1)
+        return None
+
+
+class MatchTableModel(ChangePreviewModel):
+    """Eşleşmeleri işaretlenebilir satırlar olarak gösteren model.
+
+    İşaret durumu varsayılan bir değer ve satır bazlı istisnalar olarak
+    tutulur; böylece tümünü seç/temizle işlemleri eşleşme sayısından
+    bağımsızdır.
+    """
+
+    def __init__(self, matches):
+        refs, names, scores = zip(*matches) if matches else ((), (), ())
+        super().__init__(['', 'Reference', 'Contact', 'Score'],
+                         [np.empty(len(names), dtype=object), refs, names, scores])
+        self._default_checked = False
+        self._overrides = {}
+
+    def is_checked(self, row):
+        return self._overrides.get(row, self._default_checked)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if index.column() == 0:
+            if role == Qt.CheckStateRole:
+                return Qt.Checked if self.is_checked(index.row()) else Qt.Unchecked
+            return None
+        if index.column() == 3 and role == Qt.DisplayRole:
+            return f"{self._columns[3][index.row()]}%"
+        return super().data(index, role)
+
+    def flags(self, index):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == 0:
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        """Tek bir satırın işaret durumunu değiştirir"""
+        if role != Qt.CheckStateRole or index.column() != 0:
+            return False
+        checked = value == Qt.Checked
+        if checked == self._default_checked:
+            self._overrides.pop(index.row(), None)
+        else:
+            self._overrides[index.row()] = checked
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def set_all_checked(self, checked):
+        """Tüm satırları tek seferde işaretler veya işaretini kaldırır"""
+        self._default_checked = checked
+        self._overrides = {}
+        if self._loaded:
+            self.dataChanged.emit(self.index(0, 0), self.index(self._loaded - 1, 0),
+                                  [Qt.CheckStateRole])
+
+    def checked_rows(self):
+        """İşaretli satırların indekslerini döndürür"""
+        if self._default_checked:
+            mask = np.ones(self._total, dtype=bool)
+        else:
+            mask = np.zeros(self._total, dtype=bool)
+        for row, checked in self._overrides.items():
+            if row < self._total:
+                mask[row] = checked
+        return np.flatnonzero(mask)
+
+    def checked_names(self):
+        """İşaretli eşleşmelerin kişi isimlerini döndürür"""
+        return self._columns[2][self.checked_rows()].tolist()
+
+
+class SQLiteTableModel(QAbstractTableModel):
+    """SQLite arşivindeki kişileri sayfa sayfa okuyan model.
+
+    Görünüme satırlar canFetchMore/fetchMore ile eklenir; veriler yalnızca
+    son kullanılan sayfalar kadar bellekte tutulur. Filtre ve sıralama
+    arşivde SQL ile uygulanır.
+    """
+    PAGE_SIZE = 1000
+    CACHED_PAGES = 50
+
+    def __init__(self, store):
+        super().__init__()
+        self._store = store
+        self._columns = ['Name', 'Phone', 'E-mail', 'Type']
+        self._pages = OrderedDict()
+        self._total = store.refresh()
+        self._loaded = min(self._total, self.PAGE_SIZE)
+
+    def store(self):
+        return self._store
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self._columns)
+
+    def total_rows(self):
+        """Filtreye uyan toplam satır sayısını döndürür"""
+        return self._total
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Bir sonraki sayfayı görünüme ekler"""
+        if parent.isValid():
+            return
+        count = min(self.PAGE_SIZE, self._total - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def _row(self, row):
+        page_number = row // self.PAGE_SIZE
+        page = self._pages.get(page_number)
+        if page is None:
+            page = self._store.fetch(page_number * self.PAGE_SIZE, self.PAGE_SIZE)
+            self._pages[page_number] = page
+            if len(self._pages) > self.CACHED_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_number)
+        offset = row - page_number * self.PAGE_SIZE
+        return page[offset] if offset < len(page) else None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        row = self._row(index.row())
+        if row is None:
+            return None
+        return format_value(row[index.column() + 1])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            if orientation == Qt.Horizontal:
+                return self._columns[section]
+            if orientation == Qt.Vertical:
+                return str(section + 1)
+        return None
+
+    def flags(self, index):
+        return Qt.ItemIsEditable | Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        """Hücreyi arşivde günceller"""
+        if role != Qt.EditRole:
+            return False
+        row = self._row(index.row())
+        if row is None:
+            return False
+        self._store.update_cell(row[0], index.column(), value)
+        self._pages.pop(index.row() // self.PAGE_SIZE, None)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def refresh(self):
+        """Arşivdeki değişikliklerden sonra görünümü yeniden okur"""
+        self.beginResetModel()
+        self._pages.clear()
+        self._total = self._store.refresh()
+        self._loaded = min(self._total, self.PAGE_SIZE)
+        self.endResetModel()
+
+    def set_filter(self, column, text):
+        """Belirli bir sütun için filtre ayarlar"""
+        self._store.set_filter(column, text)
+        self.refresh()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Arşivi sütuna göre sıralar"""
+        self._store.set_sort(None if column < 0 else column, order == Qt.AscendingOrder)
+        self.refresh()
+
+    def ids(self, rows):
+        """Görünümdeki satırların kişi kimliklerini döndürür"""
+        return self._store.ids_at(sorted(rows))
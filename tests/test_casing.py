@@ -0,0 +1,31 @@
+import re
+import pandas as pd
+import casing
+
+VALUES = pd.Series(['istanbul ışık', 'İZMİR ılıca', None, 'çağrı ŞAHİN', ''])
+
+def test_title_case_uses_turkish_dotted_and_dotless_i():
+    assert casing.title_case(pd.Series(['istanbul ışık'])).tolist() == ['İstanbul Işık']
+    assert casing.title_case(VALUES).tolist()[:2] == ['İstanbul Işık', 'İzmir Ilıca']
+
+def test_upper_and_lower():
+    assert casing.upper(VALUES).tolist()[:2] == ['İSTANBUL IŞIK', 'İZMİR ILICA']
+    assert casing.lower(VALUES).tolist()[:2] == ['istanbul ışık', 'izmir ılıca']
+    assert casing.upper_text('istanbul ılık') == 'İSTANBUL ILIK'
+    assert casing.lower_text('IŞIK İzmir') == 'ışık izmir'
+
+def test_missing_and_empty_values_are_kept():
+    for convert in (casing.upper, casing.lower, casing.title_case, casing.last_word_upper):
+        result = convert(VALUES)
+        assert pd.isna(result[2])
+        assert result[4] == ''
+
+def test_last_word_upper():
+    assert casing.last_word_upper(pd.Series(['ali veli yılmaz', 'iş'])).tolist() == ['ali veli YILMAZ', 'İŞ']
+
+def test_caseless_pattern_keeps_i_and_dotless_i_apart():
+    pattern = casing.caseless_pattern('ışık')
+    assert re.fullmatch(pattern, 'IŞIK')
+    assert not re.fullmatch(pattern, 'ISIK')
+    assert re.fullmatch(casing.caseless_regex('istanbul'), 'İSTANBUL')
+    assert not re.fullmatch(casing.caseless_regex('istanbul'), 'ISTANBUL')
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from emails import domain_index, duplicate_keys, invalid_emails, normalize_emails, parse_emails
+
+VALID = [
+    ('a@b.com', 'a@b.com'),
+    (' A@B.Com ', 'a@b.com'),
+    ('ali.veli+tag@mail.example.co', 'ali.veli+tag@mail.example.co'),
+    ('ayşe@örnek.com.tr', 'ayşe@örnek.com.tr'),
+    ('x' * 64 + '@b.com', 'x' * 64 + '@b.com'),
+    ("o'neil@x.org", "o'neil@x.org"),
+]
+
+INVALID = [
+    'a@b', 'a@@b.com', '.a@b.com', 'a.@b.com', 'a..b@c.com', 'a@b..com', 'a@-b.com',
+    'a@b-.com', 'a@b.c', 'a b@c.com', 'a@b.com.', '@b.com', 'a@.b.com', 'x' * 65 + '@b.com',
+    'a@b_c.com', '😀@b.com', '', 'a@1.2.3.4',
+]
+
+@pytest.mark.parametrize('address, normalized', VALID)
+def test_valid_addresses(address, normalized):
+    parts = parse_emails(pd.Series([address]))
+    assert parts['valid'].tolist() == [True]
+    assert parts['address'].tolist() == [normalized]
+
+@pytest.mark.parametrize('address', INVALID)
+def test_invalid_addresses(address):
+    assert parse_emails(pd.Series([address]))['valid'].tolist() == [False]
+
+def test_domains():
+    parts = parse_emails(pd.Series([address for address, _ in VALID] + INVALID[:3]))
+    valid = parts['valid'].to_numpy()
+    assert set(parts['domain'][valid]) == {'b.com', 'mail.example.co', 'örnek.com.tr', 'x.org'}
+
+@pytest.fixture
+def emails():
+    return pd.Series([(' A@X.com', 'a@x.com ', ''), 'q@w.com;Q@W.COM', ('b@y.org', 'c@z.com'),
+                      ('c@z.com', 'b@y.org'), (), ('bad@',), None], dtype=object)
+
+def test_normalize_emails(emails):
+    assert normalize_emails(emails).tolist() == [
+        ('a@x.com',), ('q@w.com',), ('b@y.org', 'c@z.com'), ('c@z.com', 'b@y.org'), (), ('bad@',), ()]
+
+def test_invalid_emails_ignores_blank_values(emails):
+    assert invalid_emails(emails).tolist() == [False, False, False, False, False, True, False]
+
+def test_duplicate_keys_ignore_order_and_case(emails):
+    assert duplicate_keys(emails).tolist() == [
+        'a@x.com', 'q@w.com', 'b@y.org;c@z.com', 'b@y.org;c@z.com', '', 'bad@', '']
+
+def test_domain_index_counts_each_contact_once(emails):
+    index = domain_index(emails)
+    assert sorted(index) == ['w.com', 'x.com', 'y.org', 'z.com']
+    np.testing.assert_array_equal(index['x.com'], [0])
+    np.testing.assert_array_equal(index['y.org'], [2, 3])
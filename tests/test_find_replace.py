@@ -0,0 +1,52 @@
+import pandas as pd
+from find_replace import FindReplaceEngine, ReplaceRule, load_rules
+
+def test_literals_share_one_pass_between_regex_rules():
+    engine = FindReplaceEngine([
+        ReplaceRule('Str', 'Street'), ReplaceRule('St', 'Saint'), ReplaceRule('Cad', 'Caddesi'),
+        ReplaceRule(r'(\d{3})-(\d{4})', r'\2-\1', regex=True),
+        ReplaceRule('No', 'Numara'),
+    ])
+    # Düz kurallar regex kuralının iki yanında ayrı trie desenlerinde birleşir
+    assert len(engine._passes) == 3
+    values = pd.Series(['St Str Cad', 'Cad 123-4567 No', 'x'])
+    assert engine.apply(values).tolist() == ['Saint Street Caddesi', 'Caddesi 4567-123 Numara', 'x']
+
+def test_merged_literals_do_not_chain():
+    # Tek geçişte uygulandıkları için 'a' -> 'b' sonucu 'b' -> 'c' ile yeniden değişmez
+    engine = FindReplaceEngine([ReplaceRule('a', 'b'), ReplaceRule('b', 'c')])
+    assert engine.apply(pd.Series(['ab'])).tolist() == ['bc']
+
+def test_regex_capture_groups_in_multi_value_cells():
+    engine = FindReplaceEngine([ReplaceRule(r'^\+90(\d+)$', r'0\1', regex=True)])
+    df = pd.DataFrame({'Phone': [('+905321112233', '02121112233'), ()]})
+    result = engine.apply_frame(df, ['Phone'])
+    assert result['Phone'].tolist() == [('05321112233', '02121112233'), ()]
+
+def test_turkish_case_insensitive_literals():
+    engine = FindReplaceEngine([ReplaceRule('İSTANBUL', 'İst.')])
+    assert engine.apply(pd.Series(['istanbul', 'Istanbul'])).tolist() == ['İst.', 'Istanbul']
+    sensitive = FindReplaceEngine([ReplaceRule('Ali', 'Veli')], case_sensitive=True)
+    assert sensitive.apply(pd.Series(['Ali ali'])).tolist() == ['Veli ali']
+
+def test_dry_run_counts_without_changing_data():
+    engine = FindReplaceEngine([
+        ReplaceRule('St', 'Saint'),
+        ReplaceRule(r'(\d{3})-(\d{4})', r'\2-\1', regex=True),
+    ])
+    df = pd.DataFrame({
+        'Name': ['St St', '123-4567', 'x'],
+        'Phone': [('123-4567', '555-1111'), (), ('St',)],
+    })
+    before = df.copy()
+    assert engine.count_matches(df, ['Name', 'Phone']) == {'Name': (2, 3), 'Phone': (2, 3)}
+    assert engine.count_matches(df, ['Name'], rows=[1, 2]) == {'Name': (1, 1)}
+    pd.testing.assert_frame_equal(df, before)
+
+def test_load_rules(tmp_path):
+    text_file = tmp_path / 'rules.txt'
+    text_file.write_text('Cad. => Caddesi\n\nSok =>\n', encoding='utf-8')
+    assert load_rules(str(text_file)) == [ReplaceRule('Cad.', 'Caddesi'), ReplaceRule('Sok', '')]
+    csv_file = tmp_path / 'rules.csv'
+    csv_file.write_text('Mah.,Mahallesi\nBlv,\n', encoding='utf-8')
+    assert load_rules(str(csv_file)) == [ReplaceRule('Mah.', 'Mahallesi'), ReplaceRule('Blv', '')]
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+from query import QueryError, compile_query
+
+@pytest.fixture
+def contacts():
+    return pd.DataFrame({
+        'Name': ['Ali Veli', 'Ayşe', 'Mehmet', 'Işık', None],
+        'Phone': [('111', '222'), ('333',), (), ('444',), ()],
+        'E-mail': [('a@x.com',), (), ('m@y.org',), (), ()],
+        'Type': ['', '', '', '', ''],
+    })
+
+def rows(query, df):
+    return compile_query(query).mask(df).nonzero()[0].tolist()
+
+@pytest.mark.parametrize('query, expected', [
+    # NOT, AND'den; AND, OR'dan önce bağlanır
+    ('ali OR ayşe mehmet', [0]),
+    ('ali OR ayşe AND mehmet', [0]),
+    ('(ali OR ayşe) 333', [1]),
+    ('NOT ali OR mehmet', [1, 2, 3, 4]),
+    ('NOT (ali OR mehmet)', [1, 3, 4]),
+    ('-ali -ayşe', [2, 3, 4]),
+    ('ali AND NOT has:phone', []),
+])
+def test_operator_precedence(contacts, query, expected):
+    assert rows(query, contacts) == expected
+
+@pytest.mark.parametrize('query, expected', [
+    ('count(phone)>1', [0]),
+    ('count(phone)=0', [2, 4]),
+    ('count(tel)>=1', [0, 1, 3]),
+    ('COUNT(email)!=0', [0, 2]),
+    ('len(name)<5', [1, 3, 4]),
+    ('len(name)>=6', [0, 2]),
+    ('len(name)=0', [4]),
+])
+def test_count_and_len(contacts, query, expected):
+    assert rows(query, contacts) == expected
+
+@pytest.mark.parametrize('query, expected', [
+    ('name:=ayşe', [1]),
+    ('email:/@x\\.com$/', [0]),
+    ('has:email', [0, 2]),
+    ('empty:phone', [2, 4]),
+    ('name:ışık', [3]),
+    ('phone:"33"', [1]),
+])
+def test_terms(contacts, query, expected):
+    assert rows(query, contacts) == expected
+
+@pytest.mark.parametrize('query, message', [
+    ('(ali', "Missing ')'"),
+    ('(ali OR ayşe', "Missing ')'"),
+    ('ali)', "Unbalanced ')'"),
+    ('ali OR', "Unexpected end of query"),
+    ('name:/[/', "Invalid regular expression /[/"),
+    ('foo:bar', "Unknown field 'foo'"),
+    ('AND ali', "Unexpected 'AND'"),
+])
+def test_error_messages(query, message):
+    with pytest.raises(QueryError) as error:
+        compile_query(query)
+    assert str(error.value).startswith(message)
+
+def test_empty_query_is_none():
+    assert compile_query('') is None
+    assert compile_query('   ') is None
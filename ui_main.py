@@ -1,95 +1,139 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QTableView, QPushButton, QFileDialog, QMessageBox,
                              QLineEdit, QLabel, QGroupBox, QInputDialog, QAction,
-                             QTextEdit, QDialog, QDialogButtonBox, QCheckBox, QScrollArea)
-from PyQt5.QtCore import Qt
+                             QDialog, QDialogButtonBox, QCheckBox, QProgressDialog, QSlider,
+                             QDockWidget, QTreeWidget, QTreeWidgetItem)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QItemSelectionModel
 from PyQt5.QtGui import QColor
+import os
 import qdarkstyle
+import numpy as np
 import pandas as pd
-from table_model import VCFTableModel, VCFProxyModel
-from vcf_handler import VCFHandler
-import re
+from table_model import (VCFTableModel, VCFProxyModel, ChangePreviewModel, MatchTableModel,
+                         SQLiteTableModel, selected_rows)
+from vcf_handler import VCFHandler, CONTACT_COLUMNS
+from loader import VCFLoader
+from operations import find_duplicates, DUPLICATE_MODES
+from emails import invalid_emails
+from pipeline import Pipeline
+from find_replace import FindReplaceEngine, ReplaceRule, load_rules
+from autosave import AutosaveManager
+from batch import collect_files, parse_files, export_per_source, export_sharded, manifest_path, SOURCE_COLUMN
+from vcf_diff import compare_vcf, DIFF_COLUMNS
+from sqlite_store import SQLiteStore
+from master_index import MasterIndex, CHECK_COLUMNS
+from stats import ContactStats, COUNT_LABELS, COUNT_QUERIES, TOP_LABELS, value_query
+from compression import VCF_PATTERNS
+from similarity import SimilarityCache, MIN_SCORE, score_floor, load_references
+from query import QueryError
 from PyQt5.QtWidgets import QApplication
-from fuzzywuzzy import fuzz
-from fuzzywuzzy import process
 
-def normalize_phone(phone):
-    """Normalizes phone numbers by removing non-digit characters and ensuring proper format"""
-    if pd.isna(phone):
-        return phone
-    
-    # Remove all non-digit characters
-    digits = re.sub(r'\D', '', str(phone))
-    
-    # If empty after cleaning, return original
-    if not digits:
-        return phone
-    
-    # If starts with 0, remove it
-    if digits.startswith('0'):
-        digits = digits[1:]
+QUERY_HELP = (
+    "field:text  field:\"quoted text\"  field:=exact  field:/regex/\n"
+    "has:field  empty:field  count(field)>1  len(field)<3\n"
+    "AND, OR, NOT (or -), parentheses; words without a field search every column\n"
+    "Fields: name, phone, email, type"
+)
+
+class ThresholdSlider(QWidget):
+    """Similarity threshold slider; moving it only re-slices already computed scores"""
+    valueChanged = pyqtSignal(int)
     
-    # If starts with 90, remove it
-    if digits.startswith('90'):
-        digits = digits[2:]
+    def __init__(self, value, minimum=MIN_SCORE, parent=None):
+        super().__init__(parent)
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(QLabel("Similarity threshold:"))
+        self.slider = QSlider(Qt.Horizontal)
+        self.slider.setRange(minimum, 100)
+        self.slider.setValue(max(minimum, min(value, 100)))
+        self.slider.valueChanged.connect(self._value_changed)
+        layout.addWidget(self.slider)
+        self.value_label = QLabel(f"{self.slider.value()}%")
+        layout.addWidget(self.value_label)
+        self.setLayout(layout)
     
-    # If less than 10 digits, return original
-    if len(digits) < 10:
-        return phone
+    def value(self):
+        return self.slider.value()
     
-    # Format as +90 5XX XXX XX XX
-    if len(digits) == 10:
-        return f"+90 {digits[:3]} {digits[3:6]} {digits[6:8]} {digits[8:]}"
+    def _value_changed(self, value):
+        self.value_label.setText(f"{value}%")
+        self.valueChanged.emit(value)
+
+class ChangePreviewDialog(QDialog):
+    """Shows bulk changes in a lazily rendered table instead of a text dump"""
+    def __init__(self, title, summary, headers, columns, confirm=False, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.setMinimumSize(600, 400)
+        
+        layout = QVBoxLayout()
+        self.summary_label = QLabel(summary)
+        layout.addWidget(self.summary_label)
+        
+        # Only visible rows are rendered by the view
+        self.preview_model = ChangePreviewModel(headers, columns)
+        self.preview_view = QTableView()
+        self.preview_view.setModel(self.preview_model)
+        self.preview_view.setAlternatingRowColors(True)
+        self.preview_view.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.preview_view)
+        
+        # Add buttons
+        if confirm:
+            button_box = QDialogButtonBox(QDialogButtonBox.Yes | QDialogButtonBox.No)
+        else:
+            button_box = QDialogButtonBox(QDialogButtonBox.Ok)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+        
+        self.setLayout(layout)
     
-    return phone
+    def add_threshold_slider(self, value, on_change, minimum=MIN_SCORE):
+        """Adds a threshold slider above the preview; on_change(threshold) updates the rows"""
+        self.threshold_slider = ThresholdSlider(value, minimum)
+        self.threshold_slider.valueChanged.connect(on_change)
+        self.layout().insertWidget(1, self.threshold_slider)
+        on_change(self.threshold_slider.value())
 
 class MatchDialog(QDialog):
-    def __init__(self, matches, parent=None):
+    """Shows reference list matches sorted by score; the threshold slider hides weaker ones"""
+    def __init__(self, pairs, threshold=None, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Matching Records")
         self.setMinimumSize(600, 400)
         
-        # Store matches
-        self.matches = matches
-        self.selected_indices = []
-        self.checkboxes = []  # Store checkboxes for select all functionality
+        # Store matches (sorted by score, so a threshold keeps a prefix)
+        self.pairs = pairs
+        self.match_model = MatchTableModel(list(zip(pairs.first, pairs.second, pairs.scores)))
         
         # Create layout
         layout = QVBoxLayout()
-        
-        # Add Select All button
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+        self.threshold_slider = None
+        if threshold is not None:
+            self.threshold_slider = ThresholdSlider(threshold)
+            self.threshold_slider.valueChanged.connect(self.set_threshold)
+            layout.addWidget(self.threshold_slider)
+        
+        # Add Select All / Clear All buttons
+        select_layout = QHBoxLayout()
         select_all_btn = QPushButton("Select All")
         select_all_btn.clicked.connect(self.select_all)
-        layout.addWidget(select_all_btn)
-        
-        # Create scroll area
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll_widget = QWidget()
-        scroll_layout = QVBoxLayout()
-        
-        # Add matches with checkboxes
-        for ref_name, contact_name, score in matches:
-            match_widget = QWidget()
-            match_layout = QHBoxLayout()
-            
-            # Checkbox
-            checkbox = QCheckBox()
-            checkbox.stateChanged.connect(lambda state, idx=len(self.selected_indices): self.on_checkbox_changed(state, idx))
-            match_layout.addWidget(checkbox)
-            self.checkboxes.append(checkbox)  # Store checkbox
-            
-            # Match details
-            details = QLabel(f"Reference: {ref_name}\nContact: {contact_name}\nScore: {score}%")
-            match_layout.addWidget(details)
-            
-            match_widget.setLayout(match_layout)
-            scroll_layout.addWidget(match_widget)
-            self.selected_indices.append(None)  # Placeholder for selected index
-        
-        scroll_widget.setLayout(scroll_layout)
-        scroll.setWidget(scroll_widget)
-        layout.addWidget(scroll)
+        clear_all_btn = QPushButton("Clear All")
+        clear_all_btn.clicked.connect(self.clear_all)
+        select_layout.addWidget(select_all_btn)
+        select_layout.addWidget(clear_all_btn)
+        layout.addLayout(select_layout)
+        
+        # Matches with check boxes
+        self.match_view = QTableView()
+        self.match_view.setModel(self.match_model)
+        self.match_view.setAlternatingRowColors(True)
+        self.match_view.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.match_view)
         
         # Add buttons
         button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -98,22 +142,447 @@ class MatchDialog(QDialog):
         layout.addWidget(button_box)
         
         self.setLayout(layout)
+        self.set_threshold(threshold if self.threshold_slider is None else self.threshold_slider.value())
+    
+    def set_threshold(self, threshold):
+        """Shows only the matches scoring at least the threshold"""
+        count = len(self.pairs) if threshold is None else self.pairs.count_at(threshold)
+        self.match_model.set_row_limit(count)
+        self.summary_label.setText(f"{count} of {len(self.pairs)} matches shown:")
+    
+    def threshold(self):
+        return self.threshold_slider.value() if self.threshold_slider else None
     
     def select_all(self):
-        """Selects all checkboxes"""
-        for checkbox in self.checkboxes:
-            checkbox.setChecked(True)
+        """Checks all matches"""
+        self.match_model.set_all_checked(True)
     
-    def on_checkbox_changed(self, state, index):
-        if state == Qt.Checked:
-            self.selected_indices[index] = self.matches[index][1]  # Store contact name
-        else:
-            self.selected_indices[index] = None
+    def clear_all(self):
+        """Unchecks all matches"""
+        self.match_model.set_all_checked(False)
     
     def get_selected_matches(self):
-        return [idx for idx in self.selected_indices if idx is not None]
+        return self.match_model.checked_names()
+
+class FindReplaceDialog(QDialog):
+    """Collects find/replace rules and target columns, with a dry-run match count"""
+    def __init__(self, df, rows, columns, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Replace/Delete Text")
+        self.setMinimumWidth(500)
+        
+        self.df = df
+        self.rows = rows
+        self.loaded_rules = []
+        
+        layout = QVBoxLayout()
+        
+        # Single rule
+        layout.addWidget(QLabel("Find (literal text or regular expression):"))
+        self.find_input = QLineEdit()
+        layout.addWidget(self.find_input)
+        layout.addWidget(QLabel("Replace with (leave empty to delete, use \\1 for groups):"))
+        self.replace_input = QLineEdit()
+        layout.addWidget(self.replace_input)
+        
+        # Options
+        options_layout = QHBoxLayout()
+        self.regex_check = QCheckBox("Regular expression")
+        self.case_check = QCheckBox("Case sensitive")
+        options_layout.addWidget(self.regex_check)
+        options_layout.addWidget(self.case_check)
+        layout.addLayout(options_layout)
+        
+        # Target columns
+        columns_group = QGroupBox("Columns")
+        columns_layout = QHBoxLayout()
+        self.column_checks = {}
+        for column in columns:
+            check = QCheckBox(column)
+            check.setChecked(column == 'Name')
+            columns_layout.addWidget(check)
+            self.column_checks[column] = check
+        columns_group.setLayout(columns_layout)
+        layout.addWidget(columns_group)
+        
+        # Rule list and dry run
+        tools_layout = QHBoxLayout()
+        load_btn = QPushButton("Load Rules...")
+        load_btn.clicked.connect(self.load_rules)
+        count_btn = QPushButton("Count Matches")
+        count_btn.clicked.connect(self.count_matches)
+        tools_layout.addWidget(load_btn)
+        tools_layout.addWidget(count_btn)
+        layout.addLayout(tools_layout)
+        
+        self.status_label = QLabel("")
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+        
+        # Add buttons
+        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+        
+        self.setLayout(layout)
+    
+    def load_rules(self):
+        """Loads a batch of search => replace rules from a file"""
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "Open Rules", "", "Rule Files (*.txt *.csv)"
+        )
+        if not file_name:
+            return
+        try:
+            self.loaded_rules = load_rules(file_name)
+            self.status_label.setText(f"Loaded {len(self.loaded_rules)} rules.")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error loading rules: {str(e)}")
+    
+    def get_rules(self):
+        """Returns the loaded rules followed by the rule typed in the dialog"""
+        rules = list(self.loaded_rules)
+        if self.find_input.text():
+            rules.append(ReplaceRule(self.find_input.text(), self.replace_input.text(),
+                                     self.regex_check.isChecked()))
+        return rules
+    
+    def get_columns(self):
+        return [column for column, check in self.column_checks.items() if check.isChecked()]
+    
+    def get_engine(self):
+        return FindReplaceEngine(self.get_rules(), self.case_check.isChecked())
+    
+    def count_matches(self):
+        """Counts matches without changing any data"""
+        try:
+            counts = self.get_engine().count_matches(self.df, self.get_columns(), self.rows)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Invalid rule: {str(e)}")
+            return
+        self.status_label.setText(", ".join(
+            f"{column}: {cells} records ({total} matches)" for column, (cells, total) in counts.items()
+        ) or "No columns selected.")
+
+class ArchiveWindow(QMainWindow):
+    """Browses and edits a SQLite contact archive without loading it into memory"""
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.setWindowTitle(f"VCF Archive - {os.path.basename(store.path)}")
+        self.setMinimumSize(800, 600)
+        
+        self.central_widget = QWidget()
+        self.setCentralWidget(self.central_widget)
+        self.layout = QVBoxLayout(self.central_widget)
+        
+        # Rows are fetched from the archive page by page
+        self.table_model = SQLiteTableModel(store)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.table_model)
+        self.table_view.setAlternatingRowColors(True)
+        self.table_view.setSelectionBehavior(QTableView.SelectRows)
+        self.table_view.setSelectionMode(QTableView.ExtendedSelection)
+        self.table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table_view.setSortingEnabled(True)
+        self.layout.addWidget(self.table_view)
+        
+        self.status_label = QLabel()
+        self.layout.addWidget(self.status_label)
+        self.table_model.modelReset.connect(self.update_status)
+        
+        # Filters run as SQL queries, so wait until typing pauses
+        self.pending_filters = {}
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(300)
+        self.filter_timer.timeout.connect(self.apply_filters)
+        self.create_filter_section()
+        
+        self.vcf_handler = VCFHandler()
+        self.create_menu()
+        self.setStyleSheet(qdarkstyle.load_stylesheet_pyqt5())
+        self.update_status()
+    
+    def create_filter_section(self):
+        """Creates filtering fields"""
+        filter_group = QGroupBox("Filtering")
+        filter_layout = QHBoxLayout()
+        for column in self.table_model._columns:
+            filter_widget = QWidget()
+            filter_widget_layout = QVBoxLayout()
+            input_field = QLineEdit()
+            input_field.setPlaceholderText(f"Search {column}... (use !word1,word2 for except)")
+            input_field.textChanged.connect(lambda text, col=column: self.filter_changed(col, text))
+            filter_widget_layout.addWidget(QLabel(column))
+            filter_widget_layout.addWidget(input_field)
+            filter_widget.setLayout(filter_widget_layout)
+            filter_layout.addWidget(filter_widget)
+        filter_group.setLayout(filter_layout)
+        self.layout.addWidget(filter_group)
+    
+    def filter_changed(self, column, text):
+        """Called when filter text changes"""
+        self.pending_filters[self.table_model._columns.index(column)] = text
+        self.filter_timer.start()
+    
+    def apply_filters(self):
+        """Runs the filter query for the changed fields"""
+        for column, text in self.pending_filters.items():
+            self.store.set_filter(column, text)
+        self.pending_filters = {}
+        self.table_model.refresh()
+    
+    def update_status(self):
+        self.status_label.setText(
+            f"{self.table_model.total_rows()} of {self.store.total()} contacts"
+        )
+    
+    def create_menu(self):
+        """Creates main menu"""
+        menubar = self.menuBar()
+        
+        file_menu = menubar.addMenu("File")
+        file_menu.addAction("Export View as VCF", lambda: self.export_vcf(False))
+        file_menu.addAction("Export View as VCF (iOS)", lambda: self.export_vcf(True))
+        file_menu.addAction("Export View as CSV", self.export_csv)
+        file_menu.addSeparator()
+        file_menu.addAction("Close", self.close)
+        
+        edit_menu = menubar.addMenu("Edit")
+        edit_menu.addAction("Remove Duplicates", self.remove_duplicates)
+        edit_menu.addAction("Normalize Phone Numbers", lambda: self.run_step('normalize_phones'))
+        edit_menu.addAction("Normalize E-mail Addresses", lambda: self.run_step('normalize_emails'))
+        edit_menu.addAction("Title Case Names", lambda: self.run_step('title_case'))
+        edit_menu.addAction("Make Last Word Upper", lambda: self.run_step('last_word_upper'))
+        edit_menu.addAction("Replace/Delete Text", self.replace_text)
+        edit_menu.addSeparator()
+        edit_menu.addAction("Delete Selected", self.delete_selected)
+        edit_menu.addAction("Run Recipe...", self.run_recipe)
+    
+    def target_ids(self):
+        """Returns the selected contacts, or None for every contact in the view"""
+        rows = selected_rows(self.table_view).tolist()
+        if rows:
+            return self.table_model.ids(rows)
+        
+        answer = QMessageBox.question(
+            self,
+            "Apply to All",
+            f"No records selected. Apply to all {self.table_model.total_rows()} records in the view?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        return None if answer == QMessageBox.Yes else []
+    
+    def apply_pipeline(self, pipeline):
+        """Applies a recipe to the target contacts inside the archive"""
+        ids = self.target_ids()
+        if ids is not None and not ids:
+            return
+        
+        total = self.table_model.total_rows() if ids is None else len(ids)
+        progress_dialog, progress = batch_progress(self, "Updating archive...", total)
+        try:
+            changed = self.store.apply(pipeline, ids, progress=progress)
+        except InterruptedError:
+            changed = None
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error updating archive: {str(e)}")
+            return
+        finally:
+            progress_dialog.close()
+            self.table_model.refresh()
+        
+        if changed is not None:
+            QMessageBox.information(self, "Success", f"Made {changed} changes in {total} records.")
+    
+    def run_step(self, op, **params):
+        """Applies a single operation to the target contacts"""
+        pipeline = Pipeline()
+        pipeline.add(op, **params)
+        self.apply_pipeline(pipeline)
+    
+    def replace_text(self):
+        """Replaces or deletes text in names"""
+        search, ok = QInputDialog.getText(self, "Replace/Delete Text", "Text to find:")
+        if not ok or not search:
+            return
+        replace, ok = QInputDialog.getText(self, "Replace/Delete Text", "Replace with (leave empty to delete):")
+        if ok:
+            self.run_step('replace_text', search=search, replace=replace)
+    
+    def remove_duplicates(self):
+        """Removes exact duplicates"""
+        modes = {label: mode for mode, label in DUPLICATE_MODES.items() if mode != 'fuzzy_name'}
+        label, ok = QInputDialog.getItem(self, "Duplicate Check", "Select duplicate check method:",
+                                         list(modes), 0, False)
+        if ok:
+            self.run_step('remove_duplicates', mode=modes[label])
+    
+    def delete_selected(self):
+        """Deletes selected contacts from the archive"""
+        rows = selected_rows(self.table_view).tolist()
+        if not rows:
+            QMessageBox.warning(self, "Warning", "Please select records to delete.")
+            return
+        
+        answer = QMessageBox.question(
+            self,
+            "Confirm Delete",
+            f"Delete {len(rows)} selected records from the archive?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        if answer == QMessageBox.Yes:
+            self.store.delete(self.table_model.ids(rows))
+            self.table_model.refresh()
+    
+    def run_recipe(self):
+        """Applies a saved recipe to the selected records (or all records in the view)"""
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "Open Recipe", "", "Recipe Files (*.json)"
+        )
+        if not file_name:
+            return
+        try:
+            recipe = Pipeline.load(file_name)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error loading recipe: {str(e)}")
+            return
+        self.apply_pipeline(recipe)
+    
+    def export_vcf(self, ios_compatible):
+        """Saves the contacts in the current view as a VCF file"""
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Export View as VCF", "", "VCF Files (*.vcf)"
+        )
+        if not file_name:
+            return
+        try:
+            written = self.store.export_vcf(file_name, ios_compatible, self.vcf_handler)
+            QMessageBox.information(self, "Success", f"Saved {written} contacts.")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error saving file: {str(e)}")
+    
+    def export_csv(self):
+        """Saves the contacts in the current view as a CSV file"""
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Export View as CSV", "", "CSV Files (*.csv)"
+        )
+        if not file_name:
+            return
+        try:
+            written = self.store.export_csv(file_name)
+            QMessageBox.information(self, "Success", f"Exported {written} contacts.")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error exporting file: {str(e)}")
+    
+    def closeEvent(self, event):
+        self.store.close()
+        super().closeEvent(event)
+
+def batch_progress(parent, title, total):
+    """Creates a progress callback for batch jobs backed by a progress dialog"""
+    progress_dialog = QProgressDialog(title, "Cancel", 0, total, parent)
+    progress_dialog.setWindowModality(Qt.WindowModal)
+    progress_dialog.setMinimumDuration(0)
+    
+    def progress(done, total):
+        # Some jobs only know their total once they start (e.g. the number of parts)
+        if progress_dialog.maximum() != total:
+            progress_dialog.setMaximum(total)
+        progress_dialog.setValue(done)
+        QApplication.processEvents()
+        return not progress_dialog.wasCanceled()
+    
+    return progress_dialog, progress
+
+class StatsPanel(QDockWidget):
+    """Data quality counts and most frequent values, updated from the table model's change signals"""
+    querySelected = pyqtSignal(str)
+    
+    def __init__(self, model, parent=None):
+        super().__init__("Statistics", parent)
+        self.setObjectName("StatsPanel")
+        self.model = model
+        self.stats = ContactStats()
+        # Counts are only kept while the panel is shown; a hidden panel recounts once when reopened
+        self.stale = True
+        
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["Statistic", "Count"])
+        self.tree.setToolTip("Double-click a row to list its contacts")
+        self.tree.itemDoubleClicked.connect(self.item_double_clicked)
+        self.setWidget(self.tree)
+        
+        # Edits often come in bursts (loading, pasting); redraw once they pause
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(200)
+        self.refresh_timer.timeout.connect(self.refresh)
+        
+        model.dataReplaced.connect(self.data_replaced)
+        model.rowsInserted.connect(self.rows_inserted)
+        model.dataChanged.connect(self.cells_changed)
+        self.visibilityChanged.connect(self.visibility_changed)
+    
+    def tracking(self):
+        """Whether changes should be counted now; otherwise the counts go stale"""
+        if not self.isVisible():
+            self.stale = True
+        return not self.stale
+    
+    def visibility_changed(self, visible):
+        if visible and self.stale:
+            self.stats.reset(self.model.get_data())
+            self.stale = False
+            self.refresh()
+    
+    def data_replaced(self, df):
+        if self.tracking():
+            self.stats.replace(df)
+            self.refresh_timer.start()
+    
+    def rows_inserted(self, parent, first, last):
+        if self.tracking():
+            self.stats.add_rows(self.model.get_data(), first)
+            self.refresh_timer.start()
+    
+    def cells_changed(self, top_left, bottom_right, roles=None):
+        if self.tracking():
+            self.stats.update_rows(self.model.get_data(), top_left.row(), bottom_right.row())
+            self.refresh_timer.start()
+    
+    def refresh(self):
+        """Redraws the counts and the most frequent values of each column"""
+        expanded = {self.tree.topLevelItem(i).text(0) for i in range(self.tree.topLevelItemCount())
+                    if self.tree.topLevelItem(i).isExpanded()}
+        self.tree.clear()
+        for name, count in self.stats.counts().items():
+            item = QTreeWidgetItem([COUNT_LABELS[name], f"{count:,}"])
+            item.setData(0, Qt.UserRole, COUNT_QUERIES.get(name))
+            self.tree.addTopLevelItem(item)
+        for column, label in TOP_LABELS.items():
+            group = QTreeWidgetItem([label, ""])
+            for value, count in self.stats.top_values(column):
+                child = QTreeWidgetItem([value, f"{count:,}"])
+                child.setData(0, Qt.UserRole, value_query(column, value))
+                group.addChild(child)
+            self.tree.addTopLevelItem(group)
+            group.setExpanded(group.text(0) in expanded)
+        self.tree.resizeColumnToContents(0)
+    
+    def item_double_clicked(self, item, column):
+        query = item.data(0, Qt.UserRole)
+        if query:
+            self.querySelected.emit(query)
 
 class MainWindow(QMainWindow):
+    # Emitted from the autosave writer thread when writing fails
+    autosaveFailed = pyqtSignal(str)
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("VCF Editor")
@@ -133,6 +602,8 @@ class MainWindow(QMainWindow):
         self.table_view.setAlternatingRowColors(True)  # Alternating row colors
         self.table_view.setSelectionBehavior(QTableView.SelectRows)  # Row selection
         self.table_view.setSelectionMode(QTableView.ExtendedSelection)  # Multiple selection
+        self.table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table_view.setSortingEnabled(True)  # Sort by clicking column headers
         self.layout.addWidget(self.table_view)
         
         # Filter fields
@@ -152,6 +623,82 @@ class MainWindow(QMainWindow):
         
         # Fuzzy match threshold
         self.fuzzy_threshold = 80  # Default threshold for fuzzy matching
+        self.similarity_cache = SimilarityCache()  # Scores reused while the data is unchanged
+        
+        # Macro recorder (None when not recording)
+        self.recorder = None
+        
+        # Background file reader (None when no file is loading)
+        self.loader = None
+        self.editing_widgets = [
+            self.btn_open_folder, self.btn_save, self.btn_save_ios, self.btn_export,
+            self.btn_remove_duplicates, self.btn_normalize_phones, self.btn_title_case,
+            self.btn_append_code, self.btn_last_word_upper, self.btn_replace_text,
+            self.btn_delete_selected, self.btn_find_matches,
+            self.action_save, self.action_save_ios, self.action_export,
+            self.action_open_folder, self.action_export_sources, self.action_export_parts,
+            self.action_check_history, self.edit_menu, self.macro_menu,
+        ]
+        
+        # Index of previously saved contacts (opened on first use)
+        self.history = None
+        
+        # Background autosave journal (errors are reported from the writer thread)
+        self.autosaveFailed.connect(self.on_autosave_failed)
+        self.autosave = AutosaveManager(on_error=lambda e: self.autosaveFailed.emit(str(e)))
+        self.offer_recovery()
+        self.table_model.dataReplaced.connect(self.autosave.data_replaced)
+        self.table_model.dataChanged.connect(self.on_cells_edited)
+        
+        # Data quality panel (hidden until opened from the View menu)
+        self.stats_panel = StatsPanel(self.table_model, self)
+        self.stats_panel.querySelected.connect(self.query_input.setText)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.stats_panel)
+        self.stats_panel.hide()
+        self.view_menu.addAction(self.stats_panel.toggleViewAction())
+    
+    def offer_recovery(self):
+        """Offers to restore unsaved edits left by crashed sessions (never those of running windows)"""
+        for directory in AutosaveManager.orphaned_sessions(self.autosave.root):
+            if directory == self.autosave.directory:
+                continue
+            answer = QMessageBox.question(
+                self,
+                "Recover Unsaved Edits",
+                "A previous session ended unexpectedly. Do you want to recover unsaved edits?",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.Yes
+            )
+            if answer == QMessageBox.Yes:
+                try:
+                    df = AutosaveManager.recover(directory)
+                    self.autosave.start(df)
+                    self.autosave.flush()
+                    self.table_model.set_data(df)
+                    AutosaveManager.discard(directory)
+                    return
+                except Exception as e:
+                    QMessageBox.critical(self, "Error", f"Error recovering edits: {str(e)}")
+            AutosaveManager.discard(directory)
+    
+    def on_autosave_failed(self, message):
+        """Shows autosave write errors in the status bar"""
+        self.statusBar().showMessage(f"Autosave failed: {message}", 10000)
+    
+    def on_cells_edited(self, top_left, bottom_right, roles=None):
+        """Journals cells edited directly in the table"""
+        df = self.table_model.get_data()
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            for column in range(top_left.column(), bottom_right.column() + 1):
+                self.autosave.cell_changed(df, row, self.table_model._columns[column])
+    
+    def closeEvent(self, event):
+        """Stops autosave and removes recovery files on a clean exit"""
+        self.stop_loading()
+        self.autosave.close(discard=True)
+        if self.history is not None:
+            self.history.close()
+        super().closeEvent(event)
     
     def apply_theme(self, theme):
         """Applies theme"""
@@ -180,6 +727,22 @@ class MainWindow(QMainWindow):
             self.filter_inputs[column] = input_field
             filter_layout.addWidget(filter_widget)
         
+        # Query field: compiled once per edit (after typing pauses), applied to all rows at once
+        query_widget = QWidget()
+        query_layout = QVBoxLayout()
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText("name:ali AND (count(phone)>1 OR empty:email)")
+        self.query_input.setToolTip(QUERY_HELP)
+        self.query_input.textChanged.connect(lambda: self.query_timer.start())
+        self.query_timer = QTimer(self)
+        self.query_timer.setSingleShot(True)
+        self.query_timer.setInterval(300)
+        self.query_timer.timeout.connect(self.apply_query)
+        query_layout.addWidget(QLabel("Query"))
+        query_layout.addWidget(self.query_input)
+        query_widget.setLayout(query_layout)
+        filter_layout.addWidget(query_widget, 2)
+        
         filter_group.setLayout(filter_layout)
         self.layout.addWidget(filter_group)
     
@@ -187,6 +750,17 @@ class MainWindow(QMainWindow):
         """Called when filter text changes"""
         self.proxy_model.set_filter(self.table_model._columns.index(column), text)
     
+    def apply_query(self):
+        """Compiles the query field and filters the table; invalid queries are marked in red"""
+        try:
+            self.proxy_model.set_query(self.query_input.text())
+        except QueryError as e:
+            self.query_input.setStyleSheet("border: 1px solid #e74c3c;")
+            self.query_input.setToolTip(f"{e}\n\n{QUERY_HELP}")
+            return
+        self.query_input.setStyleSheet("")
+        self.query_input.setToolTip(QUERY_HELP)
+    
     def create_buttons(self):
         """Creates basic operation buttons"""
         button_layout = QHBoxLayout()  # Main layout will be horizontal
@@ -197,11 +771,12 @@ class MainWindow(QMainWindow):
         
         # File operation buttons
         self.btn_open = QPushButton("Open VCF")
+        self.btn_open_folder = QPushButton("Open Folder")
         self.btn_save = QPushButton("Save VCF")
         self.btn_save_ios = QPushButton("Save VCF (iOS)")
         self.btn_export = QPushButton("Export as CSV")
         
-        for btn in [self.btn_open, self.btn_save, self.btn_save_ios, self.btn_export]:
+        for btn in [self.btn_open, self.btn_open_folder, self.btn_save, self.btn_save_ios, self.btn_export]:
             left_column.addWidget(btn)
         
         # Right column
@@ -235,6 +810,7 @@ class MainWindow(QMainWindow):
         self.btn_save.clicked.connect(self.save_vcf)
         self.btn_save_ios.clicked.connect(self.save_vcf_ios)
         self.btn_export.clicked.connect(self.export_csv)
+        self.btn_open_folder.clicked.connect(self.open_folder)
         self.btn_remove_duplicates.clicked.connect(self.remove_duplicates)
         self.btn_normalize_phones.clicked.connect(self.normalize_phones)
         self.btn_title_case.clicked.connect(self.title_case_names)
@@ -254,6 +830,16 @@ class MainWindow(QMainWindow):
         self.action_save = QAction("Save VCF", self)
         self.action_save_ios = QAction("Save VCF (iOS)", self)
         self.action_export = QAction("Export as CSV", self)
+        self.action_open_folder = QAction("Open Folder...", self)
+        self.action_export_sources = QAction("Export per Source File...", self)
+        self.action_export_parts = QAction("Save VCF in Parts...", self)
+        self.action_compare = QAction("Compare VCF Files...", self)
+        self.action_open_archive = QAction("Open Archive...", self)
+        self.action_check_history = QAction("Check Against History...", self)
+        self.action_add_history = QAction("Add VCF Files to History...", self)
+        self.action_record_history = QAction("Record Saved Contacts", self)
+        self.action_record_history.setCheckable(True)
+        self.action_record_history.setChecked(True)
         self.action_exit = QAction("Exit", self)
         
         self.file_menu.addAction(self.action_open)
@@ -261,12 +847,23 @@ class MainWindow(QMainWindow):
         self.file_menu.addAction(self.action_save_ios)
         self.file_menu.addAction(self.action_export)
         self.file_menu.addSeparator()
+        self.file_menu.addAction(self.action_open_folder)
+        self.file_menu.addAction(self.action_export_sources)
+        self.file_menu.addAction(self.action_export_parts)
+        self.file_menu.addAction(self.action_compare)
+        self.file_menu.addAction(self.action_open_archive)
+        self.history_menu = self.file_menu.addMenu("History")
+        self.history_menu.addAction(self.action_check_history)
+        self.history_menu.addAction(self.action_add_history)
+        self.history_menu.addAction(self.action_record_history)
+        self.file_menu.addSeparator()
         self.file_menu.addAction(self.action_exit)
         
         # Edit menu
         self.edit_menu = menubar.addMenu("Edit")
         self.edit_menu.addAction("Remove Duplicates", self.remove_duplicates)
         self.edit_menu.addAction("Normalize Phone Numbers", self.normalize_phones)
+        self.edit_menu.addAction("Normalize E-mail Addresses", self.normalize_emails)
         self.edit_menu.addAction("Title Case Names", self.title_case_names)
         self.edit_menu.addAction("Append Code to Names", self.append_code_to_names)
         self.edit_menu.addAction("Make Last Word Upper", self.last_word_upper)
@@ -275,6 +872,14 @@ class MainWindow(QMainWindow):
         self.edit_menu.addAction("Delete Selected", self.delete_selected)
         self.edit_menu.addAction("Find Matches from List", self.find_matches_from_list)
         
+        # Macro menu
+        self.macro_menu = menubar.addMenu("Macro")
+        self.action_record = QAction("Start Recording", self)
+        self.action_record.setCheckable(True)
+        self.action_record.toggled.connect(self.toggle_recording)
+        self.macro_menu.addAction(self.action_record)
+        self.macro_menu.addAction("Run Recipe...", self.run_recipe)
+        
         # View menu
         self.view_menu = menubar.addMenu("View")
         
@@ -283,20 +888,67 @@ class MainWindow(QMainWindow):
         self.action_save.triggered.connect(self.save_vcf)
         self.action_save_ios.triggered.connect(self.save_vcf_ios)
         self.action_export.triggered.connect(self.export_csv)
+        self.action_open_folder.triggered.connect(self.open_folder)
+        self.action_export_sources.triggered.connect(self.export_per_source)
+        self.action_export_parts.triggered.connect(self.export_in_parts)
+        self.action_compare.triggered.connect(self.compare_files)
+        self.action_open_archive.triggered.connect(self.open_archive)
+        self.action_check_history.triggered.connect(self.check_history)
+        self.action_add_history.triggered.connect(self.add_files_to_history)
         self.action_exit.triggered.connect(self.close)
     
     def open_vcf(self):
         """Opens VCF file"""
         file_name, _ = QFileDialog.getOpenFileName(
-            self, "Open VCF File", "", "VCF Files (*.vcf)"
+            self, "Open VCF File", "", f"VCF Files ({VCF_PATTERNS})"
         )
         if file_name:
             try:
-                df = self.vcf_handler.parse_vcf(file_name)
-                self.table_model.set_data(df)
+                self.load_vcf(file_name)
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Error opening file: {str(e)}")
     
+    def load_vcf(self, file_name):
+        """Reads a VCF file in the background, showing contacts as they are parsed"""
+        self.stop_loading()
+        empty = pd.DataFrame(columns=CONTACT_COLUMNS)
+        self.autosave.start(empty)
+        self.table_model.set_data(empty)
+        
+        self.loader = VCFLoader(file_name, parent=self)
+        self.loader.batchLoaded.connect(self.table_model.append_rows)
+        self.loader.loadFailed.connect(self.loading_failed)
+        self.loader.finished.connect(self.loading_finished)
+        self.set_editing_enabled(False)
+        self.statusBar().showMessage(f"Loading {os.path.basename(file_name)}...")
+        self.loader.start()
+    
+    def loading_finished(self):
+        """Enables editing once the whole file has been read"""
+        self.loader = None
+        self.set_editing_enabled(True)
+        df = self.table_model.get_data()
+        self.autosave.start(df)
+        self.statusBar().showMessage(f"Loaded {len(df)} contacts.", 5000)
+    
+    def loading_failed(self, message):
+        """Discards a partially read file"""
+        self.table_model.set_data(pd.DataFrame(columns=CONTACT_COLUMNS))
+        QMessageBox.critical(self, "Error", f"Error opening file: {message}")
+    
+    def stop_loading(self):
+        """Cancels a file that is still being read"""
+        if self.loader is not None:
+            self.loader.stop()
+            self.loader = None
+            self.set_editing_enabled(True)
+            self.statusBar().clearMessage()
+    
+    def set_editing_enabled(self, enabled):
+        """Blocks operations that replace the table while a file is loading"""
+        for widget in self.editing_widgets:
+            widget.setEnabled(enabled)
+    
     def save_vcf(self):
         """Saves as VCF file"""
         file_name, _ = QFileDialog.getSaveFileName(
@@ -316,9 +968,12 @@ class MainWindow(QMainWindow):
                 ) == QMessageBox.Yes
                 
                 self.vcf_handler.export_vcf(df, file_name, ios_compatible)
+                self.autosave.start(df)
                 QMessageBox.information(self, "Success", "File saved successfully.")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Error saving file: {str(e)}")
+                return
+            self.record_history(df, file_name)
     
     def save_vcf_ios(self):
         """Saves as iOS-compatible VCF file"""
@@ -329,9 +984,304 @@ class MainWindow(QMainWindow):
             try:
                 df = self.table_model.get_data()
                 self.vcf_handler.export_vcf(df, file_name, ios_compatible=True)
+                self.autosave.start(df)
                 QMessageBox.information(self, "Success", "File saved successfully in iOS-compatible format.")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Error saving file: {str(e)}")
+                return
+            self.record_history(df, file_name)
+    
+    def history_index(self):
+        """Opens the index of previously saved contacts on first use"""
+        if self.history is None:
+            self.history = MasterIndex()
+        return self.history
+    
+    def record_history(self, df, file_name):
+        """Adds saved contacts to the history index; a failure here does not affect the saved file"""
+        if not self.action_record_history.isChecked():
+            return
+        try:
+            added = self.history_index().add(df, os.path.abspath(file_name))
+        except Exception as e:
+            QMessageBox.warning(self, "Warning", f"The history could not be updated: {str(e)}")
+            return
+        self.statusBar().showMessage(f"Added {added} new contacts to the history.", 5000)
+    
+    def check_history(self):
+        """Finds contacts that were already saved before and offers to select them"""
+        df = self.table_model.get_data()
+        if df.empty:
+            QMessageBox.warning(self, "Warning", "No contacts to check.")
+            return
+        
+        try:
+            report = self.history_index().check(df)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error checking history: {str(e)}")
+            return
+        
+        matched = (report['Match'] != '').to_numpy()
+        if not matched.any():
+            QMessageBox.information(self, "Info", "None of the contacts are in the history.")
+            return
+        
+        dialog = ChangePreviewDialog(
+            "Check Against History",
+            f"{int(matched.sum())} of {len(df)} contacts are already in the history. Select them?",
+            ['Name'] + CHECK_COLUMNS,
+            [df['Name'].to_numpy()[matched]] + [report[column].to_numpy()[matched] for column in CHECK_COLUMNS],
+            confirm=True, parent=self
+        )
+        if dialog.exec_() == QDialog.Accepted:
+            self.select_rows(np.flatnonzero(matched))
+    
+    def add_files_to_history(self):
+        """Adds existing VCF files to the history index without opening them"""
+        paths, _ = QFileDialog.getOpenFileNames(
+            self, "Add VCF Files to History", "", f"VCF Files ({VCF_PATTERNS})"
+        )
+        if not paths:
+            return
+        
+        progress_dialog, progress = self.batch_progress(f"Adding {len(paths)} files...", len(paths))
+        added = 0
+        try:
+            for done, path in enumerate(paths):
+                added += self.history_index().add_file(path, self.vcf_handler)
+                if not progress(done + 1, len(paths)):
+                    break
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error adding {path}: {str(e)}")
+            return
+        finally:
+            progress_dialog.close()
+        QMessageBox.information(
+            self, "Success", f"Added {added} new contacts; the history contains {self.history.count()} contacts.")
+    
+    def batch_progress(self, title, total):
+        """Creates a progress callback for batch jobs backed by a progress dialog"""
+        return batch_progress(self, title, total)
+    
+    def open_archive(self):
+        """Opens a SQLite contact archive, creating it from a VCF file if needed"""
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "Open Archive", "", "Archives (*.sqlite);;VCF Files (*.vcf)"
+        )
+        if not file_name:
+            return
+        
+        if file_name.lower().endswith('.sqlite'):
+            try:
+                store = SQLiteStore(file_name)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Error opening archive: {str(e)}")
+                return
+        else:
+            archive_name, _ = QFileDialog.getSaveFileName(
+                self, "Create Archive", file_name + '.sqlite', "Archives (*.sqlite)"
+            )
+            if not archive_name:
+                return
+            store = self.import_archive(file_name, archive_name)
+            if store is None:
+                return
+        
+        window = ArchiveWindow(store, self)
+        window.show()
+    
+    def import_archive(self, vcf_path, archive_path):
+        """Imports a VCF file into an archive with a progress dialog"""
+        existed = os.path.exists(archive_path)
+        # Progress is reported in KB to stay within the dialog's int range
+        progress_dialog, progress = self.batch_progress(
+            "Importing contacts...", os.path.getsize(vcf_path) // 1024 + 1
+        )
+        store = None
+        try:
+            store = SQLiteStore(archive_path)
+            store.import_vcf(vcf_path, self.vcf_handler,
+                             progress=lambda done, total: progress(done // 1024, total // 1024 + 1))
+            return store
+        except Exception as e:
+            if store is not None:
+                store.close()
+            if not existed:
+                for suffix in ('', '-wal', '-shm'):
+                    if os.path.exists(archive_path + suffix):
+                        os.remove(archive_path + suffix)
+            if not isinstance(e, InterruptedError):
+                QMessageBox.critical(self, "Error", f"Error importing file: {str(e)}")
+            return None
+        finally:
+            progress_dialog.close()
+    
+    def open_folder(self):
+        """Opens all VCF files in a folder into one table with a source file column"""
+        folder = QFileDialog.getExistingDirectory(self, "Open VCF Folder")
+        if not folder:
+            return
+        
+        paths = collect_files(folder)
+        if not paths:
+            QMessageBox.warning(self, "Warning", "No VCF files found in folder.")
+            return
+        
+        progress_dialog, progress = self.batch_progress(f"Parsing {len(paths)} files...", len(paths))
+        try:
+            df, failed = parse_files(paths, progress=progress)
+        except InterruptedError:
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error opening folder: {str(e)}")
+            return
+        finally:
+            progress_dialog.close()
+        
+        self.autosave.start(df)
+        self.table_model.set_data(df)
+        
+        message = f"Loaded {len(df)} contacts from {len(paths) - len(failed)} files."
+        if failed:
+            message += "\n\nFailed files:\n" + "\n".join(f"{path}: {error}" for path, error in failed)
+            QMessageBox.warning(self, "Warning", message)
+        else:
+            QMessageBox.information(self, "Success", message)
+    
+    def export_per_source(self):
+        """Saves each source file's contacts to its own VCF file"""
+        df = self.table_model.get_data()
+        if SOURCE_COLUMN not in df.columns:
+            QMessageBox.warning(self, "Warning", "Open a folder first to export per source file.")
+            return
+        
+        output_dir = QFileDialog.getExistingDirectory(self, "Select Output Folder")
+        if not output_dir:
+            return
+        
+        ios_compatible = QMessageBox.question(
+            self,
+            "iOS Compatibility",
+            "Do you want to save in iOS-compatible format?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        ) == QMessageBox.Yes
+        
+        sources = df[SOURCE_COLUMN].nunique()
+        progress_dialog, progress = self.batch_progress(f"Saving {sources} files...", sources)
+        try:
+            written, failed = export_per_source(df, output_dir, ios_compatible, progress=progress)
+        except InterruptedError:
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error saving files: {str(e)}")
+            return
+        finally:
+            progress_dialog.close()
+        
+        message = f"Saved {len(written)} files."
+        if failed:
+            message += "\n\nFailed files:\n" + "\n".join(f"{path}: {error}" for path, error in failed)
+            QMessageBox.warning(self, "Warning", message)
+        else:
+            QMessageBox.information(self, "Success", message)
+    
+    def export_in_parts(self):
+        """Saves the contacts as numbered VCF files limited by contact count or size"""
+        df = self.table_model.get_data()
+        if df.empty:
+            QMessageBox.warning(self, "Warning", "No contacts to save.")
+            return
+        
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Save VCF in Parts", "", "VCF Files (*.vcf)"
+        )
+        if not file_name:
+            return
+        
+        limits = ["Contacts per file", "File size (MB)"]
+        limit, ok = QInputDialog.getItem(self, "Split Files", "Limit each file by:", limits, 0, False)
+        if not ok:
+            return
+        max_cards = max_bytes = None
+        if limit == limits[0]:
+            max_cards, ok = QInputDialog.getInt(self, "Split Files", "Contacts per file:", 1000, 1, 10 ** 9)
+        else:
+            megabytes, ok = QInputDialog.getInt(self, "Split Files", "Maximum file size (MB):", 10, 1, 10 ** 6)
+            max_bytes = megabytes * 1024 ** 2
+        if not ok:
+            return
+        
+        ios_compatible = QMessageBox.question(
+            self,
+            "iOS Compatibility",
+            "Do you want to save in iOS-compatible format?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        ) == QMessageBox.Yes
+        
+        progress_dialog, progress = self.batch_progress("Saving files...", 0)
+        try:
+            written, failed = export_sharded(df, file_name, ios_compatible, max_cards, max_bytes,
+                                             progress=progress)
+        except InterruptedError:
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error saving files: {str(e)}")
+            return
+        finally:
+            progress_dialog.close()
+        
+        if failed:
+            message = (f"Saved {len(written)} files; no index was written.\n\nFailed files:\n"
+                       + "\n".join(f"{path}: {error}" for path, error in failed))
+            QMessageBox.warning(self, "Warning", message)
+        else:
+            QMessageBox.information(
+                self, "Success", f"Saved {len(written)} files and the index {manifest_path(file_name)}.")
+            self.record_history(df, file_name)
+    
+    def compare_files(self):
+        """Compares two VCF files and shows added, removed and modified contacts"""
+        old_path, _ = QFileDialog.getOpenFileName(
+            self, "Select Old VCF File", "", f"VCF Files ({VCF_PATTERNS})"
+        )
+        if not old_path:
+            return
+        new_path, _ = QFileDialog.getOpenFileName(
+            self, "Select New VCF File", "", f"VCF Files ({VCF_PATTERNS})"
+        )
+        if not new_path:
+            return
+        
+        try:
+            report = compare_vcf(old_path, new_path, handler=self.vcf_handler)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error comparing files: {str(e)}")
+            return
+        
+        if report.empty:
+            QMessageBox.information(self, "Info", "The files contain the same contacts.")
+            return
+        
+        counts = report['Status'].value_counts()
+        summary = ", ".join(f"{status}: {counts.get(status, 0)}"
+                            for status in ('Added', 'Removed', 'Modified'))
+        dialog = ChangePreviewDialog(
+            "Compare VCF Files", summary, DIFF_COLUMNS,
+            [report[column].to_numpy() for column in DIFF_COLUMNS],
+            parent=self
+        )
+        dialog.exec_()
+        
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Save Comparison Report", "", "CSV Files (*.csv)"
+        )
+        if file_name:
+            try:
+                report.to_csv(file_name, index=False)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Error saving report: {str(e)}")
     
     def export_csv(self):
         """Exports as CSV"""
@@ -341,19 +1291,93 @@ class MainWindow(QMainWindow):
         if file_name:
             try:
                 df = self.table_model.get_data()
-                df.to_csv(file_name, index=False)
+                self.vcf_handler.export_csv(df, file_name)
                 QMessageBox.information(self, "Success", "File exported successfully.")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Error exporting file: {str(e)}")
     
     def get_selected_rows(self):
-        """Returns indices of selected rows"""
-        selected_rows = []
-        for index in self.table_view.selectionModel().selectedRows():
-            # Convert from proxy model to source model index
-            source_index = self.proxy_model.mapToSource(index)
-            selected_rows.append(source_index.row())
-        return selected_rows
+        """Returns source model indices of selected rows (read from selection ranges)"""
+        return self.proxy_model.source_rows(selected_rows(self.table_view)).tolist()
+    
+    def select_rows(self, rows):
+        """Replaces the selection with the given source model rows in one call"""
+        self.table_view.selectionModel().select(
+            self.proxy_model.selection(rows),
+            QItemSelectionModel.ClearAndSelect | QItemSelectionModel.Rows
+        )
+    
+    def show_changes(self, title, summary, headers, old_values, new_values):
+        """Shows only the values that changed in a preview dialog"""
+        changed = (old_values != new_values).to_numpy()
+        dialog = ChangePreviewDialog(
+            title, summary, headers,
+            [old_values.to_numpy()[changed], new_values.to_numpy()[changed]],
+            parent=self
+        )
+        dialog.exec_()
+    
+    def run_step(self, op, rows, **params):
+        """Applies a single recipe step to the given rows and records it"""
+        step = Pipeline()
+        step.add(op, **params)
+        self.record_step(op, **params)
+        return step.apply(self.table_model.get_data(), rows)
+    
+    def record_step(self, op, **params):
+        """Adds a step to the macro being recorded"""
+        if self.recorder is not None:
+            self.recorder.add(op, **params)
+    
+    def toggle_recording(self, recording):
+        """Starts or stops macro recording"""
+        if recording:
+            self.recorder = Pipeline()
+            self.action_record.setText("Stop Recording")
+            return
+        
+        recorder, self.recorder = self.recorder, None
+        self.action_record.setText("Start Recording")
+        if not recorder:
+            QMessageBox.information(self, "Info", "No operations were recorded.")
+            return
+        
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Save Recipe", "", "Recipe Files (*.json)"
+        )
+        if file_name:
+            try:
+                recorder.save(file_name)
+                QMessageBox.information(self, "Success", f"Saved recipe with {len(recorder)} steps.")
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Error saving recipe: {str(e)}")
+    
+    def run_recipe(self):
+        """Replays a saved recipe on the selected rows (or all rows)"""
+        df = self.table_model.get_data()
+        if df.empty:
+            QMessageBox.warning(self, "Warning", "No data in table.")
+            return
+        
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "Open Recipe", "", "Recipe Files (*.json)"
+        )
+        if not file_name:
+            return
+        
+        try:
+            recipe = Pipeline.load(file_name)
+            selected_rows = self.get_selected_rows() or None
+            for step in recipe.steps:
+                self.record_step(**step)
+            result = recipe.apply(df, selected_rows)
+            self.table_model.set_data(result)
+            QMessageBox.information(
+                self, "Success",
+                f"Applied {len(recipe)} steps to {len(selected_rows) if selected_rows else len(df)} records."
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error running recipe: {str(e)}")
     
     def remove_duplicates(self):
         """Removes duplicate records using both exact and fuzzy matching"""
@@ -372,44 +1396,21 @@ class MainWindow(QMainWindow):
         match_type, ok = QInputDialog.getItem(
             self, "Select Matching Type",
             "How would you like to check for duplicates?",
-            ["Exact Match (Name + Phone)", "Fuzzy Name Match", "Exact Phone Match"],
+            list(DUPLICATE_MODES.values()),
             0, False
         )
         
         if not ok:
             return
         
+        mode = next(key for key, label in DUPLICATE_MODES.items() if label == match_type)
+        if mode == 'fuzzy_name':
+            self.remove_fuzzy_duplicates(df, selected_rows)
+            return
+        
         # Check for duplicates in selected rows
-        selected_df = df.iloc[selected_rows].copy()
-        duplicates = pd.Series(False, index=selected_df.index)
-        
-        if match_type == "Exact Match (Name + Phone)":
-            duplicates = selected_df.duplicated(subset=['Name', 'Phone'], keep='first')
-        elif match_type == "Exact Phone Match":
-            duplicates = selected_df.duplicated(subset=['Phone'], keep='first')
-        else:  # Fuzzy Name Match
-            # Get fuzzy match threshold
-            threshold, ok = QInputDialog.getInt(
-                self, "Fuzzy Match Threshold",
-                "Enter similarity threshold (0-100):",
-                self.fuzzy_threshold, 0, 100, 5
-            )
-            
-            if not ok:
-                return
-            
-            self.fuzzy_threshold = threshold
-            
-            # Find fuzzy matches
-            names = selected_df['Name'].tolist()
-            for i, name1 in enumerate(names):
-                if pd.isna(name1):
-                    continue
-                for j, name2 in enumerate(names[i+1:], i+1):
-                    if pd.isna(name2):
-                        continue
-                    if fuzz.ratio(name1.lower(), name2.lower()) >= threshold:
-                        duplicates.iloc[j] = True
+        selected_df = df.iloc[selected_rows]
+        duplicates = find_duplicates(selected_df, mode=mode)
         
         if not duplicates.any():
             QMessageBox.information(self, "Info", "No duplicates found in selected records.")
@@ -418,47 +1419,71 @@ class MainWindow(QMainWindow):
         # Show duplicates and ask for confirmation
         duplicate_count = duplicates.sum()
         
-        # Create a scrollable text area for details
-        details = QTextEdit()
-        details.setReadOnly(True)
-        details.setMaximumHeight(200)
-        
-        # Add duplicate records to text area
-        details.append(f"Found {duplicate_count} duplicate records in {len(selected_rows)} selected records:\n")
-        for idx, row in selected_df[duplicates].iterrows():
-            details.append(f"Name: {row['Name']}\nPhone: {row['Phone']}\n---")
-        
-        # Create custom dialog
-        dialog = QDialog(self)
-        dialog.setWindowTitle("Duplicate Records")
-        layout = QVBoxLayout()
-        
-        # Add text area
-        layout.addWidget(details)
-        
-        # Add buttons
-        button_box = QDialogButtonBox(QDialogButtonBox.Yes | QDialogButtonBox.No)
-        button_box.accepted.connect(dialog.accept)
-        button_box.rejected.connect(dialog.reject)
-        layout.addWidget(button_box)
-        
-        dialog.setLayout(layout)
+        # Preview duplicate records
+        duplicate_df = selected_df[duplicates]
+        key_column = 'E-mail' if mode == 'email' else 'Phone'
+        dialog = ChangePreviewDialog(
+            "Duplicate Records",
+            f"Found {duplicate_count} duplicate records in {len(selected_rows)} selected records:",
+            ['Name', key_column],
+            [duplicate_df['Name'].to_numpy(), duplicate_df[key_column].to_numpy()],
+            confirm=True, parent=self
+        )
         
         if dialog.exec_() == QDialog.Accepted:
             # Remove duplicates from selected rows
-            selected_df = selected_df[~duplicates]
-            
-            # Create a new DataFrame with non-selected rows
-            non_selected_df = df.drop(index=df.index[selected_rows])
-            
-            # Concatenate non-selected rows with deduplicated selected rows
-            df = pd.concat([non_selected_df, selected_df])
+            df = df.drop(index=duplicate_df.index)
+            self.record_step('remove_duplicates', mode=mode)
             
             # Update the table model
             self.table_model.set_data(df)
             
             QMessageBox.information(self, "Success", f"Deleted {duplicate_count} duplicate records.")
     
+    def remove_fuzzy_duplicates(self, df, selected_rows):
+        """Previews similar names with a live threshold slider and removes the later record of each pair"""
+        selected_df = df.iloc[selected_rows]
+        names = selected_df['Name']
+        # Only scores near the current threshold are kept; the slider cannot go below them
+        pairs = self.similarity_cache.duplicate_pairs(
+            self.table_model.data_version(), names, min_score=score_floor(self.fuzzy_threshold))
+        if not len(pairs):
+            QMessageBox.information(
+                self, "Info", f"No names at least {pairs.min_score}% similar found in selected records.")
+            return
+        
+        # Pairs hold row positions within the selection
+        name_values = names.to_numpy()
+        dialog = ChangePreviewDialog(
+            "Similar Names", "",
+            ['Name', 'Similar To', 'Score'],
+            [name_values[pairs.second], name_values[pairs.first],
+             [f"{score}%" for score in pairs.scores]],
+            confirm=True, parent=self
+        )
+        
+        def show_threshold(threshold):
+            dialog.preview_model.set_row_limit(pairs.count_at(threshold))
+            dialog.summary_label.setText(
+                f"Found {len(pairs.duplicates_at(threshold))} duplicate records "
+                f"({pairs.count_at(threshold)} similar pairs) in {len(selected_rows)} selected records:"
+            )
+        dialog.add_threshold_slider(self.fuzzy_threshold, show_threshold, pairs.min_score)
+        
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        threshold = dialog.threshold_slider.value()
+        self.fuzzy_threshold = threshold
+        duplicates = names.index[pairs.duplicates_at(threshold)]
+        if not len(duplicates):
+            QMessageBox.information(self, "Info", "No duplicates at this threshold.")
+            return
+        
+        df = df.drop(index=duplicates)
+        self.record_step('remove_duplicates', mode='fuzzy_name', threshold=threshold)
+        self.table_model.set_data(df)
+        QMessageBox.information(self, "Success", f"Deleted {len(duplicates)} duplicate records.")
+    
     def normalize_phones(self):
         """Normalizes phone numbers"""
         df = self.table_model.get_data()
@@ -473,50 +1498,61 @@ class MainWindow(QMainWindow):
             return
         
         # Save old phone numbers
-        old_phones = df.loc[selected_rows, 'Phone'].copy()
+        old_phones = df['Phone'].iloc[selected_rows]
         
         # Normalize
-        df.loc[selected_rows, 'Phone'] = df.loc[selected_rows, 'Phone'].apply(normalize_phone)
+        df = self.run_step('normalize_phones', selected_rows)
+        new_phones = df['Phone'].iloc[selected_rows]
         
         # Calculate changed count
-        changed_count = (old_phones != df.loc[selected_rows, 'Phone']).sum()
+        changed_count = (old_phones != new_phones).sum()
         
         # Show results
         if changed_count > 0:
-            # Create a scrollable text area for details
-            details = QTextEdit()
-            details.setReadOnly(True)
-            details.setMaximumHeight(200)
-            
-            # Add changed numbers to text area
-            details.append(f"Normalized {changed_count} phone numbers out of {len(selected_rows)} selected records:\n")
-            changed_phones = pd.DataFrame({
-                'Old Number': old_phones[old_phones != df.loc[selected_rows, 'Phone']],
-                'New Number': df.loc[selected_rows, 'Phone'][old_phones != df.loc[selected_rows, 'Phone']]
-            })
-            for _, row in changed_phones.iterrows():
-                details.append(f"{row['Old Number']} → {row['New Number']}")
-            
-            # Create custom dialog
-            dialog = QDialog(self)
-            dialog.setWindowTitle("Phone Number Changes")
-            layout = QVBoxLayout()
-            
-            # Add text area
-            layout.addWidget(details)
-            
-            # Add OK button
-            button_box = QDialogButtonBox(QDialogButtonBox.Ok)
-            button_box.accepted.connect(dialog.accept)
-            layout.addWidget(button_box)
-            
-            dialog.setLayout(layout)
-            dialog.exec_()
+            self.show_changes(
+                "Phone Number Changes",
+                f"Normalized {changed_count} phone numbers out of {len(selected_rows)} selected records:",
+                ['Old Number', 'New Number'],
+                old_phones, new_phones
+            )
         else:
             QMessageBox.information(self, "Info", "No valid phone numbers found to normalize.")
         
         self.table_model.set_data(df)
     
+    def normalize_emails(self):
+        """Lowercases and trims e-mail addresses and reports invalid ones"""
+        df = self.table_model.get_data()
+        if df.empty:
+            QMessageBox.warning(self, "Warning", "No data in table.")
+            return
+        
+        # Get selected rows
+        selected_rows = self.get_selected_rows()
+        if not selected_rows:
+            QMessageBox.warning(self, "Warning", "Please select records to edit.")
+            return
+        
+        old_emails = df['E-mail'].iloc[selected_rows]
+        df = self.run_step('normalize_emails', selected_rows)
+        new_emails = df['E-mail'].iloc[selected_rows]
+        changed_count = (old_emails != new_emails).sum()
+        invalid_count = invalid_emails(new_emails).sum()
+        invalid_note = f" {invalid_count} records still have an invalid address." if invalid_count else ""
+        
+        if changed_count > 0:
+            self.show_changes(
+                "E-mail Address Changes",
+                f"Normalized {changed_count} e-mail addresses out of {len(selected_rows)} selected records."
+                f"{invalid_note}",
+                ['Old Address', 'New Address'],
+                old_emails, new_emails
+            )
+        else:
+            QMessageBox.information(self, "Info", f"No e-mail addresses needed normalizing.{invalid_note}")
+        
+        self.table_model.set_data(df)
+    
     def title_case_names(self):
         """Converts names to title case"""
         df = self.table_model.get_data()
@@ -531,45 +1567,23 @@ class MainWindow(QMainWindow):
             return
         
         # Save old names
-        old_names = df.loc[selected_rows, 'Name'].copy()
+        old_names = df['Name'].iloc[selected_rows]
         
         # Apply title case
-        df.loc[selected_rows, 'Name'] = df.loc[selected_rows, 'Name'].str.title()
+        df = self.run_step('title_case', selected_rows)
+        new_names = df['Name'].iloc[selected_rows]
         
         # Calculate changed count
-        changed_count = (old_names != df.loc[selected_rows, 'Name']).sum()
+        changed_count = (old_names != new_names).sum()
         
         # Show results
         if changed_count > 0:
-            # Create a scrollable text area for details
-            details = QTextEdit()
-            details.setReadOnly(True)
-            details.setMaximumHeight(200)
-            
-            # Add changed names to text area
-            details.append(f"Converted {changed_count} names to title case out of {len(selected_rows)} selected records:\n")
-            changed_names = pd.DataFrame({
-                'Old Name': old_names[old_names != df.loc[selected_rows, 'Name']],
-                'New Name': df.loc[selected_rows, 'Name'][old_names != df.loc[selected_rows, 'Name']]
-            })
-            for _, row in changed_names.iterrows():
-                details.append(f"{row['Old Name']} → {row['New Name']}")
-            
-            # Create custom dialog
-            dialog = QDialog(self)
-            dialog.setWindowTitle("Name Changes")
-            layout = QVBoxLayout()
-            
-            # Add text area
-            layout.addWidget(details)
-            
-            # Add OK button
-            button_box = QDialogButtonBox(QDialogButtonBox.Ok)
-            button_box.accepted.connect(dialog.accept)
-            layout.addWidget(button_box)
-            
-            dialog.setLayout(layout)
-            dialog.exec_()
+            self.show_changes(
+                "Name Changes",
+                f"Converted {changed_count} names to title case out of {len(selected_rows)} selected records:",
+                ['Old Name', 'New Name'],
+                old_names, new_names
+            )
         else:
             QMessageBox.information(self, "Info", "No names found to convert.")
         
@@ -603,48 +1617,26 @@ class MainWindow(QMainWindow):
             
             if ok:
                 # Save old names
-                old_names = df.loc[selected_rows, 'Name'].copy()
+                old_names = df['Name'].iloc[selected_rows]
                 
                 # Add code
-                if position == "Add to Start":
-                    df.loc[selected_rows, 'Name'] = code + " " + df.loc[selected_rows, 'Name']
-                else:
-                    df.loc[selected_rows, 'Name'] = df.loc[selected_rows, 'Name'] + " " + code
+                df = self.run_step(
+                    'append_code', selected_rows, code=code,
+                    position='start' if position == "Add to Start" else 'end'
+                )
+                new_names = df['Name'].iloc[selected_rows]
                 
                 # Calculate changed count
-                changed_count = (old_names != df.loc[selected_rows, 'Name']).sum()
+                changed_count = (old_names != new_names).sum()
                 
                 # Show results
                 if changed_count > 0:
-                    # Create a scrollable text area for details
-                    details = QTextEdit()
-                    details.setReadOnly(True)
-                    details.setMaximumHeight(200)
-                    
-                    # Add changed names to text area
-                    details.append(f"Added code to {changed_count} names out of {len(selected_rows)} selected records:\n")
-                    changed_names = pd.DataFrame({
-                        'Old Name': old_names[old_names != df.loc[selected_rows, 'Name']],
-                        'New Name': df.loc[selected_rows, 'Name'][old_names != df.loc[selected_rows, 'Name']]
-                    })
-                    for _, row in changed_names.iterrows():
-                        details.append(f"{row['Old Name']} → {row['New Name']}")
-                    
-                    # Create custom dialog
-                    dialog = QDialog(self)
-                    dialog.setWindowTitle("Name Changes")
-                    layout = QVBoxLayout()
-                    
-                    # Add text area
-                    layout.addWidget(details)
-                    
-                    # Add OK button
-                    button_box = QDialogButtonBox(QDialogButtonBox.Ok)
-                    button_box.accepted.connect(dialog.accept)
-                    layout.addWidget(button_box)
-                    
-                    dialog.setLayout(layout)
-                    dialog.exec_()
+                    self.show_changes(
+                        "Name Changes",
+                        f"Added code to {changed_count} names out of {len(selected_rows)} selected records:",
+                        ['Old Name', 'New Name'],
+                        old_names, new_names
+                    )
                 else:
                     QMessageBox.information(self, "Info", "No names found to modify.")
                 
@@ -664,53 +1656,23 @@ class MainWindow(QMainWindow):
             return
         
         # Save old names
-        old_names = df.loc[selected_rows, 'Name'].copy()
+        old_names = df['Name'].iloc[selected_rows]
         
         # Make last word uppercase
-        def make_last_word_upper(name):
-            if pd.isna(name):
-                return name
-            words = name.split()
-            if words:
-                words[-1] = words[-1].upper()
-            return ' '.join(words)
-        
-        df.loc[selected_rows, 'Name'] = df.loc[selected_rows, 'Name'].apply(make_last_word_upper)
+        df = self.run_step('last_word_upper', selected_rows)
+        new_names = df['Name'].iloc[selected_rows]
         
         # Calculate changed count
-        changed_count = (old_names != df.loc[selected_rows, 'Name']).sum()
+        changed_count = (old_names != new_names).sum()
         
         # Show results
         if changed_count > 0:
-            # Create a scrollable text area for details
-            details = QTextEdit()
-            details.setReadOnly(True)
-            details.setMaximumHeight(200)
-            
-            # Add changed names to text area
-            details.append(f"Made last word uppercase in {changed_count} names out of {len(selected_rows)} selected records:\n")
-            changed_names = pd.DataFrame({
-                'Old Name': old_names[old_names != df.loc[selected_rows, 'Name']],
-                'New Name': df.loc[selected_rows, 'Name'][old_names != df.loc[selected_rows, 'Name']]
-            })
-            for _, row in changed_names.iterrows():
-                details.append(f"{row['Old Name']} → {row['New Name']}")
-            
-            # Create custom dialog
-            dialog = QDialog(self)
-            dialog.setWindowTitle("Name Changes")
-            layout = QVBoxLayout()
-            
-            # Add text area
-            layout.addWidget(details)
-            
-            # Add OK button
-            button_box = QDialogButtonBox(QDialogButtonBox.Ok)
-            button_box.accepted.connect(dialog.accept)
-            layout.addWidget(button_box)
-            
-            dialog.setLayout(layout)
-            dialog.exec_()
+            self.show_changes(
+                "Name Changes",
+                f"Made last word uppercase in {changed_count} names out of {len(selected_rows)} selected records:",
+                ['Old Name', 'New Name'],
+                old_names, new_names
+            )
         else:
             QMessageBox.information(self, "Info", "No names found to modify.")
         
@@ -729,67 +1691,47 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please select records to edit.")
             return
         
-        # Get search text
-        search_text, ok = QInputDialog.getText(
-            self, "Replace/Delete Text",
-            "Enter text to search:"
-        )
+        # Get rules and target columns
+        dialog = FindReplaceDialog(df, selected_rows, CONTACT_COLUMNS, self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
         
-        if ok and search_text:
-            # Get replacement text
-            replace_text, ok = QInputDialog.getText(
-                self, "Replace/Delete Text",
-                "Enter new text (leave empty to delete):"
-            )
-            
-            if ok:
-                # Save old names
-                old_names = df.loc[selected_rows, 'Name'].copy()
-                
-                # Replace or delete text
-                df.loc[selected_rows, 'Name'] = df.loc[selected_rows, 'Name'].str.replace(
-                    search_text, replace_text, case=False, regex=False
-                )
-                
-                # Calculate changed count
-                changed_count = (old_names != df.loc[selected_rows, 'Name']).sum()
-                
-                # Show results
-                if changed_count > 0:
-                    # Create a scrollable text area for details
-                    details = QTextEdit()
-                    details.setReadOnly(True)
-                    details.setMaximumHeight(200)
-                    
-                    # Add changed names to text area
-                    action = "deleted" if not replace_text else "replaced"
-                    details.append(f"{action.capitalize()} '{search_text}' in {changed_count} names out of {len(selected_rows)} selected records:\n")
-                    changed_names = pd.DataFrame({
-                        'Old Name': old_names[old_names != df.loc[selected_rows, 'Name']],
-                        'New Name': df.loc[selected_rows, 'Name'][old_names != df.loc[selected_rows, 'Name']]
-                    })
-                    for _, row in changed_names.iterrows():
-                        details.append(f"{row['Old Name']} → {row['New Name']}")
-                    
-                    # Create custom dialog
-                    dialog = QDialog(self)
-                    dialog.setWindowTitle("Name Changes")
-                    layout = QVBoxLayout()
-                    
-                    # Add text area
-                    layout.addWidget(details)
-                    
-                    # Add OK button
-                    button_box = QDialogButtonBox(QDialogButtonBox.Ok)
-                    button_box.accepted.connect(dialog.accept)
-                    layout.addWidget(button_box)
-                    
-                    dialog.setLayout(layout)
-                    dialog.exec_()
-                else:
-                    QMessageBox.information(self, "Info", f"No names containing '{search_text}' found.")
-                
-                self.table_model.set_data(df) 
+        try:
+            engine = dialog.get_engine()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Invalid rule: {str(e)}")
+            return
+        columns = dialog.get_columns()
+        if not engine.rules or not columns:
+            return
+        
+        # Replace or delete text
+        params = engine.to_dict()
+        new_df = self.run_step('find_replace', selected_rows, columns=columns, **params)
+        
+        # Collect changed values per column
+        changed_columns, old_values, new_values = [], [], []
+        for column in columns:
+            old = df[column].iloc[selected_rows]
+            new = new_df[column].iloc[selected_rows]
+            changed = (old != new).to_numpy()
+            changed_columns.extend([column] * int(changed.sum()))
+            old_values.extend(old.to_numpy()[changed])
+            new_values.extend(new.to_numpy()[changed])
+        
+        # Show results
+        if changed_columns:
+            ChangePreviewDialog(
+                "Text Changes",
+                f"Applied {len(engine.rules)} rules: changed {len(changed_columns)} values in {len(selected_rows)} selected records:",
+                ['Column', 'Old Value', 'New Value'],
+                [changed_columns, old_values, new_values],
+                parent=self
+            ).exec_()
+        else:
+            QMessageBox.information(self, "Info", "No matching text found.")
+        
+        self.table_model.set_data(new_df)
     
     def delete_selected(self):
         """Deletes selected records"""
@@ -804,32 +1746,14 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please select records to delete.")
             return
         
-        # Create a scrollable text area for details
-        details = QTextEdit()
-        details.setReadOnly(True)
-        details.setMaximumHeight(200)
-        
-        # Add selected records to text area
-        details.append(f"Selected {len(selected_rows)} records to delete:\n")
-        for idx in selected_rows:
-            row = df.iloc[idx]
-            details.append(f"Name: {row['Name']}\nPhone: {row['Phone']}\n---")
-        
-        # Create custom dialog
-        dialog = QDialog(self)
-        dialog.setWindowTitle("Delete Records")
-        layout = QVBoxLayout()
-        
-        # Add text area
-        layout.addWidget(details)
-        
-        # Add buttons
-        button_box = QDialogButtonBox(QDialogButtonBox.Yes | QDialogButtonBox.No)
-        button_box.accepted.connect(dialog.accept)
-        button_box.rejected.connect(dialog.reject)
-        layout.addWidget(button_box)
-        
-        dialog.setLayout(layout)
+        # Preview records to delete
+        dialog = ChangePreviewDialog(
+            "Delete Records",
+            f"Selected {len(selected_rows)} records to delete:",
+            ['Name', 'Phone'],
+            [df['Name'].to_numpy()[selected_rows], df['Phone'].to_numpy()[selected_rows]],
+            confirm=True, parent=self
+        )
         
         if dialog.exec_() == QDialog.Accepted:
             # Remove selected rows
@@ -844,7 +1768,7 @@ class MainWindow(QMainWindow):
         """Finds matches from a reference list"""
         # Get reference list file
         file_name, _ = QFileDialog.getOpenFileName(
-            self, "Open Reference List", "", "Text Files (*.txt);;CSV Files (*.csv)"
+            self, "Open Reference List", "", "Text Files (*.txt);;CSV Files (*.csv);;Compressed Lists (*.gz *.bz2 *.xz *.zst)"
         )
         
         if not file_name:
@@ -852,88 +1776,47 @@ class MainWindow(QMainWindow):
         
         try:
             # Read reference list
-            if file_name.endswith('.csv'):
-                ref_df = pd.read_csv(file_name)
-                ref_names = ref_df.iloc[:, 0].tolist()  # Assume names are in first column
-            else:
-                with open(file_name, 'r', encoding='utf-8') as f:
-                    ref_names = [line.strip() for line in f if line.strip()]
+            ref_names = load_references(file_name)
             
             # Get current contact names
             df = self.table_model.get_data()
             contact_names = df['Name'].tolist()
             
             # Get matching type
+            match_types = {"Exact Match": 'exact', "Token Sort Ratio": 'token_sort',
+                           "Token Set Ratio": 'token_set'}
             match_type, ok = QInputDialog.getItem(
                 self, "Select Matching Type",
                 "How would you like to match names?",
-                ["Exact Match", "Token Sort Ratio", "Token Set Ratio"],
-                0, False
+                list(match_types), 0, False
             )
             
             if not ok:
                 return
             
-            # Get threshold
-            threshold, ok = QInputDialog.getInt(
-                self, "Match Threshold",
-                "Enter similarity threshold (0-100):",
-                self.fuzzy_threshold, 0, 100, 5
-            )
+            # Scores are computed once; the dialog's slider only filters them
+            method = match_types[match_type]
+            pairs = self.similarity_cache.reference_matches(
+                self.table_model.data_version(), ref_names, contact_names, method)
             
-            if not ok:
-                return
-            
-            self.fuzzy_threshold = threshold
-            
-            # Find matches
-            matches = []
-            for ref_name in ref_names:
-                if match_type == "Exact Match":
-                    # Exact match
-                    exact_matches = [(ref_name, name, 100) for name in contact_names 
-                                   if name.lower() == ref_name.lower()]
-                    matches.extend(exact_matches)
-                else:
-                    # Fuzzy match
-                    scorer = fuzz.token_sort_ratio if match_type == "Token Sort Ratio" else fuzz.token_set_ratio
-                    fuzzy_matches = process.extract(
-                        ref_name,
-                        contact_names,
-                        scorer=scorer,
-                        limit=3
-                    )
-                    good_matches = [(ref_name, name, score) for name, score in fuzzy_matches if score >= threshold]
-                    matches.extend(good_matches)
-            
-            if not matches:
+            if not len(pairs):
                 QMessageBox.information(self, "Info", "No matches found.")
                 return
             
             # Show matches dialog
-            dialog = MatchDialog(matches, self)
+            threshold = None if method == 'exact' else self.fuzzy_threshold
+            dialog = MatchDialog(pairs, threshold, self)
             if dialog.exec_() == QDialog.Accepted:
+                if dialog.threshold() is not None:
+                    self.fuzzy_threshold = dialog.threshold()
                 selected_names = dialog.get_selected_matches()
                 
                 if not selected_names:
                     QMessageBox.warning(self, "Warning", "No matches selected.")
                     return
                 
-                # Select matched rows in table
-                self.table_view.clearSelection()
-                selection_model = self.table_view.selectionModel()
-                
-                # Get the source model indices
-                for name in selected_names:
-                    # Find all rows with this name
-                    matches = df.index[df['Name'] == name].tolist()
-                    for idx in matches:
-                        # Convert to proxy model index
-                        source_index = self.table_model.index(idx, 0)
-                        proxy_index = self.proxy_model.mapFromSource(source_index)
-                        if proxy_index.isValid():
-                            # Select the row
-                            selection_model.select(proxy_index, selection_model.Select | selection_model.Rows)
+                # Select all rows with the selected names (hash lookup, one selection call)
+                self.select_rows(np.flatnonzero(df['Name'].isin(selected_names)))
                 
                 QMessageBox.information(self, "Success", 
                     f"Selected {len(selected_names)} matches. You can now perform operations on these records.")
@@ -0,0 +1,151 @@
+import argparse
+import hashlib
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from vcf_handler import VCFHandler, BlobRef, CARD_COLUMN
+from multivalue import as_values, format_value
+
+DIFF_COLUMNS = ['Status', 'Key', 'Old Name', 'New Name', 'Old Phone', 'New Phone',
+                'Old E-mail', 'New E-mail']
+
+KEY_TYPES = ('phone', 'name')
+
+def _split_values(value) -> list:
+    return [part.strip() for part in as_values(value) if part.strip()]
+
+def normalize_phone_key(phone: str) -> str:
+    """Telefonu karşılaştırma anahtarına çevirir (ülke kodu ve baştaki 0 olmadan rakamlar)"""
+    digits = re.sub(r'\D', '', phone)
+    if digits.startswith('0'):
+        digits = digits[1:]
+    if digits.startswith('90') and len(digits) > 10:
+        digits = digits[2:]
+    return digits
+
+def normalize_name_key(name) -> str:
+    """İsmi karşılaştırma anahtarına çevirir"""
+    if pd.isna(name):
+        return ''
+    return ' '.join(unicodedata.normalize('NFC', str(name)).casefold().split())
+
+def contact_key(contact: Dict, key: str = 'phone') -> str:
+    """
+    Kişinin eşleştirme anahtarını döndürür; telefonu olmayan kişiler
+    isimleriyle eşleştirilir
+    """
+    if key == 'phone':
+        phones = [normalize_phone_key(phone) for phone in _split_values(contact['Phone'])]
+        phones = [phone for phone in phones if phone]
+        if phones:
+            return 'tel:' + phones[0]
+    return 'name:' + normalize_name_key(contact['Name'])
+
+def contact_fingerprint(contact: Dict) -> bytes:
+    """Normalize edilmiş kişi alanlarının özeti (sıra ve biçim farkları yok sayılır)"""
+    parts = [
+        normalize_name_key(contact['Name']),
+        ','.join(sorted(normalize_phone_key(phone) for phone in _split_values(contact['Phone']))),
+        ','.join(sorted(email.casefold() for email in _split_values(contact['E-mail']))),
+    ]
+    return hashlib.blake2b('\x1f'.join(parts).encode('utf-8'), digest_size=8).digest()
+
+def _row(status: str, key: str, old: Optional[Dict], new: Optional[Dict]) -> Dict:
+    old = old or {}
+    new = new or {}
+    return {
+        'Status': status,
+        'Key': key.split(':', 1)[1],
+        'Old Name': old.get('Name', ''),
+        'New Name': new.get('Name', ''),
+        'Old Phone': format_value(old.get('Phone', '')),
+        'New Phone': format_value(new.get('Phone', '')),
+        'Old E-mail': format_value(old.get('E-mail', '')),
+        'New E-mail': format_value(new.get('E-mail', '')),
+    }
+
+def compare_vcf(old_path: str, new_path: str, key: str = 'phone',
+                include_unchanged: bool = False,
+                handler: Optional[VCFHandler] = None) -> pd.DataFrame:
+    """
+    İki VCF dosyasını karşılaştırır ve eklenen/silinen/değişen kişileri döndürür
+
+    Eski dosyadan yalnızca anahtar, özet ve kartın dosyadaki konumu bellekte
+    tutulur; yeni dosya akış olarak okunur. Rapor için gereken eski kartlar
+    konumlarından yeniden okunur. Aynı anahtara sahip birden fazla kişi
+    varsa önce birebir aynı olanlar, kalanlar dosyadaki sıralarına göre
+    eşleştirilir.
+
+    Args:
+        old_path: Eski (ör. dünkü) dosya
+        new_path: Yeni (ör. bugünkü) dosya
+        key: 'phone' (normalize telefon) veya 'name'
+        include_unchanged: Değişmeyen kişiler de rapora eklensin mi?
+
+    Returns:
+        pd.DataFrame: DIFF_COLUMNS sütunlarıyla fark raporu
+    """
+    if key not in KEY_TYPES:
+        raise ValueError(f"Unknown key type: {key}")
+    handler = handler or VCFHandler()
+
+    # Eski dosya: anahtar -> [(özet, kart referansı), ...]
+    old_index: Dict[str, List[Tuple[bytes, BlobRef]]] = {}
+    for contact in handler.iter_contacts(old_path):
+        old_index.setdefault(contact_key(contact, key), []).append(
+            (contact_fingerprint(contact), contact[CARD_COLUMN]))
+
+    rows = []
+    # Aynı anahtarlı eski kartlardan hiçbiriyle birebir eşleşmeyen yeni kişiler
+    unmatched: Dict[str, List[Dict]] = {}
+    for contact in handler.iter_contacts(new_path):
+        contact_id = contact_key(contact, key)
+        candidates = old_index.get(contact_id)
+        if not candidates:
+            rows.append(_row('Added', contact_id, None, contact))
+            continue
+        fingerprint = contact_fingerprint(contact)
+        for i, (old_fingerprint, _) in enumerate(candidates):
+            if old_fingerprint == fingerprint:
+                del candidates[i]
+                if include_unchanged:
+                    rows.append(_row('Unchanged', contact_id, contact, contact))
+                break
+        else:
+            unmatched.setdefault(contact_id, []).append(contact)
+
+    # Kalanlar sırayla eşleştirilir: eşi olanlar değişmiş, olmayanlar eklenmiş/silinmiştir
+    for contact_id, contacts in unmatched.items():
+        candidates = old_index[contact_id]
+        for contact in contacts:
+            if candidates:
+                _, card = candidates.pop(0)
+                rows.append(_row('Modified', contact_id, handler.read_card(card), contact))
+            else:
+                rows.append(_row('Added', contact_id, None, contact))
+
+    for contact_id, candidates in old_index.items():
+        for _, card in candidates:
+            rows.append(_row('Removed', contact_id, handler.read_card(card), None))
+
+    return pd.DataFrame(rows, columns=DIFF_COLUMNS)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two VCF files")
+    parser.add_argument('old', help="Old VCF file")
+    parser.add_argument('new', help="New VCF file")
+    parser.add_argument('--key', choices=KEY_TYPES, default='phone', help="Join key")
+    parser.add_argument('-o', '--output', help="Write the report to this CSV file")
+    args = parser.parse_args(argv)
+
+    report = compare_vcf(args.old, args.new, args.key)
+    if report.empty:
+        print("No differences")
+    for status, count in report['Status'].value_counts().items():
+        print(f"{status}: {count}")
+    if args.output:
+        report.to_csv(args.output, index=False)
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,266 @@
 import vobject
+import numpy as np
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+from dataclasses import dataclass, field
+import base64
+import io
+import os
+import re
 import unicodedata
+from urllib.parse import unquote_to_bytes
+import compression
+from multivalue import DISPLAY_SEPARATOR, as_values, format_column, format_frame
+
+# Ayrıştırılmadan dosyada referans olarak tutulan büyük özellikler
+LARGE_PROPERTIES = {b'PHOTO', b'LOGO', b'SOUND', b'KEY'}
+
+# Tabloda görünen kişi sütunları
+CONTACT_COLUMNS = ['Name', 'Phone', 'E-mail', 'Type']
+
+# Arayüzde gösterilmeyen, dışa aktarımda kullanılan sütunlar
+ATTACHMENTS_COLUMN = '_attachments'
+CARD_COLUMN = '_card'
+HASH_COLUMN = '_hash'
+
+# Düzenlenen kartlarda tablodaki değerlerle yeniden yazılan özellikler
+_REPLACED_PROPERTIES = {b'FN', b'N', b'TEL', b'EMAIL'}
+
+# Kart boyutu tahmininde kart başına (BEGIN/VERSION/N/END satırları) ve her
+# telefon/e-posta satırı için eklenen bayt sayıları
+_CARD_OVERHEAD = 64
+_VALUE_OVERHEAD = 32
+
+_PROPERTY_NAME = re.compile(rb'(?:[A-Za-z0-9-]+\.)?([A-Za-z0-9-]+)')
+_FOLD = re.compile(rb'\r?\n[ \t]')
+
+@dataclass(frozen=True)
+class BlobRef:
+    """
+    Kaynak dosyadaki bir bayt aralığına referans: büyük bir vCard özelliği
+    (ör. PHOTO) veya name='VCARD' ile kartın tamamı
+
+    Sıkıştırılmış dosyalarda bir konuma doğrudan gidilemediği için ham
+    baytlar data'da tutulur; bu durumda path None'dır.
+    """
+    path: Optional[str]
+    offset: int
+    length: int
+    name: str
+    data: Optional[bytes] = field(default=None, repr=False)
+
+    def read_raw(self) -> bytes:
+        """Özelliğin ham (katlanmış) satırlarını okur"""
+        if self.data is not None:
+            return self.data
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            return f.read(self.length)
+
+    def decode(self) -> bytes:
+        """Özelliğin ikili içeriğini çözer; URL referanslarında boş döner"""
+        text = _FOLD.sub(b'', self.read_raw()).strip()
+        params, _, value = text.partition(b':')
+        if value[:5].lower() == b'data:':
+            meta, _, payload = value.partition(b',')
+            if b';base64' in meta.lower():
+                return base64.b64decode(payload)
+            return unquote_to_bytes(payload)
+        params = params.upper()
+        if b'ENCODING=B' in params or b'BASE64' in params:
+            return base64.b64decode(value)
+        return b''
+
+    def copy_to(self, f, newline: str = '\n') -> None:
+        """
+        Özelliği kaynaktan çözmeden, satır satır çıktı dosyasına aktarır;
+        satır sonları newline ile yazılır
+        """
+        with (io.BytesIO(self.data) if self.data is not None else open(self.path, 'rb')) as source:
+            if self.data is None:
+                source.seek(self.offset)
+            remaining = self.length
+            while remaining > 0:
+                line = source.readline(remaining)
+                if not line:
+                    break
+                remaining -= len(line)
+                f.write(line.rstrip(b'\r\n').decode('utf-8') + newline)
+
+def content_hash(df: pd.DataFrame) -> np.ndarray:
+    """Görünen sütunlardan satır bazlı özet üretir (değişiklik tespiti için)"""
+    return pd.util.hash_pandas_object(
+        df[CONTACT_COLUMNS].fillna('').astype(str), index=False
+    ).to_numpy()
+
+def _copy_range(source, target, offset: int, length: int, sendfile: bool = True) -> None:
+    """Dosya aralığını mümkünse çekirdek içinde (sendfile), değilse parça parça kopyalar"""
+    copied = 0
+    if sendfile and hasattr(os, 'sendfile'):
+        try:
+            while copied < length:
+                sent = os.sendfile(target.fileno(), source.fileno(), offset + copied, length - copied)
+                if sent == 0:
+                    break
+                copied += sent
+        except OSError:
+            pass
+    source.seek(offset + copied)
+    while copied < length:
+        chunk = source.read(min(1 << 20, length - copied))
+        if not chunk:
+            raise IOError(f"Source file changed while saving: {source.name}")
+        target.write(chunk)
+        copied += len(chunk)
+
+class _CardWriter:
+    """
+    Çıktı konumunu izleyen ve ham aralıkları doğrudan kopyalayan yazıcı
+
+    Sıkıştırılmış çıktıda (raw=False) konumlar sıkıştırılmamış veriye
+    göredir ve aralıklar sendfile ile değil, sıkıştırıcıdan geçirilerek
+    kopyalanır.
+    """
+    BUFFER_SIZE = 1 << 20
+    
+    def __init__(self, f, raw: bool = True):
+        self.f = f
+        self.raw = raw
+        self.position = 0
+        self._pending = []
+        self._pending_size = 0
+        self._sources = {}
+    
+    def write(self, text: str) -> None:
+        self.write_bytes(text.encode('utf-8'))
+    
+    def write_bytes(self, data: bytes) -> None:
+        self._pending.append(data)
+        self._pending_size += len(data)
+        self.position += len(data)
+        if self._pending_size >= self.BUFFER_SIZE:
+            self.flush()
+    
+    def flush(self) -> None:
+        if self._pending:
+            self.f.write(b''.join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+        if self.raw:
+            # Sıkıştırıcıyı boşaltmak sıkıştırma oranını düşürür; yalnızca sendfile için gerekir
+            self.f.flush()
+    
+    def copy_range(self, path: str, offset: int, length: int) -> None:
+        self.flush()
+        if path not in self._sources:
+            self._sources[path] = open(path, 'rb')
+        _copy_range(self._sources[path], self.f, offset, length, sendfile=self.raw)
+        self.position += length
+    
+    def close(self) -> None:
+        self.flush()
+        for source in self._sources.values():
+            source.close()
+
+def _attachments(row) -> tuple:
+    """Satırdaki büyük özellik referanslarını döndürür"""
+    value = row.get(ATTACHMENTS_COLUMN)
+    return value if isinstance(value, tuple) else ()
 
 class VCFHandler:
     def __init__(self):
         self.supported_fields = ['FN', 'TEL', 'EMAIL', 'TYPE']
     
+    def _scan_cards(self, filepath: str) -> Iterator[Tuple[BlobRef, str, tuple]]:
+        """
+        VCF dosyasını ham bayt olarak kartlara ayırır
+        
+        Büyük özellikler (PHOTO, LOGO, ...) metinden çıkarılıp BlobRef olarak
+        döndürülür; böylece vobject bunları hiç çözmez. Sıkıştırılmış dosyalar
+        akış olarak açılır; kartların ham baytları referanslarda tutulur.
+        
+        Yields:
+            (kart referansı, büyük özellikler hariç kart metni, BlobRef'ler)
+        """
+        codec = compression.detect(filepath)
+        with compression.open_file(filepath, 'rb', codec) as f:
+            yield from self._scan_lines(f, filepath, inline=codec is not None)
+    
+    def _scan_lines(self, lines, filepath: Optional[str], base_offset: int = 0, inline: bool = False
+                    ) -> Iterator[Tuple[BlobRef, str, tuple]]:
+        """
+        _scan_cards'ın çekirdeği: ikili satırları tarar; konumlar
+        base_offset'e göre hesaplanır. inline ise referanslar dosya yolu
+        yerine ham baytları taşır.
+        """
+        offset = base_offset
+        gap_start = base_offset
+        card_start = None
+        card_lines = []
+        blobs = []
+        large_start = None
+        large_name = None
+        # inline kipte kartın ve büyük özelliğin ham satırları
+        card_raw = []
+        large_raw = []
+        
+        def reference(start, length, name, raw_lines):
+            if inline:
+                return BlobRef(None, start, length, name, b''.join(raw_lines))
+            return BlobRef(filepath, start, length, name)
+        
+        for raw in lines:
+            line_start = offset
+            offset += len(raw)
+            if inline and (card_start is not None or gap_start is not None):
+                card_raw.append(raw)
+            
+            # Katlanmış devam satırı
+            if raw[:1] in (b' ', b'\t'):
+                if large_start is not None:
+                    if inline:
+                        large_raw.append(raw)
+                elif card_start is not None:
+                    card_lines.append(raw.decode('utf-8'))
+                continue
+            
+            # Yeni mantıksal satır: bekleyen büyük özelliği kapat
+            if large_start is not None:
+                blobs.append(reference(large_start, line_start - large_start, large_name, large_raw))
+                large_start = None
+            
+            upper = raw.strip().upper()
+            if upper == b'BEGIN:VCARD':
+                # Kartlar arasındaki boş satırlar kartın aralığına dahil edilir
+                card_start = line_start if gap_start is None else gap_start
+                if inline and gap_start is None:
+                    card_raw = [raw]
+                card_lines = [raw.decode('utf-8')]
+                blobs = []
+                continue
+            if card_start is None:
+                if upper:
+                    gap_start = None
+                    card_raw = []
+                continue
+            if upper == b'END:VCARD':
+                card_lines.append(raw.decode('utf-8'))
+                yield (reference(card_start, offset - card_start, 'VCARD', card_raw),
+                       ''.join(card_lines), tuple(blobs))
+                card_start = None
+                gap_start = offset
+                card_raw = []
+                continue
+            
+            match = _PROPERTY_NAME.match(raw)
+            name = match.group(1).upper() if match else b''
+            if name in LARGE_PROPERTIES:
+                large_start = line_start
+                large_name = name.decode('ascii')
+                large_raw = [raw]
+                continue
+            card_lines.append(raw.decode('utf-8'))
+    
     def parse_vcf(self, filepath: str) -> pd.DataFrame:
         """
         VCF dosyasını okur ve DataFrame'e dönüştürür
@@ -17,47 +271,105 @@ class VCFHandler:
         Returns:
             pd.DataFrame: VCF verilerini içeren DataFrame
         """
+        return self._contacts_frame(list(self.iter_contacts(filepath)))
+    
+    def _contacts_frame(self, contacts: List[Dict]) -> pd.DataFrame:
+        """Kişi sözlüklerinden tablo DataFrame'ini oluşturur"""
+        if not contacts:
+            return pd.DataFrame(columns=CONTACT_COLUMNS)
+        
+        df = pd.DataFrame(contacts)
+        df[HASH_COLUMN] = content_hash(df)
+        return df
+    
+    def iter_batches(self, filepath: str, first_batch: int = 100,
+                     max_batch: int = 50000) -> Iterator[pd.DataFrame]:
+        """
+        Kişileri giderek büyüyen parçalar halinde DataFrame olarak döndürür
+        
+        İlk parça küçük tutulur ki ilk kişiler hemen gösterilebilsin;
+        sonraki parçalar max_batch'e kadar ikiye katlanır.
+        
+        Args:
+            filepath: VCF dosyasının yolu
+            first_batch: İlk parçadaki kişi sayısı
+            max_batch: Bir parçadaki en fazla kişi sayısı
+        """
+        batch_size = first_batch
         contacts = []
+        for contact in self.iter_contacts(filepath):
+            contacts.append(contact)
+            if len(contacts) >= batch_size:
+                yield self._contacts_frame(contacts)
+                contacts = []
+                batch_size = min(batch_size * 2, max_batch)
+        if contacts:
+            yield self._contacts_frame(contacts)
+    
+    def iter_contacts(self, filepath: str) -> Iterator[Dict]:
+        """
+        VCF dosyasındaki kişileri tek tek, tüm dosyayı belleğe almadan döndürür
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            vcards = vobject.readComponents(f)
+        Args:
+            filepath: VCF dosyasının yolu
             
-            for vcard in vcards:
-                contact = {
-                    'Name': '',
-                    'Phone': '',
-                    'E-mail': '',
-                    'Type': ''
-                }
-                
-                # İsim
-                if hasattr(vcard, 'fn'):
-                    contact['Name'] = vcard.fn.value
-                
-                # Telefon
-                if hasattr(vcard, 'tel'):
-                    phones = []
-                    types = []
-                    for tel in vcard.tel_list:
-                        phones.append(tel.value)
-                        if hasattr(tel, 'type_param'):
-                            types.append(tel.type_param)
-                        else:
-                            types.append('')
-                    
-                    contact['Phone'] = ';'.join(phones)
-                    contact['Type'] = ';'.join(types)
-                
-                # E-posta
-                if hasattr(vcard, 'email'):
-                    emails = []
-                    for email in vcard.email_list:
-                        emails.append(email.value)
-                    contact['E-mail'] = ';'.join(emails)
-                
-                contacts.append(contact)
-        
-        return pd.DataFrame(contacts)
+        Yields:
+            Dict: Tablo satırı (ham kart ve büyük özellik referanslarıyla)
+        """
+        filepath = os.path.abspath(filepath)
+        for card, text, blobs in self._scan_cards(filepath):
+            contact = self._parse_card(vobject.readOne(text))
+            contact[ATTACHMENTS_COLUMN] = blobs
+            contact[CARD_COLUMN] = card
+            yield contact
+    
+    def read_card(self, card: BlobRef) -> Dict:
+        """Referansı verilen tek bir kartı okur"""
+        for _, text, blobs in self._scan_lines(io.BytesIO(card.read_raw()), card.path, card.offset,
+                                               inline=card.data is not None):
+            contact = self._parse_card(vobject.readOne(text))
+            contact[ATTACHMENTS_COLUMN] = blobs
+            contact[CARD_COLUMN] = card
+            return contact
+        raise ValueError(f"No vCard at {card.path}:{card.offset}")
+    
+    def _parse_card(self, vcard) -> Dict[str, str]:
+        """
+        Tek bir vCard nesnesinden tablo satırını oluşturur
+        """
+        contact = {
+            'Name': '',
+            'Phone': (),
+            'E-mail': (),
+            'Type': ()
+        }
+        
+        # İsim
+        if hasattr(vcard, 'fn'):
+            contact['Name'] = vcard.fn.value
+        
+        # Telefon
+        if hasattr(vcard, 'tel'):
+            phones = []
+            types = []
+            for tel in vcard.tel_list:
+                phones.append(tel.value)
+                if hasattr(tel, 'type_param'):
+                    types.append(tel.type_param)
+                else:
+                    types.append('')
+            
+            contact['Phone'] = tuple(phones)
+            contact['Type'] = tuple(types)
+        
+        # E-posta
+        if hasattr(vcard, 'email'):
+            emails = []
+            for email in vcard.email_list:
+                emails.append(email.value)
+            contact['E-mail'] = tuple(emails)
+        
+        return contact
     
     def _normalize_text(self, text: str) -> str:
         """
@@ -83,69 +395,355 @@ class VCFHandler:
             # Son kelime soyad, ilk kelime ad, ortadaki kelimeler orta ad
             return (parts[-1], parts[0], ' '.join(parts[1:-1]), '')
     
+    def _build_vcard(self, row):
+        """
+        Satırdan standart formatta vobject kartı oluşturur
+        """
+        vcard = vobject.vCard()
+        
+        # İsim
+        if pd.notna(row['Name']):
+            vcard.add('fn')
+            vcard.fn.value = self._normalize_text(row['Name'])
+        
+        # Telefon (türler telefonlarla aynı sıradadır)
+        phones = as_values(row['Phone'])
+        types = as_values(row['Type'])
+        types = types + ('',) * (len(phones) - len(types))
+        for phone, type_ in zip(phones, types):
+            if not phone.strip():
+                continue
+            tel = vcard.add('tel')
+            tel.value = phone.strip()
+            if type_:
+                tel.type_param = type_
+        
+        # E-posta
+        for email in as_values(row['E-mail']):
+            if not email.strip():
+                continue
+            vcard.add('email')
+            vcard.email_list[-1].value = email.strip()
+        
+        return vcard
+    
+    def _write_edited_card(self, writer: _CardWriter, row, card: BlobRef, vcard,
+                           target_path: str) -> tuple:
+        """
+        Düzenlenmiş kartı ham kartın özellik sırası ve satır sonlarıyla yazar.
+        Tablodaki değerlerle yeniden yazılan özellikler ilk göründükleri yere,
+        büyük özellikler kendi yerlerine, kartta hiç olmayanlar END satırından
+        önce yazılır; diğer özellikler (ADR, ORG, NOTE, BDAY, ...) olduğu gibi
+        kalır. Büyük özelliklerin çıktıdaki yeni referanslarını döndürür.
+        """
+        raw = card.read_raw()
+        newline = '\r\n' if b'\r\n' in raw else '\n'
+        
+        # vobject satırları CRLF ile ayırır; katlanmış satırlar önceki özelliğe aittir
+        generated: Dict[bytes, List[str]] = {}
+        lines = []
+        for line in vcard.serialize().rstrip('\r\n').split('\r\n')[1:-1]:
+            if line[:1] in (' ', '\t'):
+                lines.append(line)
+                continue
+            name = _PROPERTY_NAME.match(line.encode('utf-8')).group(1).upper()
+            lines = generated.setdefault(name, []) if name != b'VERSION' else []
+            lines.append(line)
+        
+        blobs = iter(_attachments(row))
+        relocated = []
+        
+        def write_blob(blob):
+            start = writer.position
+            blob.copy_to(writer, newline)
+            relocated.append(BlobRef(target_path, start, writer.position - start, blob.name))
+        
+        skipping = False
+        for line in raw.splitlines(keepends=True):
+            if line[:1] in (b' ', b'\t'):
+                if not skipping:
+                    writer.write_bytes(line)
+                continue
+            if line.strip().upper() == b'END:VCARD':
+                for group in generated.values():
+                    writer.write(''.join(text + newline for text in group))
+                for blob in blobs:
+                    write_blob(blob)
+                writer.write_bytes(line if line.endswith(b'\n') else line + newline.encode('ascii'))
+                break
+            match = _PROPERTY_NAME.match(line)
+            name = match.group(1).upper() if match else b''
+            skipping = name in _REPLACED_PROPERTIES or name in LARGE_PROPERTIES
+            if name in LARGE_PROPERTIES:
+                blob = next(blobs, None)
+                if blob is not None:
+                    write_blob(blob)
+            elif name in generated:
+                writer.write(''.join(text + newline for text in generated.pop(name)))
+            elif not skipping:
+                writer.write_bytes(line)
+        return tuple(relocated)
+    
+    def _write_blobs(self, writer: _CardWriter, row, target_path: str, newline: str = '\n') -> tuple:
+        """Büyük özellikleri kaynaktan aktarır ve çıktıdaki yeni referanslarını döndürür"""
+        relocated = []
+        for blob in _attachments(row):
+            start = writer.position
+            blob.copy_to(writer, newline)
+            relocated.append(BlobRef(target_path, start, writer.position - start, blob.name))
+        return tuple(relocated)
+    
+    def _write_ios_card(self, writer: _CardWriter, row, target_path: str) -> tuple:
+        # iOS uyumlu format
+        writer.write('BEGIN:VCARD\n')
+        
+        # İsim
+        if pd.notna(row['Name']):
+            name = self._normalize_text(row['Name'])
+            surname, firstname, middlename, prefix = self._split_name(name)
+            writer.write(f'N:{surname};{firstname};{middlename};{prefix};\n')
+            writer.write(f'FN:{name}\n')
+        
+        # Telefon
+        for phone in as_values(row['Phone']):
+            if phone.strip():
+                writer.write(f'TEL;type=pref:{phone.strip()}\n')
+        
+        # E-posta
+        for email in as_values(row['E-mail']):
+            if email.strip():
+                writer.write(f'EMAIL:{email.strip()}\n')
+        
+        # Fotoğraf vb. kaynaktan olduğu gibi aktarılır
+        blobs = self._write_blobs(writer, row, target_path)
+        
+        writer.write('END:VCARD\n\n')
+        return blobs
+    
+    def _write_standard_card(self, writer: _CardWriter, row, target_path: str) -> tuple:
+        # Standart format
+        vcard = self._build_vcard(row)
+        card = row.get(CARD_COLUMN)
+        
+        if isinstance(card, BlobRef):
+            # Düzenlenmiş kart: diğer özellikler ham karttan korunur
+            if pd.notna(row['Name']):
+                surname, firstname, middlename, _ = self._split_name(self._normalize_text(row['Name']))
+                vcard.add('n')
+                vcard.n.value = vobject.vcard.Name(family=surname, given=firstname, additional=middlename)
+            return self._write_edited_card(writer, row, card, vcard, target_path)
+        
+        serialized = vcard.serialize()
+        end = serialized.rfind('END:VCARD')
+        writer.write(serialized[:end])
+        
+        # Fotoğraf vb. kaynaktan olduğu gibi aktarılır
+        blobs = self._write_blobs(writer, row, target_path, '\r\n')
+        
+        writer.write(serialized[end:])
+        writer.write('\n')
+        return blobs
+    
+    def unchanged_rows(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Okunduğundan beri değiştirilmemiş ve ham kartı bilinen satırları döndürür
+        """
+        if CARD_COLUMN not in df.columns or HASH_COLUMN not in df.columns or df.empty:
+            return np.zeros(len(df), dtype=bool)
+        has_card = np.fromiter((isinstance(card, BlobRef) for card in df[CARD_COLUMN]),
+                               dtype=bool, count=len(df))
+        return has_card & (df[HASH_COLUMN].to_numpy() == content_hash(df))
+    
+    def estimate_card_sizes(self, df: pd.DataFrame, ios_compatible: bool = False) -> np.ndarray:
+        """
+        Kartların kaydedilince kaplayacağı bayt sayısını üstten tahmin eder
+
+        Standart formatta değişmemiş kartların boyu ham kartın boyudur;
+        diğerleri metin uzunluklarından, kaçış karakterlerine ve satır
+        katlamaya pay bırakılarak hesaplanır. Büyük özellikler (ör. PHOTO)
+        boyutlarıyla eklenir.
+        """
+        sizes = np.full(len(df), _CARD_OVERHEAD, dtype=np.int64)
+        # İsim FN ve N satırlarında iki kez yazılır; virgül gibi karakterler kaçışla uzar
+        for column, factor in (('Name', 3), ('Phone', 1), ('E-mail', 1), ('Type', 1)):
+            if column not in df.columns or df.empty:
+                continue
+            text = format_column(df[column])
+            sizes += factor * text.str.encode('utf-8').str.len().to_numpy(dtype=np.int64)
+            if column in ('Phone', 'E-mail'):
+                counts = text.str.count(DISPLAY_SEPARATOR).to_numpy() + (text != '').to_numpy()
+                sizes += _VALUE_OVERHEAD * counts.astype(np.int64)
+        # 75 baytı aşan satırlar katlanır ('\r\n ' eklenir)
+        sizes += sizes // 20
+
+        attachments = np.zeros(len(df), dtype=np.int64)
+        if ATTACHMENTS_COLUMN in df.columns:
+            attachments = np.fromiter(
+                (sum(blob.length for blob in blobs) if isinstance(blobs, tuple) else 0
+                 for blobs in df[ATTACHMENTS_COLUMN]), dtype=np.int64, count=len(df))
+        sizes += attachments
+        if ios_compatible or CARD_COLUMN not in df.columns:
+            return sizes
+
+        raw = np.fromiter((card.length if isinstance(card, BlobRef) else 0 for card in df[CARD_COLUMN]),
+                          dtype=np.int64, count=len(df))
+        # Düzenlenmiş kartlar ham karttaki diğer özellikleri de taşır
+        return np.where(self.unchanged_rows(df), raw, sizes + np.maximum(raw - attachments, 0))
+    
+    def _write_rows(self, writer: _CardWriter, df: pd.DataFrame, target_path: str,
+                    ios_compatible: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Satırları yazıcıya yazar
+        
+        Returns:
+            (değişmemiş satırlar, yeni kart konumları, yeni büyük özellik referansları)
+        """
+        unchanged = np.zeros(len(df), dtype=bool) if ios_compatible else self.unchanged_rows(df)
+        cards = df[CARD_COLUMN].to_numpy() if CARD_COLUMN in df.columns else np.full(len(df), None)
+        new_cards = np.empty(len(df), dtype=object)
+        new_blobs = np.empty(len(df), dtype=object)
+        
+        row_index = 0
+        while row_index < len(df):
+            if unchanged[row_index] and cards[row_index].data is not None:
+                # Sıkıştırılmış kaynaktan okunan kart bellekten yazılır
+                new_cards[row_index] = (writer.position, cards[row_index])
+                writer.write_bytes(cards[row_index].data)
+                row_index += 1
+                continue
+            if unchanged[row_index]:
+                # Ardışık değişmemiş kartları tek aralıkta topla
+                first = cards[row_index]
+                run_end = row_index + 1
+                end_offset = first.offset + first.length
+                while (run_end < len(df) and unchanged[run_end]
+                       and cards[run_end].data is None and cards[run_end].path == first.path
+                       and cards[run_end].offset == end_offset):
+                    end_offset += cards[run_end].length
+                    run_end += 1
+                start = writer.position
+                writer.copy_range(first.path, first.offset, end_offset - first.offset)
+                for i in range(row_index, run_end):
+                    new_cards[i] = (start + cards[i].offset - first.offset, cards[i])
+                row_index = run_end
+                continue
+            
+            row = df.iloc[row_index]
+            start = writer.position
+            if ios_compatible:
+                blobs = self._write_ios_card(writer, row, target_path)
+            else:
+                blobs = self._write_standard_card(writer, row, target_path)
+            new_cards[row_index] = BlobRef(target_path, start, writer.position - start, 'VCARD')
+            new_blobs[row_index] = blobs
+            row_index += 1
+        return unchanged, new_cards, new_blobs
+    
     def export_vcf(self, df: pd.DataFrame, filepath: str, ios_compatible: bool = False) -> None:
         """
         DataFrame'i VCF dosyası olarak kaydeder
         
+        Standart formatta, okunduğundan beri değişmemiş kartlar kaynak dosyadan
+        bayt bayt kopyalanır (ardışık kartlar tek aralık olarak); yalnızca
+        düzenlenen kartlar yeniden yazılır. Dosya önce geçici bir dosyaya
+        yazılır; kaynak dosyanın üzerine kaydedilirse df'deki ham kart
+        referansları yeni dosyaya taşınır. Dosya adı .gz, .bz2, .xz veya .zst
+        ile bitiyorsa çıktı akış halinde sıkıştırılır.
+        
         Args:
             df: Kaydedilecek veriler
             filepath: Kaydedilecek dosya yolu
             ios_compatible: iOS uyumlu format kullanılsın mı?
         """
-        with open(filepath, 'w', encoding='utf-8') as f:
-            for _, row in df.iterrows():
-                if ios_compatible:
-                    # iOS uyumlu format
-                    f.write('BEGIN:VCARD\n')
-                    
-                    # İsim
-                    if pd.notna(row['Name']):
-                        name = self._normalize_text(row['Name'])
-                        surname, firstname, middlename, prefix = self._split_name(name)
-                        f.write(f'N:{surname};{firstname};{middlename};{prefix};\n')
-                        f.write(f'FN:{name}\n')
-                    
-                    # Telefon
-                    if pd.notna(row['Phone']):
-                        phones = row['Phone'].split(';')
-                        for phone in phones:
-                            if phone.strip():
-                                f.write(f'TEL;type=pref:{phone.strip()}\n')
-                    
-                    # E-posta
-                    if pd.notna(row['E-mail']):
-                        emails = row['E-mail'].split(';')
-                        for email in emails:
-                            if email.strip():
-                                f.write(f'EMAIL:{email.strip()}\n')
-                    
-                    f.write('END:VCARD\n\n')
-                else:
-                    # Standart format
-                    vcard = vobject.vCard()
-                    
-                    # İsim
-                    if pd.notna(row['Name']):
-                        vcard.add('fn')
-                        vcard.fn.value = self._normalize_text(row['Name'])
-                    
-                    # Telefon
-                    if pd.notna(row['Phone']):
-                        phones = row['Phone'].split(';')
-                        types = row['Type'].split(';') if pd.notna(row['Type']) else [''] * len(phones)
-                        
-                        for phone, type_ in zip(phones, types):
-                            tel = vcard.add('tel')
-                            tel.value = phone.strip()
-                            if type_:
-                                tel.type_param = type_
-                    
-                    # E-posta
-                    if pd.notna(row['E-mail']):
-                        emails = row['E-mail'].split(';')
-                        for email in emails:
-                            vcard.add('email')
-                            vcard.email_list[-1].value = email.strip()
-                    
-                    f.write(vcard.serialize())
-                    f.write('\n') 
\ No newline at end of file
+        target_path = os.path.abspath(filepath)
+        tmp_path = target_path + '.tmp'
+        codec = compression.codec_from_name(target_path)
+        cards = df[CARD_COLUMN].to_numpy() if CARD_COLUMN in df.columns else np.full(len(df), None)
+        overwrote_source = any(isinstance(card, BlobRef) and card.path == target_path for card in cards)
+        if overwrote_source and codec is not None:
+            # Taşınan referanslar sıkıştırılmış dosyada bir konuma işaret edemez
+            raise ValueError("Cannot save a compressed file over its uncompressed source; choose another name")
+        
+        try:
+            with compression.open_file(tmp_path, 'wb', codec) as f:
+                writer = _CardWriter(f, raw=codec is None)
+                try:
+                    unchanged, new_cards, new_blobs = self._write_rows(writer, df, target_path, ios_compatible)
+                finally:
+                    writer.close()
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        os.replace(tmp_path, target_path)
+        
+        if overwrote_source and not ios_compatible:
+            # Eski dosya artık yok: referansları yeni dosyaya taşı
+            attachments = (df[ATTACHMENTS_COLUMN].to_numpy() if ATTACHMENTS_COLUMN in df.columns
+                           else np.full(len(df), ()))
+            for i in np.flatnonzero(unchanged):
+                start, card = new_cards[i]
+                shift = start - card.offset
+                new_cards[i] = BlobRef(target_path, start, card.length, 'VCARD')
+                blobs = attachments[i] if isinstance(attachments[i], tuple) else ()
+                new_blobs[i] = tuple(BlobRef(target_path, blob.offset + shift, blob.length, blob.name)
+                                     for blob in blobs)
+            df[CARD_COLUMN] = new_cards
+            df[ATTACHMENTS_COLUMN] = new_blobs
+            df[HASH_COLUMN] = content_hash(df)
+        elif overwrote_source:
+            # iOS formatındaki kartlar standart kayıtta ham olarak kopyalanmamalı
+            df[CARD_COLUMN] = None
+            df[ATTACHMENTS_COLUMN] = new_blobs
+    
+    def export_vcf_chunks(self, frames: Iterable[pd.DataFrame], filepath: str,
+                          ios_compatible: bool = False) -> int:
+        """
+        Parça parça gelen DataFrame'leri tek bir VCF dosyasına kaydeder
+        
+        Tüm veriyi belleğe almadan (ör. SQLite arşivinden) dışa aktarmak
+        içindir; değişmemiş kartlar export_vcf'deki gibi ham olarak kopyalanır.
+        Kartların kaynağı olan dosyanın üzerine yazılamaz. Sıkıştırma
+        export_vcf'deki gibi uzantıdan seçilir.
+        
+        Returns:
+            int: Yazılan kişi sayısı
+        """
+        target_path = os.path.abspath(filepath)
+        tmp_path = target_path + '.tmp'
+        codec = compression.codec_from_name(target_path)
+        written = 0
+        
+        try:
+            with compression.open_file(tmp_path, 'wb', codec) as f:
+                writer = _CardWriter(f, raw=codec is None)
+                try:
+                    for df in frames:
+                        if CARD_COLUMN in df.columns and any(
+                                isinstance(card, BlobRef) and card.path == target_path
+                                for card in df[CARD_COLUMN]):
+                            raise ValueError("Cannot overwrite the source file of the contacts")
+                        self._write_rows(writer, df, target_path, ios_compatible)
+                        written += len(df)
+                finally:
+                    writer.close()
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, target_path)
+        return written
+    
+    def export_csv(self, df: pd.DataFrame, filepath: str) -> None:
+        """
+        DataFrame'i CSV olarak kaydeder (iç sütunlar hariç); dosya adı
+        sıkıştırma uzantısıyla bitiyorsa sıkıştırılır
+        
+        Args:
+            df: Kaydedilecek veriler
+            filepath: Kaydedilecek dosya yolu
+        """
+        internal = [column for column in df.columns if str(column).startswith('_')]
+        with compression.open_file(filepath, 'wt', newline='') as f:
+            format_frame(df.drop(columns=internal)).to_csv(f, index=False)
@@ -0,0 +1,258 @@
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional, Sequence
+import compression
+from operations import DUPLICATE_MODES
+from pipeline import Pipeline, COLUMN_OPERATIONS
+from vcf_handler import VCFHandler
+
+# İşlenen girdiler bu alt klasörlere taşınır
+PROCESSED_DIR = 'processed'
+FAILED_DIR = 'failed'
+
+# Dosya başına ölçümlerin eklendiği JSON satırları dosyası (çıktı klasöründe)
+METRICS_FILE = 'watcher-metrics.jsonl'
+
+# Çıktı biçimi -> (dosya adı eki, iOS uyumlu mu)
+OUTPUT_FORMATS = {'vcf': ('.vcf', False), 'ios': ('.ios.vcf', True)}
+
+def output_paths(filepath: str, output_dir: str, formats: Sequence[str]) -> Dict[str, str]:
+    """Girdi dosyasının her çıktı biçimi için yolu: kisiler.vcf.gz -> kisiler.vcf, kisiler.ios.vcf"""
+    name = os.path.basename(compression.strip_extension(filepath))
+    stem = name[:-4] if name.lower().endswith('.vcf') else name
+    return {fmt: os.path.join(output_dir, stem + OUTPUT_FORMATS[fmt][0]) for fmt in formats}
+
+def process_file(filepath: str, steps: List[Dict], output_dir: str, formats: Sequence[str]) -> Dict:
+    """
+    Bir dosyayı alt süreçte okur, tarifi uygular ve çıktıları yazar
+
+    Çıktılar önce gizli bir geçici dosyaya yazılıp yeniden adlandırılır;
+    çıktı klasörünü izleyen başka araçlar yarım dosya görmez.
+
+    Returns:
+        Dict: Kişi sayıları ve süreler
+    """
+    started = time.time()
+    clock = time.perf_counter()
+    handler = VCFHandler()
+    try:
+        df = handler.parse_vcf(filepath)
+    except Exception as e:
+        # vobject hataları süreçler arasında taşınamayabilir
+        raise ValueError(f"Invalid VCF: {e}") from None
+    parse_seconds = time.perf_counter() - clock
+    contacts = len(df)
+    if not contacts:
+        raise ValueError("No contacts found")
+
+    df = Pipeline(steps).apply(df)
+    outputs = output_paths(filepath, output_dir, formats)
+    for fmt, target in outputs.items():
+        temporary = os.path.join(output_dir, '.' + os.path.basename(target))
+        handler.export_vcf(df, temporary, ios_compatible=OUTPUT_FORMATS[fmt][1])
+        os.replace(temporary, target)
+    return {'started': started, 'contacts': contacts, 'written': len(df),
+            'parse_seconds': round(parse_seconds, 3), 'seconds': time.perf_counter() - clock,
+            'outputs': list(outputs.values())}
+
+def _move(filepath: str, directory: str) -> str:
+    """Dosyayı klasöre taşır; aynı adlı dosya varsa adına zaman damgası eklenir"""
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, os.path.basename(filepath))
+    if os.path.exists(target):
+        target = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.path.basename(filepath)}")
+    shutil.move(filepath, target)
+    return target
+
+class FolderWatcher:
+    """
+    Girdi klasörüne bırakılan VCF dosyalarını bir tarifle otomatik işler
+
+    Klasör belirli aralıklarla taranır; boyutu ve değişiklik zamanı bir
+    tarama aralığı boyunca değişmeyen dosyalar (kopyalanması bitmiş) süreç
+    havuzuna verilir. Aynı anda en fazla workers + max_pending dosya
+    havuzda bulunur; fazlası klasörde bekler ve yer açıldıkça alınır, yani
+    bekleyen işler belleği büyütmez. İşlenen dosya processed/, işlenemeyen
+    dosya hata açıklamasıyla birlikte failed/ klasörüne taşınır.
+    """
+
+    def __init__(self, input_dir: str, output_dir: str, pipeline: Pipeline,
+                 formats: Sequence[str] = ('vcf',), workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, interval: float = 2.0,
+                 metrics_path: Optional[str] = None):
+        for fmt in formats:
+            if fmt not in OUTPUT_FORMATS:
+                raise ValueError(f"Unknown output format: {fmt}")
+        self.input_dir = os.path.abspath(input_dir)
+        self.output_dir = os.path.abspath(output_dir)
+        self.steps = pipeline.steps
+        self.formats = list(formats)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = self.workers if max_pending is None else max_pending
+        self.interval = interval
+        self.metrics_path = metrics_path or os.path.join(self.output_dir, METRICS_FILE)
+        self.totals = {'files': 0, 'failed': 0, 'contacts': 0, 'bytes': 0, 'seconds': 0.0}
+        # Dosya -> ((boyut, değişiklik zamanı), bu imzayla ilk görüldüğü an)
+        self._seen = {}
+        self._pending = {}
+        self._executor = None
+        self._stopping = False
+
+    def ready_files(self) -> List[str]:
+        """
+        En az bir tarama aralığı boyunca boyutu ve zamanı değişmemiş, henüz
+        işlenmeyen dosyalar (en eskisi önce)
+        """
+        now = time.monotonic()
+        current = {}
+        with os.scandir(self.input_dir) as entries:
+            for entry in entries:
+                if (entry.name.startswith('.') or not entry.is_file()
+                        or not compression.strip_extension(entry.name).lower().endswith('.vcf')):
+                    continue
+                stat = entry.stat()
+                signature = (stat.st_size, stat.st_mtime_ns)
+                previous = self._seen.get(entry.path)
+                current[entry.path] = previous if previous and previous[0] == signature else (signature, now)
+        running = {path for path, _, _ in self._pending.values()}
+        ready = [path for path, (_, since) in current.items()
+                 if now - since >= self.interval and path not in running]
+        self._seen = current
+        return sorted(ready, key=lambda path: current[path][0][1])
+
+    def submit_ready(self) -> int:
+        """Hazır dosyaları havuzdaki yer kadar işe verir"""
+        submitted = 0
+        for path in self.ready_files():
+            if len(self._pending) >= self.workers + self.max_pending:
+                break
+            future = self._executor.submit(process_file, path, self.steps, self.output_dir, self.formats)
+            self._pending[future] = (path, os.path.getsize(path), time.time())
+            submitted += 1
+        return submitted
+
+    def collect(self, timeout: float) -> List[Dict]:
+        """Biten işleri en fazla timeout saniye bekler ve ölçümlerini döndürür"""
+        if not self._pending:
+            if timeout:
+                time.sleep(timeout)
+            return []
+        finished, _ = wait(self._pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        return [self._finish(future) for future in finished]
+
+    def _finish(self, future) -> Dict:
+        """Biten işin girdisini taşır, ölçümünü kaydeder"""
+        path, size, queued = self._pending.pop(future)
+        metrics = {'file': os.path.basename(path), 'bytes': size}
+        try:
+            result = future.result()
+        except Exception as e:
+            target = _move(path, os.path.join(self.input_dir, FAILED_DIR))
+            with open(target + '.error.txt', 'w', encoding='utf-8') as f:
+                f.write(str(e) + '\n')
+            metrics.update(status='failed', error=str(e))
+            self.totals['failed'] += 1
+        else:
+            _move(path, os.path.join(self.input_dir, PROCESSED_DIR))
+            seconds = max(result.pop('seconds'), 1e-9)
+            metrics.update(
+                status='done', queued_seconds=round(max(result.pop('started') - queued, 0.0), 3),
+                seconds=round(seconds, 3), contacts_per_second=round(result['contacts'] / seconds, 1),
+                mb_per_second=round(size / 1024 ** 2 / seconds, 3), **result)
+            self.totals['files'] += 1
+            self.totals['contacts'] += result['contacts']
+            self.totals['bytes'] += size
+            self.totals['seconds'] += seconds
+        metrics['finished'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        with open(self.metrics_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(metrics, ensure_ascii=False) + '\n')
+        return metrics
+
+    def stop(self) -> None:
+        """Döngüyü durdurur; çalışan dosyalar bitirilir, kuyruktakiler klasörde kalır"""
+        self._stopping = True
+
+    def run(self, once: bool = False, report=print) -> Dict:
+        """
+        Klasörü durdurulana kadar izler
+
+        Args:
+            once: Klasördeki dosyalar bitince çık (zamanlanmış görevler için)
+            report: Her biten dosyanın ölçümüyle çağrılır
+
+        Returns:
+            Dict: Toplam ölçümler
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        # Qt veya başka iş parçacıkları olan süreçlerde fork güvenli değildir
+        self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        try:
+            while not self._stopping:
+                submitted = self.submit_ready()
+                for metrics in self.collect(self.interval):
+                    report(metrics)
+                if once and not submitted and not self._pending and not self._seen:
+                    break
+            while self._pending:
+                for metrics in self.collect(None):
+                    report(metrics)
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        return self.totals
+
+def _format_metrics(metrics: Dict) -> str:
+    if metrics['status'] == 'failed':
+        return f"{metrics['file']}: failed: {metrics['error']}"
+    return (f"{metrics['file']}: {metrics['contacts']} -> {metrics['written']} contacts in "
+            f"{metrics['seconds']:.1f} s ({metrics['contacts_per_second']:.0f} contacts/s, "
+            f"{metrics['mb_per_second']:.2f} MB/s, waited {metrics['queued_seconds']:.1f} s)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a folder and clean up dropped VCF files with a recipe")
+    parser.add_argument('input', help="Folder to watch")
+    parser.add_argument('output', help="Folder for the cleaned files")
+    parser.add_argument('--recipe', help="Recipe JSON file recorded in the editor")
+    parser.add_argument('--ops', default='', help=f"Comma-separated operations: {', '.join(COLUMN_OPERATIONS)}")
+    parser.add_argument('--dedupe', choices=list(DUPLICATE_MODES), help="Remove duplicates after the operations")
+    parser.add_argument('--format', dest='formats', action='append', choices=list(OUTPUT_FORMATS),
+                        help="Output format, may be repeated (default: vcf)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Number of worker processes")
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help="Files queued beyond the running ones (default: number of workers)")
+    parser.add_argument('--interval', type=float, default=2.0, help="Seconds between folder scans")
+    parser.add_argument('--once', action='store_true', help="Exit when the folder is empty")
+    args = parser.parse_args(argv)
+
+    pipeline = Pipeline.load(args.recipe) if args.recipe else Pipeline()
+    for op in filter(None, (op.strip() for op in args.ops.split(','))):
+        if op not in COLUMN_OPERATIONS:
+            parser.error(f"Unknown operation: {op}")
+        pipeline.add(op)
+    if args.dedupe:
+        pipeline.add('remove_duplicates', mode=args.dedupe)
+    if not len(pipeline):
+        parser.error("Give a --recipe, --ops or --dedupe")
+
+    watcher = FolderWatcher(args.input, args.output, pipeline, args.formats or ['vcf'],
+                            args.workers, args.max_pending, args.interval)
+    signal.signal(signal.SIGTERM, lambda signum, frame: watcher.stop())
+    print(f"Watching {watcher.input_dir} with {watcher.workers} workers")
+    try:
+        totals = watcher.run(args.once, lambda metrics: print(_format_metrics(metrics), flush=True))
+    except KeyboardInterrupt:
+        watcher.stop()
+        totals = watcher.totals
+    megabytes = totals['bytes'] / 1024 ** 2
+    print(f"Processed {totals['files']} files ({totals['contacts']} contacts, {megabytes:.1f} MB), "
+          f"{totals['failed']} failed")
+
+if __name__ == '__main__':
+    main()